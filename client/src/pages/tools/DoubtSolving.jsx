@@ -25,6 +25,7 @@ export function DoubtSolving() {
   const [isTyping, setIsTyping] = useState(false);
   const [chatSessions, setChatSessions] = useState([]);
   const [currentSessionId, setCurrentSessionId] = useState(null);
+  const [nextSessionCursor, setNextSessionCursor] = useState(null);
   const [isHistoryOpen, setIsHistoryOpen] = useState(false);
   const [isLoading, setIsLoading] = useState(true);
   const messagesEndRef = useRef(null);
@@ -62,28 +63,37 @@ export function DoubtSolving() {
     }
   };
 
-  const loadChatSessions = async () => {
+  const loadSessionMessages = async (sessionId) => {
+    const response = await fetch(
+      `${backEndURL}/api/chat/session/${sessionId}/messages?userEmail=${encodeURIComponent(
+        user.email
+      )}`
+    );
+    if (!response.ok) return [];
+    const data = await response.json();
+    return data.success ? data.messages || [] : [];
+  };
+
+  const loadChatSessions = async (cursor = null) => {
     if (!user || !user.email) return;
 
     try {
-      const response = await fetch(
-        `${backEndURL}/api/chat/loadChat?userEmail=${encodeURIComponent(
-          user.email
-        )}`
-      );
+      // The session list only carries metadata; messages are fetched per session
+      let url = `${backEndURL}/api/chat/loadChat?view=summary&userEmail=${encodeURIComponent(
+        user.email
+      )}`;
+      if (cursor) url += `&cursor=${encodeURIComponent(cursor)}`;
+      const response = await fetch(url);
       if (response.ok) {
         const data = await response.json();
         if (data.success) {
-          setChatSessions(data.sessions || []);
-          if (data.currentSessionId) {
+          setChatSessions((prev) =>
+            cursor ? [...prev, ...(data.sessions || [])] : data.sessions || []
+          );
+          setNextSessionCursor(data.nextCursor || null);
+          if (!cursor && data.currentSessionId) {
             setCurrentSessionId(data.currentSessionId);
-            // Load messages from current session
-            const currentSession = data.sessions.find(
-              (s) => s.id === data.currentSessionId
-            );
-            if (currentSession && currentSession.messages) {
-              setMessages(currentSession.messages || []);
-            }
+            setMessages(await loadSessionMessages(data.currentSessionId));
           }
         }
       }
@@ -137,7 +147,7 @@ export function DoubtSolving() {
       setCurrentSessionId(sessionId);
       const session = chatSessions.find((s) => s.id === sessionId);
       if (session) {
-        setMessages(session.messages || []);
+        setMessages(await loadSessionMessages(sessionId));
 
         // Update activity
         await fetch(
@@ -171,11 +181,14 @@ export function DoubtSolving() {
       if (response.ok) {
         const data = await response.json();
         if (data.success) {
-          setChatSessions(data.remainingSessions || []);
+          const remainingSessions = chatSessions.filter(
+            (s) => s.id !== sessionId
+          );
+          setChatSessions(remainingSessions);
           if (sessionId === currentSessionId) {
-            if (data.remainingSessions.length > 0) {
-              setCurrentSessionId(data.remainingSessions[0].id);
-              setMessages(data.remainingSessions[0].messages || []);
+            if (remainingSessions.length > 0) {
+              setCurrentSessionId(remainingSessions[0].id);
+              setMessages(await loadSessionMessages(remainingSessions[0].id));
             } else {
               setCurrentSessionId(null);
               setMessages([]);
@@ -241,15 +254,16 @@ export function DoubtSolving() {
         }
       }
 
-      // Send message to AI with conversation context (excluding the temporary user message we just added)
+      // Send message to AI; the server appends the new turn to the session
       const response = await fetch(`${backEndURL}/api/chat/message`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
           input: questionToSend,
           userEmail: user.email,
-          chatHistory: messages, // Use original messages, not the updated ones
           sessionId: sessionId,
+          // The server reads a stored session's history itself
+          ...(sessionId ? {} : { chatHistory: messages }),
         }),
       });
 
@@ -283,8 +297,8 @@ export function DoubtSolving() {
             session.id === sessionId
               ? {
                 ...session,
-                messages: finalMessages,
                 messageCount: finalMessages.length,
+                preview: botResponse.content.slice(0, 120),
                 lastActivity: serverTimestamp,
               }
               : session
@@ -802,6 +816,18 @@ Please try again in a moment, and I'll be happy to provide a more detailed expla
                   </div>
                 ))
               )}
+              {nextSessionCursor && (
+                <div className="p-3 text-center">
+                  <Button
+                    variant="ghost"
+                    size="sm"
+                    onClick={() => loadChatSessions(nextSessionCursor)}
+                    className="text-xs text-gray-700 hover:bg-white/20"
+                  >
+                    Load older chats
+                  </Button>
+                </div>
+              )}
             </div>
           </div>
         </div>
@@ -38,6 +38,8 @@ export function Quizzes() {
   const location = useLocation();
   // Removed duplicate declaration of activeTab
   const [quizzes, setQuizzes] = useState([]);
+  const [nextQuizCursor, setNextQuizCursor] = useState(null);
+  const [isLoadingMoreQuizzes, setIsLoadingMoreQuizzes] = useState(false);
   const [currentQuiz, setCurrentQuiz] = useState(null);
   const [currentQuestion, setCurrentQuestion] = useState(0);
   const [answers, setAnswers] = useState({});
@@ -123,14 +125,16 @@ export function Quizzes() {
         return;
       }
 
+      // Catalogue view: summary fields only, questions are fetched on open
       const response = await fetch(
-        `${backEndURL}/api/tools/quizzes?user_email=${encodeURIComponent(
+        `${backEndURL}/api/tools/quizzes?view=catalogue&user_email=${encodeURIComponent(
           user.email
         )}`
       );
       if (response.ok) {
         const data = await response.json();
-        setQuizzes(data);
+        setQuizzes(data.quizzes || []);
+        setNextQuizCursor(data.nextCursor || null);
       }
 
       // Ensure minimum loading time of 1 second
@@ -142,6 +146,28 @@ export function Quizzes() {
     }
   };
 
+  const loadMoreQuizzes = async () => {
+    if (!user?.email || !nextQuizCursor) return;
+
+    try {
+      setIsLoadingMoreQuizzes(true);
+      const response = await fetch(
+        `${backEndURL}/api/tools/quizzes?view=catalogue&user_email=${encodeURIComponent(
+          user.email
+        )}&cursor=${encodeURIComponent(nextQuizCursor)}`
+      );
+      if (response.ok) {
+        const data = await response.json();
+        setQuizzes((prev) => [...prev, ...(data.quizzes || [])]);
+        setNextQuizCursor(data.nextCursor || null);
+      }
+    } catch (error) {
+      console.error("Failed to load more quizzes:", error);
+    } finally {
+      setIsLoadingMoreQuizzes(false);
+    }
+  };
+
   // This helper ensures a minimum loading time for better UX
   const enforceMinimumLoadingTime = async (startTime, minimumTime = 1000) => {
     const elapsedTime = Date.now() - startTime;
@@ -252,6 +278,8 @@ export function Quizzes() {
             topic: newQuizTopic,
             difficulty: difficulty,
             numberOfQuestions: numberOfQuestions,
+            // Lets the server skip question-bank questions this user has seen
+            user_email: user?.email,
           }),
         }
       );
@@ -295,8 +323,24 @@ export function Quizzes() {
     }
   };
 
-  const startQuiz = (quiz) => {
-    if (!quiz.quiz_data) return;
+  const startQuiz = async (quiz) => {
+    if (!quiz.quiz_data) {
+      // Catalogue items carry no questions; fetch the full quiz on open
+      try {
+        const response = await fetch(
+          `${backEndURL}/api/tools/quizzes/${quiz.id}?user_email=${encodeURIComponent(
+            user.email
+          )}`
+        );
+        if (!response.ok) throw new Error("Failed to load quiz");
+        quiz = await response.json();
+      } catch (error) {
+        console.error("Failed to load quiz:", error);
+        alert("Failed to load quiz. Please try again.");
+        return;
+      }
+      if (!quiz.quiz_data) return;
+    }
 
     setCurrentQuiz(quiz);
     setCurrentQuestion(0);
@@ -813,6 +857,22 @@ export function Quizzes() {
             </div>
           )}
 
+          {!isLoading && nextQuizCursor && (
+            <div className="flex justify-center">
+              <Button
+                variant="outline"
+                onClick={loadMoreQuizzes}
+                disabled={isLoadingMoreQuizzes}
+                className="text-sm"
+              >
+                {isLoadingMoreQuizzes ? (
+                  <Loader2 className="h-4 w-4 mr-2 animate-spin" />
+                ) : null}
+                Load more quizzes
+              </Button>
+            </div>
+          )}
+
           {!isLoading && quizzes.length === 0 && (
             <div className="text-center py-8 sm:py-12">
               <Brain className="h-8 w-8 sm:h-12 sm:w-12 text-gray-400 mx-auto mb-4" />
@@ -88,6 +88,7 @@ export function Roadmap() {
         duration: roadmap.duration_weeks,
         dateCreated: new Date(roadmap.created_at).toLocaleDateString(),
         data: roadmap.data,
+        schedule: roadmap.schedule,
         skills: roadmap.data.nodes
           ? roadmap.data.nodes
             .filter((node) => node.id !== "start")
@@ -182,7 +183,7 @@ export function Roadmap() {
 
     try {
       // If we already have the full roadmap data, just use it
-      if (roadmap.data && roadmap.data.nodes && roadmap.data.edges) {
+      if (roadmap.data && roadmap.data.nodes && roadmap.data.edges && roadmap.schedule) {
         setSelectedRoadmap(roadmap);
         setShowRoadmapModal(true);
         return;
@@ -207,6 +208,7 @@ export function Roadmap() {
         duration: detailedRoadmap.duration_weeks,
         dateCreated: new Date(detailedRoadmap.created_at).toLocaleDateString(),
         data: detailedRoadmap.data,
+        schedule: detailedRoadmap.schedule,
         skills: detailedRoadmap.data.nodes
           ? detailedRoadmap.data.nodes
             .filter((node) => node.id !== "start")
@@ -270,8 +272,14 @@ export function Roadmap() {
     }
   };
 
-  // Calculate total duration of a roadmap
-  const calculateTotalDuration = (nodes) => {
+  // Total duration of a roadmap: the server-computed schedule (critical path
+  // fitted to the requested duration), or the sum of node estimates for
+  // roadmaps saved without one
+  const calculateTotalDuration = (roadmap) => {
+    if (roadmap?.schedule?.scheduled_weeks) {
+      return `${roadmap.schedule.scheduled_weeks} weeks`;
+    }
+    const nodes = roadmap?.data?.nodes;
     if (!nodes || !Array.isArray(nodes)) return "N/A";
 
     const totalWeeks = nodes.reduce((sum, node) => {
@@ -471,7 +479,7 @@ export function Roadmap() {
                     </CardTitle>
                     <CardDescription className="text-xs mt-1">
                       Created: {roadmap.dateCreated} • Duration:{" "}
-                      {calculateTotalDuration(roadmap.data.nodes)}
+                      {calculateTotalDuration(roadmap)}
                     </CardDescription>
                   </CardHeader>
                   <CardContent className="px-4 pb-4 flex-grow flex flex-col">
@@ -605,7 +613,7 @@ export function Roadmap() {
                         Total Duration
                       </p>
                       <p className="text-xs xs:text-sm sm:text-base font-medium truncate">
-                        {calculateTotalDuration(selectedRoadmap.data.nodes)}
+                        {calculateTotalDuration(selectedRoadmap)}
                       </p>
                     </div>
                   </div>
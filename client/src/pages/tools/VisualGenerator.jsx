@@ -106,6 +106,40 @@ export function VisualGenerator() {
     }
   }
 
+  // Video rendering runs as a background job: submit, then follow its
+  // progress over SSE (falling back to polling) until the URL is ready
+  // Poll the job's status URL; this never holds a server worker between polls
+  function waitForJob(job) {
+    return new Promise((resolve, reject) => {
+      const poll = async () => {
+        try {
+          const res = await fetch(backEndURL + job.status_url);
+          const data = await res.json().catch(() => ({}));
+          if (!res.ok) throw new Error(data.error || "Failed to load job");
+          if (data.progress) setProgress(Math.max(10, data.progress));
+          if (data.status === "succeeded") return resolve(data);
+          if (data.status === "failed")
+            return reject(new Error(data.error || "Video generation failed"));
+          setTimeout(poll, 3000);
+        } catch (e) {
+          reject(e);
+        }
+      };
+      poll();
+    });
+  }
+
+  async function runVideoJob(path, body) {
+    const job = await postJSON(path, { ...body, user_email: user?.email });
+    try {
+      const result = await waitForJob(job);
+      return { url: result.result_url };
+    } catch (e) {
+      setError(e.message);
+      throw e;
+    }
+  }
+
   const saveVideoRecord = async (meta) => {
     if (!user || !meta.videoUrl) return;
     try {
@@ -256,7 +290,7 @@ export function VisualGenerator() {
     setLoading(true);
     setProgress(10);
     try {
-      const { url } = await postJSON("/api/visual/text-to-video", {
+      const { url } = await runVideoJob("/api/visual/text-to-video", {
         text: content,
       });
       setVideoUrl(url);
@@ -278,7 +312,7 @@ export function VisualGenerator() {
     setProgress(5);
     try {
       const pdfUrl = await uploadToCloudinary(pdfFile);
-      const { url } = await postJSON("/api/visual/pdf-url-to-video", {
+      const { url } = await runVideoJob("/api/visual/pdf-url-to-video", {
         pdf_url: pdfUrl,
       });
       setVideoUrl(url);
@@ -301,7 +335,7 @@ export function VisualGenerator() {
     setProgress(5);
     try {
       const audUrl = await uploadToCloudinary(audioFile);
-      const { url } = await postJSON("/api/visual/audio-url-to-video", {
+      const { url } = await runVideoJob("/api/visual/audio-url-to-video", {
         audio_url: audUrl,
       });
       setVideoUrl(url);
@@ -1,5 +1,6 @@
 """Application factory for Edvanta backend."""
 
+import click
 from flask import Flask
 from flask_cors import CORS
 import os
@@ -20,6 +21,7 @@ def create_app() -> Flask:
     - Loads configuration from Config class / environment variables
     - Enables CORS for /api/* endpoints
     - Registers all feature blueprints
+    - Creates MongoDB indexes (when enabled) and registers index CLI commands
     """
 
     app = Flask(__name__)
@@ -35,6 +37,7 @@ def create_app() -> Flask:
     from .routes.tutor import tutor_bp
     from .routes.roadmap import roadmap_bp
     from .routes.resume import resume_bp
+    from .routes.user_stats import user_stats_bp
 
     # Register blueprints with the app
     app.register_blueprint(visual_bp)
@@ -43,6 +46,110 @@ def create_app() -> Flask:
     app.register_blueprint(tutor_bp)
     app.register_blueprint(roadmap_bp)
     app.register_blueprint(resume_bp)
+    app.register_blueprint(user_stats_bp)
+
+    # MongoDB indexes: created at startup (idempotent) and exposed as CLI
+    # commands for deploy pipelines where startup hooks are undesirable.
+    from .utils.mongo_indexes import ensure_indexes, verify_indexes
+
+    if Config.MONGODB_ENSURE_INDEXES_ON_STARTUP:
+        try:
+            ensure_indexes()
+        except Exception:  # noqa: BLE001 - never block startup on index creation
+            pass
+
+    @app.cli.command("ensure-indexes")
+    def ensure_indexes_command():
+        """Create all MongoDB indexes declared in the index manifest."""
+        results = ensure_indexes()
+        if not results:
+            raise click.ClickException("MongoDB is not available")
+        failed = False
+        for config_attr, created in results.items():
+            click.echo(f"{config_attr}: {created}")
+            failed = failed or isinstance(created, str)
+        if failed:
+            raise click.ClickException("Some indexes could not be created")
+
+    @app.cli.command("verify-indexes")
+    def verify_indexes_command():
+        """Explain canonical route queries and fail on any COLLSCAN."""
+        report = verify_indexes()
+        for entry in report:
+            status = "ok" if entry["ok"] else "FAIL"
+            detail = entry.get("error") or " > ".join(entry["stages"])
+            click.echo(f"[{status}] {entry['query']} ({entry['collection']}): {detail}")
+        if not all(entry["ok"] for entry in report):
+            raise click.ClickException("Some canonical queries are not index-backed")
+
+    @app.cli.command("migrate-voice-chats")
+    @click.option("--drop-legacy", is_flag=True, help="Delete legacy documents once copied.")
+    def migrate_voice_chats_command(drop_legacy):
+        """Move embedded voice chat history to the per-message layout."""
+        from .utils.voice_chat_migration import migrate_legacy_voice_chats
+
+        try:
+            counts = migrate_legacy_voice_chats(drop_legacy=drop_legacy)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+        click.echo(
+            f"Migrated {counts['messages']} messages in {counts['sessions']} sessions "
+            f"for {counts['users']} users"
+        )
+
+    @app.cli.command("backfill-user-stats")
+    def backfill_user_stats_command():
+        """Rebuild per-user quiz counters from quiz_history."""
+        from .utils.user_stats import backfill_user_stats
+
+        try:
+            users = backfill_user_stats()
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"Backfilled quiz stats for {users} users")
+
+    @app.cli.command("backfill-quiz-rollups")
+    def backfill_quiz_rollups_command():
+        """Rebuild daily quiz analytics rollups from quiz_history."""
+        from .utils.quiz_analytics import backfill_quiz_rollups
+
+        try:
+            written = backfill_quiz_rollups()
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"Wrote {written} daily quiz rollups")
+
+    @app.cli.command("refill-question-bank")
+    @click.option("--topics", type=int, default=None, help="Number of popular topics to check.")
+    @click.option("--target", type=int, default=None, help="Questions wanted per topic and difficulty.")
+    def refill_question_bank_command(topics, target):
+        """Generate questions for popular topics whose bank is below target."""
+        from .utils.quizzes_utils import refill_question_bank
+
+        for entry in refill_question_bank(max_topics=topics, target=target):
+            click.echo(
+                f"{entry['topic']} ({entry['difficulty']}): +{entry['added']} -> {entry['banked']}"
+            )
+
+    @app.cli.command("sweep-render-workspaces")
+    @click.option("--max-age", type=int, default=None, help="Also remove workspaces older than this many seconds.")
+    def sweep_render_workspaces_command(max_age):
+        """Remove video render workspaces left behind by crashed processes."""
+        from .utils.render_workspace import sweep_orphaned_workspaces
+
+        click.echo(f"Removed {sweep_orphaned_workspaces(max_age)} orphaned render workspaces")
+
+    # Optional periodic refill in this process (disabled by default)
+    if Config.QUESTION_BANK_ENABLED and Config.QUESTION_BANK_REFILL_INTERVAL_SECONDS > 0:
+        from .utils.quizzes_utils import start_refill_worker
+
+        start_refill_worker()
+
+    # Periodic removal of scratch directories orphaned by crashed renders
+    if Config.VIDEO_WORKSPACE_SWEEP_INTERVAL_SECONDS > 0:
+        from .utils.render_workspace import start_workspace_sweeper
+
+        start_workspace_sweeper()
 
     @app.route("/", methods=["GET"])  # Simple health check
     def health():  # pragma: no cover - trivial
@@ -74,6 +181,13 @@ def create_app() -> Flask:
 
         return {"status": "ok", "features": features}
 
+    @app.route("/api/llm-cache/stats", methods=["GET"])
+    def llm_cache_stats():
+        """Report LLM response cache hit/miss counters for this process."""
+        from .utils.llm_cache import cache_stats
+
+        return {"status": "ok", "cache": cache_stats()}
+
     # Ensure CORS headers are present on every response. This complements
     # flask_cors and guarantees headers are attached even for error pages
     # or responses generated before blueprint handlers run.
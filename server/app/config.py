@@ -18,8 +18,34 @@ Optional environment variables:
 - CLOUDINARY_CLOUD_NAME / CLOUDINARY_API_KEY / CLOUDINARY_API_SECRET: For image uploads
 - ALLOWED_ORIGINS: Comma separated origins for CORS (default: "*")
 - VERTEX_TEMPERATURE/VERTEX_TOP_P/VERTEX_TOP_K: AI generation parameters
+- MONGODB_MAX_POOL_SIZE/MONGODB_MIN_POOL_SIZE/MONGODB_MAX_IDLE_TIME_MS: Shared client pool sizing
+- MONGODB_SERVER_SELECTION_TIMEOUT_MS/MONGODB_CONNECT_TIMEOUT_MS/MONGODB_SOCKET_TIMEOUT_MS: Client timeouts
+- MONGODB_RETRY_INTERVAL_SECONDS: Back-off before reconnecting after a failed connection
+- LLM_CACHE_ENABLED/LLM_CACHE_ENDPOINTS: LLM response cache switch and opted-in endpoints
+- LLM_CACHE_MAX_ENTRIES/LLM_CACHE_TTL_SECONDS/LLM_CACHE_SHARED: Cache bounds and Mongo shared tier
+- QUESTION_BANK_ENABLED: Draw quiz questions from the question bank before calling the model
+- QUESTION_BANK_REFILL_INTERVAL_SECONDS/QUESTION_BANK_REFILL_TOPICS/QUESTION_BANK_REFILL_TARGET/QUESTION_BANK_REFILL_BATCH: Popular topic refill
+- QUIZ_ANSWER_KEY_CACHE_SIZE/QUIZ_ANSWER_KEY_TTL_SECONDS: Quiz grading answer-key cache bounds
+- CONTEXT_TOKEN_BUDGET_CHAT/CONTEXT_TOKEN_BUDGET_TUTOR/CONTEXT_TOKEN_BUDGET_VOICE: Prompt history budgets per endpoint
+- CONTEXT_MAX_MESSAGE_TOKENS/CONTEXT_HISTORY_FETCH_LIMIT: Per-message cap and messages read back per prompt
+- CONTEXT_SUMMARY_EVERY_TURNS/CONTEXT_SUMMARY_MAX_TOKENS: Rolling session summary refresh interval and size
+- CONTEXT_SUMMARY_WORKERS: Background threads folding old turns into session summaries
+- IMAGE_GEN_MAX_WORKERS/IMAGE_GEN_RATE_PER_MINUTE: Concurrent image generation calls and start rate (0 = unlimited)
+- IMAGE_GEN_MAX_ATTEMPTS/IMAGE_GEN_RETRY_BACKOFF_SECONDS: Per-prompt image generation retries
+- VIDEO_TTS_MAX_WORKERS/VIDEO_CAPTION_MAX_WORKERS: Per-sentence voiceover and caption rendering pools
+- VIDEO_RENDER_BACKEND: Video encoder: auto (ffmpeg, falling back to MoviePy), ffmpeg or moviepy
+- VIDEO_FFMPEG_BINARY/VIDEO_ENCODE_MAX_WORKERS: ffmpeg executable override and concurrent per-sentence encodes
+- VISUAL_JOB_WORKERS/VISUAL_JOB_MAX_PENDING: Video job worker threads and queued-or-running cap per process
+- VISUAL_JOB_STALE_SECONDS/VISUAL_JOB_RETENTION_SECONDS: Silence before a running job counts as interrupted, and job record lifetime
+- VISUAL_JOB_QUEUED_STALE_SECONDS: Wait before a job queued by another (possibly dead) process counts as interrupted
+- VISUAL_JOB_EVENTS_POLL_SECONDS/VISUAL_JOB_EVENTS_TIMEOUT_SECONDS: Progress stream poll interval and length of one stream (clients reconnect or poll after it)
+- VIDEO_WORKSPACE_ROOT: Directory holding per-render scratch workspaces
+- VIDEO_WORKSPACE_QUOTA_MB/VIDEO_WORKSPACE_MIN_FREE_MB: Best-effort scratch disk cap per render and free space required to start one or begin its encode
+- VIDEO_WORKSPACE_MAX_AGE_SECONDS/VIDEO_WORKSPACE_SWEEP_INTERVAL_SECONDS: Orphaned workspace sweeping (interval 0 disables the sweeper thread)
+- MONGODB_ENSURE_INDEXES_ON_STARTUP: Create collection indexes when the app starts (default: true)
 """
 import os
+import tempfile
 from typing import List
 
 
@@ -79,6 +105,97 @@ class Config:
     MONGODB_QUIZ_COLLECTION = os.getenv("MONGODB_QUIZ_COLLECTION", "quizzes")
     MONGODB_QUIZ_HISTORY_COLLECTION = os.getenv("MONGODB_QUIZ_HISTORY_COLLECTION", "quiz_history")
     MONGODB_CHAT_COLLECTION = os.getenv("MONGODB_CHAT_COLLECTION", "chat_sessions")
+    # Legacy one-document-per-user voice history (source for `flask migrate-voice-chats`)
     MONGODB_VOICE_CHAT_COLLECTION = os.getenv("MONGODB_VOICE_CHAT_COLLECTION", "voice_chats")
+    MONGODB_VOICE_SESSIONS_COLLECTION = os.getenv("MONGODB_VOICE_SESSIONS_COLLECTION", "voice_chat_sessions")
+    MONGODB_VOICE_MESSAGES_COLLECTION = os.getenv("MONGODB_VOICE_MESSAGES_COLLECTION", "voice_chat_messages")
     MONGODB_ACTIVE_SESSIONS_COLLECTION = os.getenv("MONGODB_ACTIVE_SESSIONS_COLLECTION", "active_sessions")
-    MONGODB_ROADMAP_COLLECTION = os.getenv("MONGODB_ROADMAP_COLLECTION", "roadmaps")
\ No newline at end of file
+    MONGODB_ROADMAP_COLLECTION = os.getenv("MONGODB_ROADMAP_COLLECTION", "roadmaps")
+    MONGODB_LLM_CACHE_COLLECTION = os.getenv("MONGODB_LLM_CACHE_COLLECTION", "llm_cache")
+    # Question bank (see app.utils.question_bank)
+    MONGODB_QUESTION_BANK_COLLECTION = os.getenv("MONGODB_QUESTION_BANK_COLLECTION", "question_bank")
+    MONGODB_QUESTION_BANK_SEEN_COLLECTION = os.getenv(
+        "MONGODB_QUESTION_BANK_SEEN_COLLECTION", "question_bank_seen")
+    MONGODB_QUESTION_BANK_TOPICS_COLLECTION = os.getenv(
+        "MONGODB_QUESTION_BANK_TOPICS_COLLECTION", "question_bank_topics")
+    # One incrementally updated stats document per user (dashboard)
+    MONGODB_USER_STATS_COLLECTION = os.getenv("MONGODB_USER_STATS_COLLECTION", "user_stats")
+    # Per-user daily quiz rollups backing analytics trend lines
+    MONGODB_QUIZ_DAILY_ROLLUPS_COLLECTION = os.getenv(
+        "MONGODB_QUIZ_DAILY_ROLLUPS_COLLECTION", "quiz_daily_rollups")
+    # Background jobs of the /api/visual/* video pipeline (see app.utils.visual_jobs)
+    MONGODB_VISUAL_JOBS_COLLECTION = os.getenv("MONGODB_VISUAL_JOBS_COLLECTION", "visual_jobs")
+    # Per-user resource version counters backing conditional GETs (ETags)
+    MONGODB_RESOURCE_VERSIONS_COLLECTION = os.getenv(
+        "MONGODB_RESOURCE_VERSIONS_COLLECTION", "resource_versions")
+
+    # MongoDB shared client pool (see app.utils.mongo_utils)
+    MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "50"))
+    MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+    MONGODB_MAX_IDLE_TIME_MS = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000"))
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+    MONGODB_CONNECT_TIMEOUT_MS = int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "5000"))
+    MONGODB_SOCKET_TIMEOUT_MS = int(os.getenv("MONGODB_SOCKET_TIMEOUT_MS", "30000"))
+    MONGODB_RETRY_INTERVAL_SECONDS = float(os.getenv("MONGODB_RETRY_INTERVAL_SECONDS", "30"))
+    MONGODB_ENSURE_INDEXES_ON_STARTUP = os.getenv("MONGODB_ENSURE_INDEXES_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+    # LLM response cache (see app.utils.llm_cache)
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    LLM_CACHE_ENDPOINTS = os.getenv("LLM_CACHE_ENDPOINTS", "quiz,roadmap,resume")
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+    LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+    LLM_CACHE_SHARED = os.getenv("LLM_CACHE_SHARED", "true").lower() in ("1", "true", "yes")
+
+    # Question bank: serve quiz questions before calling the model
+    QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK_ENABLED", "true").lower() in ("1", "true", "yes")
+    # 0 disables the in-process refill worker (use `flask refill-question-bank` from cron instead)
+    QUESTION_BANK_REFILL_INTERVAL_SECONDS = int(os.getenv("QUESTION_BANK_REFILL_INTERVAL_SECONDS", "0"))
+    QUESTION_BANK_REFILL_TOPICS = int(os.getenv("QUESTION_BANK_REFILL_TOPICS", "20"))
+    QUESTION_BANK_REFILL_TARGET = int(os.getenv("QUESTION_BANK_REFILL_TARGET", "50"))
+    QUESTION_BANK_REFILL_BATCH = int(os.getenv("QUESTION_BANK_REFILL_BATCH", "10"))
+
+    # In-process quiz answer-key cache (see app.utils.quiz_grading)
+    QUIZ_ANSWER_KEY_CACHE_SIZE = int(os.getenv("QUIZ_ANSWER_KEY_CACHE_SIZE", "1024"))
+    QUIZ_ANSWER_KEY_TTL_SECONDS = int(os.getenv("QUIZ_ANSWER_KEY_TTL_SECONDS", "3600"))
+
+    # Conversation context packing (see app.utils.context_builder)
+    CONTEXT_TOKEN_BUDGET_CHAT = int(os.getenv("CONTEXT_TOKEN_BUDGET_CHAT", "3000"))
+    CONTEXT_TOKEN_BUDGET_TUTOR = int(os.getenv("CONTEXT_TOKEN_BUDGET_TUTOR", "2000"))
+    CONTEXT_TOKEN_BUDGET_VOICE = int(os.getenv("CONTEXT_TOKEN_BUDGET_VOICE", "1000"))
+    CONTEXT_MAX_MESSAGE_TOKENS = int(os.getenv("CONTEXT_MAX_MESSAGE_TOKENS", "800"))
+    CONTEXT_HISTORY_FETCH_LIMIT = int(os.getenv("CONTEXT_HISTORY_FETCH_LIMIT", "60"))
+    CONTEXT_SUMMARY_EVERY_TURNS = int(os.getenv("CONTEXT_SUMMARY_EVERY_TURNS", "5"))
+    CONTEXT_SUMMARY_MAX_TOKENS = int(os.getenv("CONTEXT_SUMMARY_MAX_TOKENS", "300"))
+    CONTEXT_SUMMARY_WORKERS = int(os.getenv("CONTEXT_SUMMARY_WORKERS", "2"))
+
+    # Concurrent image generation (see app.utils.image_pool)
+    IMAGE_GEN_MAX_WORKERS = int(os.getenv("IMAGE_GEN_MAX_WORKERS", "4"))
+    IMAGE_GEN_RATE_PER_MINUTE = float(os.getenv("IMAGE_GEN_RATE_PER_MINUTE", "60"))
+    IMAGE_GEN_MAX_ATTEMPTS = int(os.getenv("IMAGE_GEN_MAX_ATTEMPTS", "3"))
+    IMAGE_GEN_RETRY_BACKOFF_SECONDS = float(os.getenv("IMAGE_GEN_RETRY_BACKOFF_SECONDS", "2"))
+
+    # Per-sentence render stages of text-to-video (see app.utils.visual_utils)
+    VIDEO_TTS_MAX_WORKERS = int(os.getenv("VIDEO_TTS_MAX_WORKERS", "4"))
+    VIDEO_CAPTION_MAX_WORKERS = int(os.getenv("VIDEO_CAPTION_MAX_WORKERS", "2"))
+
+    # Final encode of text-to-video (see app.utils.render_backends)
+    VIDEO_RENDER_BACKEND = os.getenv("VIDEO_RENDER_BACKEND", "auto")
+    VIDEO_FFMPEG_BINARY = os.getenv("VIDEO_FFMPEG_BINARY")
+    VIDEO_ENCODE_MAX_WORKERS = int(os.getenv("VIDEO_ENCODE_MAX_WORKERS", "2"))
+
+    # Background video jobs (see app.utils.visual_jobs)
+    VISUAL_JOB_WORKERS = int(os.getenv("VISUAL_JOB_WORKERS", "2"))
+    VISUAL_JOB_MAX_PENDING = int(os.getenv("VISUAL_JOB_MAX_PENDING", "20"))
+    VISUAL_JOB_STALE_SECONDS = int(os.getenv("VISUAL_JOB_STALE_SECONDS", "1800"))
+    VISUAL_JOB_QUEUED_STALE_SECONDS = int(os.getenv("VISUAL_JOB_QUEUED_STALE_SECONDS", "21600"))
+    VISUAL_JOB_RETENTION_SECONDS = int(os.getenv("VISUAL_JOB_RETENTION_SECONDS", "604800"))
+    VISUAL_JOB_EVENTS_POLL_SECONDS = float(os.getenv("VISUAL_JOB_EVENTS_POLL_SECONDS", "1"))
+    VISUAL_JOB_EVENTS_TIMEOUT_SECONDS = int(os.getenv("VISUAL_JOB_EVENTS_TIMEOUT_SECONDS", "25"))
+
+    # Per-render scratch workspaces (see app.utils.render_workspace)
+    VIDEO_WORKSPACE_ROOT = os.getenv(
+        "VIDEO_WORKSPACE_ROOT", os.path.join(tempfile.gettempdir(), "edvanta-renders"))
+    VIDEO_WORKSPACE_QUOTA_MB = int(os.getenv("VIDEO_WORKSPACE_QUOTA_MB", "2048"))
+    VIDEO_WORKSPACE_MIN_FREE_MB = int(os.getenv("VIDEO_WORKSPACE_MIN_FREE_MB", "512"))
+    VIDEO_WORKSPACE_MAX_AGE_SECONDS = int(os.getenv("VIDEO_WORKSPACE_MAX_AGE_SECONDS", "21600"))
+    VIDEO_WORKSPACE_SWEEP_INTERVAL_SECONDS = int(os.getenv("VIDEO_WORKSPACE_SWEEP_INTERVAL_SECONDS", "900"))
@@ -11,3 +11,4 @@ patterns if desired in the future.
 # from .tutor import tutor_bp  # noqa: F401
 # from .roadmap import roadmap_bp  # noqa: F401
 # from .resume import resume_bp  # noqa: F401
+# from .user_stats import user_stats_bp  # noqa: F401
@@ -4,31 +4,26 @@ Handles conversational Q&A for student doubts with chat session management,
 message persistence, and AI responses using Vertex AI with conversation context.
 """
 from flask import Blueprint, request, jsonify
+import hashlib
 import json
-import base64
 import time
-try:
-    from google.oauth2 import service_account
-except Exception:
-    service_account = None
-from pymongo import MongoClient
 from bson import ObjectId
+from pymongo import DeleteMany, InsertOne, ReplaceOne
+from pymongo.errors import BulkWriteError
 from ..config import Config
+from ..utils.llm_gateway import get_model
+from ..utils.mongo_utils import get_collection
+from ..utils.sse_utils import sse_event, sse_response
+from ..utils.resource_versions import CHAT_SESSIONS, bump_version, conditional_get
+from ..utils.context_builder import build_context, format_messages, submit_summary_refresh
 from datetime import datetime
 
 chatbot_bp = Blueprint("chatbot", __name__)
 
-# MongoDB connection
-try:
-    mongo_uri = Config.MONGODB_URI
-    db_name = Config.MONGODB_DB_NAME
-    collection_name = Config.MONGODB_CHAT_COLLECTION
-    client = MongoClient(mongo_uri)
-    db = client[db_name]
-    chat_sessions_col = db[collection_name]
-except Exception as e:
-    # Fallback to in-memory storage
-    chat_sessions_storage = []
+
+def _chat_sessions_col():
+    """Return the chat sessions collection from the shared MongoDB client."""
+    return get_collection("MONGODB_CHAT_COLLECTION")
 
 # AI Configuration
 SYSTEM_PROMPT = """You are an expert educational tutor helping students with their academic doubts and questions. You should:
@@ -46,6 +41,11 @@ SYSTEM_PROMPT = """You are an expert educational tutor helping students with the
 
 Remember to maintain context from previous messages in the conversation to provide personalized and coherent responses."""
 
+# Session listing page size (summary view)
+SESSION_PAGE_SIZE = 20
+MAX_SESSION_PAGE_SIZE = 100
+PREVIEW_LENGTH = 120
+
 
 def fix_id(document):
     """Convert MongoDB ObjectId to string for JSON serialization."""
@@ -55,74 +55,255 @@ def fix_id(document):
     return document
 
 
-def get_ai_response(question: str, context: str = "", chat_history: list = None):
+def _build_chat_prompt(question: str, context: str = "", chat_history: list = None,
+                       message_count: int = None, summary: str = "") -> str:
+    """Build the doubt-solving prompt with recent conversation context.
+
+    `chat_history` is already packed to the token budget (see
+    `_conversation_context`); `summary` covers the messages before it and
+    `message_count` is the number of messages in the whole session.
+    """
+    # Build comprehensive prompt with conversation context
+    base_context = ""
+    if chat_history and len(chat_history) > 0:
+        if message_count is None:
+            message_count = len(chat_history)
+        base_context = f" You are in an ongoing conversation with the user. Remember the context from previous messages in this session to provide more personalized and coherent responses. This is message #{message_count + 1} in the current session."
+
+    system_prompt = SYSTEM_PROMPT + base_context
+
+    # Build conversation context from the rolling summary and packed history
+    conversation_context = ""
+    if summary:
+        conversation_context += f"\n\nSummary of the earlier conversation:\n{summary}\n"
+    if chat_history and len(chat_history) > 0:
+        recent_history = [
+            msg for msg in chat_history
+            if msg and isinstance(msg, dict) and msg.get('role') in ['user', 'assistant'] and msg.get('content')
+        ]
+        conversation_context += "\n\nRecent conversation context:\n" + format_messages(recent_history)
+
+    # Enhanced prompt with context
+    return f"""{system_prompt}
+
+{conversation_context}
+
+{f"Additional Context: {context}" if context else ""}
+
+Current Student Question: {question}
+
+Please provide a comprehensive, educational response that helps the student understand the concept thoroughly while maintaining the conversation flow and referencing relevant points from our previous discussion."""
+
+
+def get_ai_response(question: str, context: str = "", chat_history: list = None,
+                    message_count: int = None, summary: str = ""):
     """Generate AI response for doubt solving with conversation context."""
     try:
-        # Try to import Vertex SDK lazily; return None if unavailable
-        try:
-            import vertexai
-            from vertexai.generative_models import GenerativeModel
-        except Exception:
+        # Cached model from the LLM gateway; None if Vertex is unavailable
+        model = get_model(Config.VERTEX_MODEL_NAME)
+        if model is None:
             return None
 
-        # Set up credentials
-        project_id = Config.GOOGLE_CLOUD_PROJECT
-        location = Config.GOOGLE_CLOUD_LOCATION
-        credentials_base64 = Config.VERTEX_DEFAULT_CREDENTIALS
+        full_prompt = _build_chat_prompt(question, context, chat_history, message_count, summary)
+        response = model.generate_content(full_prompt)
+        return response.text.strip() if response.text else None
 
-        # Convert base64 to credentials
-        credentials = service_account.Credentials.from_service_account_info(
-            json.loads(base64.b64decode(credentials_base64))
-        )
+    except Exception as e:
+        return None
 
-        vertexai.init(project=project_id, location=location,
-                      credentials=credentials)
-        model_name = Config.VERTEX_MODEL_NAME
-        model = GenerativeModel(model_name=model_name)
 
-        # Build comprehensive prompt with conversation context
-        base_context = ""
-        if chat_history and len(chat_history) > 0:
-            base_context = f" You are in an ongoing conversation with the user. Remember the context from previous messages in this session to provide more personalized and coherent responses. This is message #{len(chat_history) + 1} in the current session."
+def stream_ai_response(question: str, context: str = "", chat_history: list = None,
+                       message_count: int = None, summary: str = ""):
+    """Yield the AI response for doubt solving as text chunks.
 
-        system_prompt = SYSTEM_PROMPT + base_context
+    Yields nothing if Vertex AI is unavailable or fails before the first
+    chunk; callers fall back to the canned response in that case.
+    """
+    model = get_model(Config.VERTEX_MODEL_NAME)
+    if model is None:
+        return
 
-        # Build conversation context from chat history
-        conversation_context = ""
-        if chat_history and len(chat_history) > 0:
-            # Take the last 10 messages to maintain recent context while staying within token limits
-            recent_history = chat_history[-10:] if len(
-                chat_history) > 10 else chat_history
+    full_prompt = _build_chat_prompt(question, context, chat_history, message_count, summary)
+    try:
+        for chunk in model.generate_content(full_prompt, stream=True):
+            try:
+                text = chunk.text
+            except Exception:
+                # Chunks without text parts (e.g. safety metadata)
+                continue
+            if text:
+                yield text
+    except Exception:
+        return
 
-            conversation_context = "\n\nRecent conversation context:\n"
-            for msg in recent_history:
-                if msg and isinstance(msg, dict) and msg.get('role') in ['user', 'assistant'] and msg.get('content'):
-                    role_name = "Student" if msg['role'] == 'user' else "Tutor"
-                    conversation_context += f"{role_name}: {msg['content']}\n"
 
-        # Enhanced prompt with context
-        full_prompt = f"""{system_prompt}
+def _fallback_chat_response(question: str) -> str:
+    """Canned response used when the AI service is unavailable."""
+    return f"""I understand you're asking about "{question}". Let me help you with this topic.
 
-{conversation_context}
+This appears to be an important concept that requires careful explanation. Here's how I would approach this:
 
-{f"Additional Context: {context}" if context else ""}
+**Key Points to Consider:**
+1. Understanding the fundamental principles
+2. Breaking down the problem step by step
+3. Applying the concepts practically
+4. Common mistakes to avoid
 
-Current Student Question: {question}
+**Suggested Approach:**
+- Start with the basics and build up your understanding
+- Practice with simpler examples first
+- Ask follow-up questions if anything is unclear
 
-Please provide a comprehensive, educational response that helps the student understand the concept thoroughly while maintaining the conversation flow and referencing relevant points from our previous discussion."""
+Would you like me to elaborate on any specific aspect of this topic?"""
 
-        response = model.generate_content(full_prompt)
-        return response.text.strip() if response.text else None
 
-    except Exception as e:
-        return None
+def _session_owner_query(session_id, user_email, user_id):
+    """Filter matching a chat session only if it belongs to the caller."""
+    query = {"_id": ObjectId(session_id)}
+    if user_email:
+        query["userEmail"] = user_email
+    elif user_id:
+        query["userId"] = user_id
+    return query
+
+
+def _conversation_context(data, session_id, user_email, user_id):
+    """Resolve the prompt context for a chat turn.
+
+    For a stored session the server reads back its newest messages and rolling
+    summary; chatHistory from the client is only honoured for session-less
+    callers that keep their own conversation. Either way the history is
+    packed into Config.CONTEXT_TOKEN_BUDGET_CHAT.
+
+    Returns:
+        (window, message_count) — window as returned by build_context.
+    """
+    if not session_id:
+        chat_history = data.get('chatHistory') or []
+        return build_context(chat_history, len(chat_history)), len(chat_history)
+
+    session = _chat_sessions_col().find_one(
+        _session_owner_query(session_id, user_email, user_id),
+        {
+            "messages": {"$slice": -Config.CONTEXT_HISTORY_FETCH_LIMIT},
+            "messageCount": 1,
+            "summary": 1,
+            "summarizedCount": 1
+        }
+    )
+    if not session:
+        return build_context([], 0), 0
+    messages = session.get("messages", [])
+    message_count = session.get("messageCount", len(messages))
+    window = build_context(
+        messages, message_count,
+        summary=session.get("summary", ""),
+        summarized_count=session.get("summarizedCount", 0)
+    )
+    return window, message_count
+
+
+def _refresh_chat_summary(session_id, user_email, user_id, window):
+    """Queue folding the messages that left the context window into the session summary."""
+    if not session_id or not window["pending"]:
+        return
+
+    def _store(summary, summarized_count):
+        query = _session_owner_query(session_id, user_email, user_id)
+        # Never let a slower concurrent refresh move the summary backwards
+        query["$or"] = [
+            {"summarizedCount": {"$lt": summarized_count}},
+            {"summarizedCount": {"$exists": False}}
+        ]
+        _chat_sessions_col().update_one(query, {"$set": {
+            "summary": summary,
+            "summarizedCount": summarized_count
+        }})
+
+    submit_summary_refresh(("chat", session_id), window, _store)
+
+
+def _persist_chat_turn(session_id, user_email, user_id, user_message, ai_response):
+    """Append the new user/assistant pair to the chat session."""
+    timestamp = datetime.utcnow().isoformat()
+    new_messages = [
+        {"role": "user", "content": user_message, "timestamp": timestamp},
+        {"role": "assistant", "content": ai_response, "timestamp": timestamp}
+    ]
+
+    _chat_sessions_col().update_one(
+        _session_owner_query(session_id, user_email, user_id),
+        {
+            "$push": {"messages": {"$each": new_messages}},
+            "$inc": {"messageCount": len(new_messages)},
+            "$set": {"lastActivity": timestamp}
+        }
+    )
+    bump_version(CHAT_SESSIONS, user_email, user_id)
+
+
+# Fields that identify a session rather than describe its content
+_SYNC_IDENTITY_FIELDS = ("_id", "id", "syncHash", "userEmail", "userId")
+
+
+def _session_hash(session):
+    """Content hash of a chat session as sent by the client, used to skip unchanged sessions."""
+    content = {k: v for k, v in session.items() if k not in _SYNC_IDENTITY_FIELDS}
+    payload = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _session_summary(session):
+    """Reduce a session fetched with a one-message slice to its sidebar summary."""
+    last = (session.pop("messages", None) or [None])[-1]
+    content = last.get("content", "") if isinstance(last, dict) else ""
+    return {
+        "id": str(session.pop("_id")),
+        "name": session.get("name"),
+        "lastActivity": session.get("lastActivity"),
+        "messageCount": session.get("messageCount", 0),
+        "preview": content[:PREVIEW_LENGTH]
+    }
+
+
+def _encode_session_cursor(summary):
+    # Sessions without lastActivity sort last; their cursor is the bare id
+    if summary["lastActivity"] is None:
+        return summary["id"]
+    return f"{summary['lastActivity']}|{summary['id']}"
+
+
+def _session_cursor_query(cursor):
+    """Keyset filter for the page after ``cursor`` in (lastActivity, _id) descending order.
+
+    Null or missing lastActivity sorts below every string, so those sessions
+    follow all dated ones and are paged by _id alone.
+    """
+    last_activity, sep, session_id = cursor.rpartition("|")
+    oid = ObjectId(session_id)
+    if not sep:
+        return {"lastActivity": None, "_id": {"$lt": oid}}
+    return {"$or": [
+        {"lastActivity": {"$lt": last_activity}},
+        {"lastActivity": last_activity, "_id": {"$lt": oid}},
+        {"lastActivity": None}
+    ]}
 
 
 # ================= Route Definitions =================
 
 @chatbot_bp.route("/api/chat/loadChat", methods=["GET"])
+@conditional_get(CHAT_SESSIONS, "userEmail", "userId")
 def load_chat_sessions():
-    """Load all chat sessions for a user by email."""
+    """Load chat sessions for a user by email.
+
+    With ``view=summary`` only session metadata is returned (name,
+    lastActivity, messageCount and a preview of the last message), one page
+    at a time: pass ``limit`` and the ``nextCursor`` of the previous page as
+    ``cursor``. Messages are then fetched per session from
+    /api/chat/session/<session_id>/messages. Without ``view`` every session
+    is returned with its messages, as before.
+    """
     user_email = request.args.get("userEmail")
     user_id = request.args.get("userId")  # Keep for backward compatibility
 
@@ -133,8 +314,11 @@ def load_chat_sessions():
     if not identifier:
         return jsonify({"error": "userEmail or userId is required"}), 400
 
+    if request.args.get("view") == "summary":
+        return _load_chat_summaries(identifier_field, identifier)
+
     try:
-        sessions = list(chat_sessions_col.find(
+        sessions = list(_chat_sessions_col().find(
             {identifier_field: identifier}).sort("lastActivity", -1))
         for s in sessions:
             fix_id(s)
@@ -153,9 +337,93 @@ def load_chat_sessions():
         return jsonify({"error": "Failed to load chat sessions"}), 500
 
 
+def _load_chat_summaries(identifier_field, identifier):
+    """Summary view of /api/chat/loadChat with keyset pagination on lastActivity."""
+    try:
+        limit = min(int(request.args.get("limit", SESSION_PAGE_SIZE)), MAX_SESSION_PAGE_SIZE)
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+
+    cursor = request.args.get("cursor")
+    query = {identifier_field: identifier}
+    try:
+        if cursor:
+            query.update(_session_cursor_query(cursor))
+    except Exception:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    try:
+        # Fetch one extra row to know whether another page exists
+        docs = list(_chat_sessions_col().find(
+            query,
+            {"name": 1, "lastActivity": 1, "messageCount": 1, "messages": {"$slice": -1}}
+        ).sort([("lastActivity", -1), ("_id", -1)]).limit(limit + 1))
+        has_more = len(docs) > limit
+        sessions = [_session_summary(doc) for doc in docs[:limit]]
+
+        response = {
+            "success": True,
+            "sessions": sessions,
+            "nextCursor": _encode_session_cursor(sessions[-1]) if has_more else None
+        }
+        if not cursor:
+            response["currentSessionId"] = sessions[0]["id"] if sessions else None
+            response["sessionCounter"] = _chat_sessions_col().count_documents(
+                {identifier_field: identifier}) + 1
+        return jsonify(response)
+    except Exception as e:
+        return jsonify({"error": "Failed to load chat sessions"}), 500
+
+
+@chatbot_bp.route("/api/chat/session/<session_id>/messages", methods=["GET"])
+def get_session_messages(session_id):
+    """Return the messages of one chat session (optionally only the last ``limit``)."""
+    user_email = request.args.get("userEmail")
+    user_id = request.args.get("userId")  # Keep for backward compatibility
+
+    if not (user_email or user_id):
+        return jsonify({"error": "userEmail or userId is required"}), 400
+
+    projection = {"messages": 1, "messageCount": 1}
+    limit = request.args.get("limit")
+    if limit:
+        try:
+            projection["messages"] = {"$slice": -max(int(limit), 1)}
+        except ValueError:
+            return jsonify({"error": "limit must be a positive integer"}), 400
+
+    try:
+        session = _chat_sessions_col().find_one(
+            _session_owner_query(session_id, user_email, user_id), projection)
+        if not session:
+            return jsonify({"error": "Chat session not found"}), 404
+
+        messages = session.get("messages", [])
+        return jsonify({
+            "success": True,
+            "sessionId": session_id,
+            "messages": messages,
+            "messageCount": session.get("messageCount", len(messages))
+        })
+    except Exception as e:
+        return jsonify({"error": "Failed to load session messages"}), 500
+
+
 @chatbot_bp.route("/api/chat/saveChat", methods=["PUT"])
 def save_chat_sessions():
-    """Save multiple chat sessions for a user."""
+    """Sync the user's chat sessions with the list sent by the client.
+
+    Each session's content hash is stored as ``syncHash``. Sessions whose
+    hash is unchanged are skipped. A session sent as a stub
+    (``{"id", "syncHash"}`` without ``messages``) is kept as-is when its
+    hash matches the stored one; otherwise it is never written and its id
+    is returned in ``conflicts`` so the client resends it in full. New
+    sessions are inserted, changed ones replaced and sessions missing from
+    the list deleted, all in one unordered bulk write. Only the ids that
+    changed are returned; ids whose write failed are listed in ``failed``.
+    """
     data = request.get_json()
 
     if not data:
@@ -173,26 +441,93 @@ def save_chat_sessions():
         return jsonify({"error": "userEmail or userId is required"}), 400
 
     try:
-        # Remove all old sessions for this user
-        chat_sessions_col.delete_many({identifier_field: identifier})
+        stored = {
+            doc["_id"]: doc.get("syncHash")
+            for doc in _chat_sessions_col().find({identifier_field: identifier}, {"syncHash": 1})
+        }
 
-        # Insert new sessions
+        ops, op_ids = [], []
+        kept = set()
+        inserted, updated, conflicts, versions = [], [], [], {}
         for session in sessions:
-            if session:
-                session_id = session.get(
-                    "id") if "id" in session and session["id"] else None
-                session["_id"] = ObjectId(
-                    session_id) if session_id else ObjectId()
-                session[identifier_field] = identifier
-                # Keep both fields for transitional period
-                if user_email:
-                    session["userEmail"] = user_email
-                if user_id:
-                    session["userId"] = user_id
-                chat_sessions_col.replace_one(
-                    {"_id": session["_id"]}, session, upsert=True)
-
-        return jsonify({"success": True})
+            if not session:
+                continue
+            session_id = session.get("id") or session.get("_id")
+            oid = ObjectId(session_id) if session_id else None
+
+            if "messages" not in session:
+                # A stub only vouches for content we already hold
+                if oid in stored:
+                    kept.add(oid)
+                    if session.get("syncHash") is not None and session.get("syncHash") == stored[oid]:
+                        continue
+                if session_id:
+                    conflicts.append(str(session_id))
+                continue
+
+            sync_hash = _session_hash(session)
+            if oid in stored and stored[oid] == sync_hash:
+                kept.add(oid)
+                continue
+
+            doc = {k: v for k, v in session.items() if k not in _SYNC_IDENTITY_FIELDS}
+            doc["syncHash"] = sync_hash
+            if "messages" in doc:
+                doc["messageCount"] = len(doc["messages"])
+            # Keep both fields for transitional period
+            doc[identifier_field] = identifier
+            if user_email:
+                doc["userEmail"] = user_email
+            if user_id:
+                doc["userId"] = user_id
+
+            if oid in stored:
+                kept.add(oid)
+                ops.append(ReplaceOne({"_id": oid, identifier_field: identifier}, doc))
+                updated.append(str(oid))
+            else:
+                doc["_id"] = oid or ObjectId()
+                ops.append(InsertOne(doc))
+                inserted.append(str(doc["_id"]))
+            op_ids.append(str(doc.get("_id", oid)))
+            versions[str(oid or doc["_id"])] = sync_hash
+
+        deleted = [oid for oid in stored if oid not in kept]
+        if deleted:
+            ops.append(DeleteMany({"_id": {"$in": deleted}, identifier_field: identifier}))
+            op_ids.append(None)
+
+        failed = []
+        if ops:
+            try:
+                _chat_sessions_col().bulk_write(ops, ordered=False)
+            except BulkWriteError as bwe:
+                # Unordered: every other operation was still applied
+                for error in bwe.details.get("writeErrors", []):
+                    failed_id = op_ids[error["index"]]
+                    if failed_id is None:
+                        deleted = []
+                        failed.append({"id": None, "error": "Failed to delete removed sessions"})
+                        continue
+                    duplicate = error.get("code") == 11000
+                    failed.append({
+                        "id": failed_id,
+                        "error": "Session id belongs to another chat" if duplicate else "Failed to save session",
+                    })
+                    versions.pop(failed_id, None)
+                    inserted = [i for i in inserted if i != failed_id]
+                    updated = [i for i in updated if i != failed_id]
+            bump_version(CHAT_SESSIONS, user_email, user_id)
+
+        return jsonify({
+            "success": not failed,
+            "inserted": inserted,
+            "updated": updated,
+            "deleted": [str(oid) for oid in deleted],
+            "conflicts": conflicts,
+            "failed": failed,
+            "versions": versions
+        }), 207 if failed else 200
     except Exception as e:
         return jsonify({"error": "Failed to save chat sessions"}), 500
 
@@ -230,7 +565,8 @@ def create_chat_session():
         if user_id:
             session["userId"] = user_id
 
-        result = chat_sessions_col.insert_one(session)
+        result = _chat_sessions_col().insert_one(session)
+        bump_version(CHAT_SESSIONS, user_email, user_id)
         session["id"] = str(result.inserted_id)
         session["_id"] = result.inserted_id
 
@@ -241,7 +577,11 @@ def create_chat_session():
 
 @chatbot_bp.route("/api/chat/updateMessages/<session_id>/messages", methods=["PUT"])
 def update_session_messages(session_id):
-    """Update messages in a specific chat session."""
+    """Append messages to a specific chat session.
+
+    The body's ``messages`` are only the new messages; they are pushed onto
+    the stored list, never replacing it.
+    """
     data = request.get_json()
 
     if not data:
@@ -259,14 +599,15 @@ def update_session_messages(session_id):
         return jsonify({"error": "userEmail or userId is required"}), 400
 
     try:
-        result = chat_sessions_col.update_one(
+        result = _chat_sessions_col().update_one(
             {"_id": ObjectId(session_id), identifier_field: identifier},
-            {"$set": {
-                "messages": messages,
-                "lastActivity": datetime.utcnow().isoformat(),
-                "messageCount": len(messages)
-            }}
+            {
+                "$push": {"messages": {"$each": messages}},
+                "$inc": {"messageCount": len(messages)},
+                "$set": {"lastActivity": datetime.utcnow().isoformat()}
+            }
         )
+        bump_version(CHAT_SESSIONS, user_email, user_id)
 
         return jsonify({"success": result.modified_count > 0})
     except Exception as e:
@@ -287,16 +628,16 @@ def delete_chat_session(session_id):
         return jsonify({"error": "userEmail or userId is required"}), 400
 
     try:
-        chat_sessions_col.delete_one(
+        result = _chat_sessions_col().delete_one(
             {"_id": ObjectId(session_id), identifier_field: identifier})
+        bump_version(CHAT_SESSIONS, user_email, user_id)
 
-        # Return remaining sessions for this user
-        sessions = list(chat_sessions_col.find(
-            {identifier_field: identifier}).sort("lastActivity", -1))
-        for s in sessions:
-            fix_id(s)
-
-        return jsonify({"success": True, "remainingSessions": sessions})
+        # Clients drop the session from their own list; reload summaries if needed
+        return jsonify({
+            "success": True,
+            "deletedId": session_id,
+            "deleted": result.deleted_count > 0
+        })
     except Exception as e:
         return jsonify({"error": "Failed to delete chat session"}), 500
 
@@ -320,10 +661,11 @@ def update_session_activity(session_id):
         return jsonify({"error": "userEmail or userId is required"}), 400
 
     try:
-        result = chat_sessions_col.update_one(
+        result = _chat_sessions_col().update_one(
             {"_id": ObjectId(session_id), identifier_field: identifier},
             {"$set": {"lastActivity": datetime.utcnow().isoformat()}}
         )
+        bump_version(CHAT_SESSIONS, user_email, user_id)
 
         return jsonify({"success": result.modified_count > 0})
     except Exception as e:
@@ -341,68 +683,35 @@ def send_message():
     user_message = data.get('input', '').strip()
     user_email = data.get('userEmail')
     user_id = data.get('userId')  # Keep for backward compatibility
-    chat_history = data.get('chatHistory', [])
     session_id = data.get('sessionId')
 
     # Prefer email over userId for identification
     identifier = user_email if user_email else user_id
-    identifier_field = "userEmail" if user_email else "userId"
 
     if not user_message or not identifier:
         return jsonify({"error": "Message and userEmail/userId are required"}), 400
 
     try:
+        window, message_count = _conversation_context(
+            data, session_id, user_email, user_id)
 
-        # Get AI response with full conversation context
+        # Get AI response with budgeted conversation context
         ai_response = get_ai_response(
-            user_message, context="", chat_history=chat_history)
+            user_message, context="", chat_history=window["messages"],
+            message_count=message_count, summary=window["summary"])
 
         if not ai_response:
             # Fallback response
-            ai_response = f"""I understand you're asking about "{user_message}". Let me help you with this topic.
-
-This appears to be an important concept that requires careful explanation. Here's how I would approach this:
-
-**Key Points to Consider:**
-1. Understanding the fundamental principles
-2. Breaking down the problem step by step
-3. Applying the concepts practically
-4. Common mistakes to avoid
-
-**Suggested Approach:**
-- Start with the basics and build up your understanding
-- Practice with simpler examples first
-- Ask follow-up questions if anything is unclear
-
-Would you like me to elaborate on any specific aspect of this topic?"""
+            ai_response = _fallback_chat_response(user_message)
 
         # Update session if session_id is provided
         if session_id:
             try:
-                # Add the new messages to the session
-                updated_history = chat_history + [
-                    {"role": "user", "content": user_message,
-                        "timestamp": datetime.utcnow().isoformat()},
-                    {"role": "assistant", "content": ai_response,
-                        "timestamp": datetime.utcnow().isoformat()}
-                ]
-
-                update_query = {"_id": ObjectId(session_id)}
-                if user_email:
-                    update_query["userEmail"] = user_email
-                elif user_id:
-                    update_query["userId"] = user_id
-
-                chat_sessions_col.update_one(
-                    update_query,
-                    {"$set": {
-                        "messages": updated_history,
-                        "lastActivity": datetime.utcnow().isoformat(),
-                        "messageCount": len(updated_history)
-                    }}
-                )
+                _persist_chat_turn(session_id, user_email, user_id,
+                                   user_message, ai_response)
             except Exception as session_error:
                 return jsonify({"error": "Failed to update chat session with new messages"}), 500
+            _refresh_chat_summary(session_id, user_email, user_id, window)
 
         response_data = {
             "success": True,
@@ -416,6 +725,69 @@ Would you like me to elaborate on any specific aspect of this topic?"""
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 
+@chatbot_bp.route('/api/chat/message/stream', methods=['POST'])
+def send_message_stream():
+    """Streaming variant of /api/chat/message using Server-Sent Events.
+
+    Same JSON body as /api/chat/message. Emits ``token`` events with
+    ``{"text": ...}`` as the model generates, then a single ``done`` event
+    with the full message once the turn has been persisted (or ``error``).
+    """
+    data = request.get_json()
+
+    if not data:
+        return jsonify({"error": "No JSON data provided"}), 400
+
+    user_message = data.get('input', '').strip()
+    user_email = data.get('userEmail')
+    user_id = data.get('userId')  # Keep for backward compatibility
+    session_id = data.get('sessionId')
+
+    identifier = user_email if user_email else user_id
+
+    if not user_message or not identifier:
+        return jsonify({"error": "Message and userEmail/userId are required"}), 400
+
+    try:
+        window, message_count = _conversation_context(
+            data, session_id, user_email, user_id)
+    except Exception:
+        return jsonify({"error": "Failed to load chat session"}), 500
+
+    def generate():
+        parts = []
+        for text in stream_ai_response(user_message, context="", chat_history=window["messages"],
+                                       message_count=message_count, summary=window["summary"]):
+            parts.append(text)
+            yield sse_event("token", {"text": text})
+
+        ai_response = "".join(parts).strip()
+        if not ai_response:
+            ai_response = _fallback_chat_response(user_message)
+            yield sse_event("token", {"text": ai_response})
+
+        # Persist only once the full answer is known
+        if session_id:
+            try:
+                _persist_chat_turn(session_id, user_email, user_id,
+                                   user_message, ai_response)
+            except Exception:
+                yield sse_event("error", {"error": "Failed to update chat session with new messages"})
+                return
+
+        yield sse_event("done", {
+            "success": True,
+            "message": ai_response,
+            "timestamp": datetime.utcnow().isoformat()
+        })
+
+        # Folding old turns runs in the background, off this connection
+        if session_id:
+            _refresh_chat_summary(session_id, user_email, user_id, window)
+
+    return sse_response(generate())
+
+
 # Legacy endpoints for backward compatibility
 @chatbot_bp.route("/api/chat/ask", methods=["POST"])
 def ask_question():
@@ -452,25 +824,11 @@ def ask_question():
 
     # Get AI response directly
     try:
-        ai_response = get_ai_response(question, context, chat_history)
+        window = build_context(chat_history, len(chat_history))
+        ai_response = get_ai_response(question, context, window["messages"])
 
         if not ai_response:
-            ai_response = f"""I understand you're asking about "{question}". Let me help you with this topic.
-
-This appears to be an important concept that requires careful explanation. Here's how I would approach this:
-
-**Key Points to Consider:**
-1. Understanding the fundamental principles
-2. Breaking down the problem step by step
-3. Applying the concepts practically
-4. Common mistakes to avoid
-
-**Suggested Approach:**
-- Start with the basics and build up your understanding
-- Practice with simpler examples first
-- Ask follow-up questions if anything is unclear
-
-Would you like me to elaborate on any specific aspect of this topic?"""
+            ai_response = _fallback_chat_response(question)
 
         # Transform response back to legacy format
         legacy_response = {
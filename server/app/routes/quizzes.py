@@ -7,36 +7,125 @@ from flask import Blueprint, request, jsonify
 import uuid
 import os
 from datetime import datetime
-from pymongo import MongoClient
 from bson import ObjectId
-from ..utils.quizzes_utils import create_quiz
-from ..config import Config
+from ..utils.quizzes_utils import build_quiz
+from ..utils.quiz_grading import get_answer_key, get_answer_keys, grade, invalidate_answer_key, validate_answers
+from ..utils.mongo_utils import get_collection
+from ..utils.user_stats import record_quiz_attempt, reset_quiz_stats
+from ..utils.quiz_analytics import clear_daily_rollups, get_breakdowns, get_trend, record_daily_rollup
+from ..utils.resource_versions import QUIZZES, QUIZ_HISTORY, bump_version, conditional_get
 
 quizzes_bp = Blueprint("quizzes", __name__)
 
-# MongoDB connection
-try:
-    mongo_uri = Config.MONGODB_URI
-    db_name = Config.MONGODB_DB_NAME
-    mongo_collection_name_1 = Config.MONGODB_QUIZ_COLLECTION
-    mongo_collection_name_2 = Config.MONGODB_QUIZ_HISTORY_COLLECTION
 
-    client = MongoClient(mongo_uri)
-    db = client[db_name]
-    quizzes_collection = db[mongo_collection_name_1]
-    quiz_history_collection = db[mongo_collection_name_2]
+def _quizzes_collection():
+    """Return the saved quizzes collection from the shared MongoDB client."""
+    return get_collection("MONGODB_QUIZ_COLLECTION")
 
-except Exception as e:
-    # Fallback to in-memory storage if MongoDB is not available
-    quizzes_storage = []
-    quiz_history = []
+
+def _quiz_history_collection():
+    """Return the quiz history collection from the shared MongoDB client."""
+    return get_collection("MONGODB_QUIZ_HISTORY_COLLECTION")
+
+
+# Maximum submissions graded by one /api/quizzes/submit/batch call
+MAX_BATCH_SUBMISSIONS = 200
+
+# Users one /api/quiz-analytics call may span (a teacher's class view)
+MAX_ANALYTICS_USERS = 500
+
+# Trend periods returned by default and at most, per granularity
+DEFAULT_TREND_PERIODS = {"week": 12, "day": 30}
+MAX_TREND_PERIODS = {"week": 104, "day": 366}
+
+# Catalogue listing page size
+CATALOGUE_PAGE_SIZE = 24
+MAX_CATALOGUE_PAGE_SIZE = 100
+
+# Only what the browse cards show; the question count is computed server-side
+CATALOGUE_PROJECTION = {
+    "id": 1,
+    "topic": 1,
+    "difficulty": 1,
+    "created_at": 1,
+    "created_by": 1,
+    "num_questions": {"$ifNull": ["$num_questions", {"$size": {"$ifNull": ["$questions", []]}}]},
+}
+
+
+def _format_quiz_item(quiz, include_data=True):
+    """Shape a stored quiz into the browse list item the client renders."""
+    num_questions = quiz.get("num_questions")
+    if num_questions is None:
+        num_questions = len(quiz.get("questions", []))
+    difficulty = quiz.get("difficulty", "medium")
+    item = {
+        "id": quiz["id"],
+        "title": quiz.get("topic"),
+        "category": "AI Generated",
+        "questions": num_questions,
+        "difficulty": difficulty.title(),
+        "duration": f"{num_questions * 1.5:.0f} min",
+        "description": f"Quiz about {quiz.get('topic')} - {difficulty} level",
+        "completed": False,
+        "score": None,
+        "created_at": quiz.get("created_at"),
+        "created_by": quiz.get("created_by", "anonymous@example.com")
+    }
+    if include_data:
+        quiz['_id'] = str(quiz['_id'])
+        item["quiz_data"] = quiz  # Include full quiz data for taking the quiz
+    return item
+
+
+def _catalogue_cursor_query(cursor):
+    """Keyset filter for the page after ``cursor`` in (created_at, _id) descending order."""
+    created_at, _, mongo_id = cursor.rpartition("|")
+    oid = ObjectId(mongo_id)
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": oid}}
+    ]}
+
+
+def _quiz_catalogue(user_email):
+    """Catalogue view of GET /api/tools/quizzes: summary fields only, newest first, paged."""
+    try:
+        limit = min(int(request.args.get("limit", CATALOGUE_PAGE_SIZE)), MAX_CATALOGUE_PAGE_SIZE)
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+
+    query = {"created_by": user_email}
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            query.update(_catalogue_cursor_query(cursor))
+        except Exception:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+    # Fetch one extra row to know whether another page exists
+    docs = list(_quizzes_collection().find(query, CATALOGUE_PROJECTION)
+                .sort([("created_at", -1), ("_id", -1)]).limit(limit + 1))
+    page = docs[:limit]
+    next_cursor = None
+    if len(docs) > limit:
+        last = page[-1]
+        next_cursor = f"{last.get('created_at') or ''}|{last['_id']}"
+
+    return jsonify({
+        "quizzes": [_format_quiz_item(quiz, include_data=False) for quiz in page],
+        "nextCursor": next_cursor
+    })
 
 
 @quizzes_bp.route("/api/quizzes/generate", methods=["POST"])
 def generate_quiz():
     """Generate a quiz from provided topic text or summary.
 
-    Expected JSON: {"topic": "...", "difficulty": "easy|medium|hard", "numberOfQuestions": 5-20}
+    Expected JSON: {"topic": "...", "difficulty": "easy|medium|hard", "numberOfQuestions": 5-20,
+                    "user_email": "..." (optional, avoids repeating banked questions)}
     Returns: Generated quiz structure with questions
     """
     try:
@@ -59,8 +148,8 @@ def generate_quiz():
         if not isinstance(num_questions, int) or num_questions < 5 or num_questions > 20:
             return jsonify({"error": "Number of questions must be between 5 and 20"}), 400
         
-        # Generate quiz using the unified create_quiz function
-        quiz_data = create_quiz(topic, difficulty, num_questions)
+        # Question bank first; the model only generates the shortfall
+        quiz_data = build_quiz(topic, difficulty, num_questions, data.get("user_email"))
         
         if not quiz_data:
             return jsonify({"error": "Failed to generate quiz"}), 500
@@ -72,10 +161,14 @@ def generate_quiz():
 
 
 @quizzes_bp.route("/api/tools/quizzes", methods=["GET", "POST"])
+@conditional_get(QUIZZES, "user_email")
 def manage_quizzes():
     """Handle quiz management.
     
-    GET: Fetch all saved quizzes for browsing
+    GET: Fetch all saved quizzes for browsing. With ``view=catalogue`` only
+         summary fields are returned, newest first, one page at a time
+         (``limit``, ``cursor`` -> ``{"quizzes": [...], "nextCursor": ...}``);
+         open a quiz with GET /api/tools/quizzes/<quiz_id>.
     POST: Save a generated quiz to the browsing list
     """
     
@@ -86,27 +179,13 @@ def manage_quizzes():
             
             if not user_email:
                 return jsonify({"error": "user_email parameter is required"}), 400
+
+            if request.args.get("view") == "catalogue":
+                return _quiz_catalogue(user_email)
             
             # Fetch quizzes for the specific user from MongoDB
-            quizzes_cursor = quizzes_collection.find({"created_by": user_email})
-            formatted_quizzes = []
-            
-            for quiz in quizzes_cursor:
-                # Convert ObjectId to string for JSON serialization
-                quiz['_id'] = str(quiz['_id'])
-                formatted_quizzes.append({
-                    "id": quiz["id"],
-                    "title": quiz["topic"],
-                    "category": "AI Generated",
-                    "questions": len(quiz["questions"]),
-                    "difficulty": quiz["difficulty"].title(),
-                    "duration": f"{len(quiz['questions']) * 1.5:.0f} min",
-                    "description": f"Quiz about {quiz['topic']} - {quiz['difficulty']} level",
-                    "completed": False,
-                    "score": None,
-                    "quiz_data": quiz,  # Include full quiz data for taking the quiz
-                    "created_by": quiz.get("created_by", "anonymous@example.com")
-                })
+            quizzes_cursor = _quizzes_collection().find({"created_by": user_email})
+            formatted_quizzes = [_format_quiz_item(quiz) for quiz in quizzes_cursor]
             
             return jsonify(formatted_quizzes)
             
@@ -139,7 +218,8 @@ def manage_quizzes():
             }
             
             # Insert into MongoDB
-            result = quizzes_collection.insert_one(quiz_entry)
+            result = _quizzes_collection().insert_one(quiz_entry)
+            bump_version(QUIZZES, user_email)
             
             return jsonify({
                 "message": "Quiz saved successfully",
@@ -151,6 +231,26 @@ def manage_quizzes():
             return jsonify({"error": f"Failed to save quiz: {str(e)}"}), 500
 
 
+@quizzes_bp.route("/api/tools/quizzes/<quiz_id>", methods=["GET"])
+def get_quiz(quiz_id):
+    """Fetch one saved quiz with its questions, for when the user opens it.
+
+    Query params:
+    - user_email: The quiz owner
+    """
+    user_email = request.args.get('user_email')
+    if not user_email:
+        return jsonify({"error": "user_email parameter is required"}), 400
+
+    try:
+        quiz = _quizzes_collection().find_one({"id": quiz_id, "created_by": user_email})
+        if not quiz:
+            return jsonify({"error": "Quiz not found"}), 404
+        return jsonify(_format_quiz_item(quiz))
+    except Exception as e:
+        return jsonify({"error": f"Failed to load quiz: {str(e)}"}), 500
+
+
 @quizzes_bp.route("/api/tools/quizzes/<quiz_id>", methods=["DELETE"])
 def delete_quiz(quiz_id):
     """Delete a quiz by UUID.
@@ -159,10 +259,14 @@ def delete_quiz(quiz_id):
     """
     try:
         # Delete from MongoDB using the custom UUID field
-        result = quizzes_collection.delete_one({"id": quiz_id})
+        deleted = _quizzes_collection().find_one_and_delete(
+            {"id": quiz_id}, projection={"created_by": 1})
         
-        if result.deleted_count == 0:
+        if deleted is None:
             return jsonify({"error": "Quiz not found"}), 404
+
+        invalidate_answer_key(quiz_id)
+        bump_version(QUIZZES, deleted.get("created_by"))
         
         return jsonify({
             "message": "Quiz deleted successfully",
@@ -188,53 +292,81 @@ def submit_quiz():
         
         quiz_id = data.get("quiz_id")
         answers = data.get("answers", [])
+        answers_error = validate_answers(answers)
+        if answers_error:
+            return jsonify({"error": answers_error}), 400
         
-        # Find the quiz in MongoDB
-        quiz = quizzes_collection.find_one({"id": quiz_id})
+        # Answer key from the in-process cache (loaded once per quiz)
+        answer_key = get_answer_key(quiz_id)
         
-        if not quiz:
+        if answer_key is None:
             return jsonify({"error": "Quiz not found"}), 404
         
-        # Calculate score and feedback
-        questions = quiz["questions"]
-        total_questions = len(questions)
-        correct_count = 0
-        feedback = []
+        return jsonify(grade(answer_key, answers))
         
-        # Create answer lookup
-        answer_lookup = {ans["id"]: ans["answer"] for ans in answers}
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@quizzes_bp.route("/api/quizzes/submit/batch", methods=["POST"])
+def submit_quiz_batch():
+    """Grade many submissions in one call (e.g. a whole class taking one quiz).
+
+    Expected JSON: {"submissions": [{"quiz_id": "...", "answers": [...], "submission_id": optional}]}
+    Returns: {"results": [...]} in submission order; each result is the
+    /api/quizzes/submit response plus quiz_id and submission_id, or an
+    {"error": ...} entry for a malformed submission or an unknown quiz.
+    """
+    try:
+        data = request.get_json()
         
-        for question in questions:
-            question_id = question["id"]
-            user_answer = answer_lookup.get(question_id)
-            correct_answer = question["correctAnswer"]
-            is_correct = user_answer == correct_answer
-            
-            if is_correct:
-                correct_count += 1
-            
-            feedback.append({
-                "question_id": question_id,
-                "question": question["question"],
-                "user_answer": user_answer,
-                "correct_answer": correct_answer,
-                "is_correct": is_correct,
-                "options": question["options"]
-            })
+        if not data:
+            return jsonify({"error": "No JSON data provided"}), 400
         
-        score_percentage = round((correct_count / total_questions) * 100)
+        submissions = data.get("submissions")
+        if not isinstance(submissions, list) or not submissions:
+            return jsonify({"error": "submissions must be a non-empty list"}), 400
+        if len(submissions) > MAX_BATCH_SUBMISSIONS:
+            return jsonify({"error": f"At most {MAX_BATCH_SUBMISSIONS} submissions per batch"}), 400
         
-        return jsonify({
-            "score": correct_count,
-            "total": total_questions,
-            "percentage": score_percentage,
-            "feedback": feedback
-        })
+        # A malformed submission gets an error entry instead of failing the batch
+        errors = []
+        for submission in submissions:
+            if not isinstance(submission, dict):
+                errors.append("submission must be an object")
+            elif not isinstance(submission.get("quiz_id"), str):
+                errors.append("quiz_id must be a string")
+            else:
+                errors.append(validate_answers(submission.get("answers", [])))
+        
+        # Distinct quizzes are resolved together: one query for all cache misses
+        answer_keys = get_answer_keys(
+            s["quiz_id"] for s, error in zip(submissions, errors) if error is None)
+        
+        results = []
+        for submission, error in zip(submissions, errors):
+            if not isinstance(submission, dict):
+                results.append({"error": error, "quiz_id": None, "submission_id": None})
+                continue
+            quiz_id = submission.get("quiz_id")
+            answer_key = answer_keys.get(quiz_id) if error is None else None
+            if error is not None:
+                result = {"error": error}
+            elif answer_key is None:
+                result = {"error": "Quiz not found"}
+            else:
+                result = grade(answer_key, submission.get("answers", []))
+            result["quiz_id"] = quiz_id
+            result["submission_id"] = submission.get("submission_id")
+            results.append(result)
+        
+        return jsonify({"results": results})
         
     except Exception as e:
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 @quizzes_bp.route("/api/quiz-history", methods=["GET", "POST", "DELETE"])
+@conditional_get(QUIZ_HISTORY, "user_email")
 def quiz_history_endpoint():
     """Handle quiz history operations."""
     
@@ -247,7 +379,7 @@ def quiz_history_endpoint():
                 return jsonify({"error": "user_email parameter is required"}), 400
             
             # Get quiz history for the specific user from MongoDB, sorted by completion date (newest first)
-            history_cursor = quiz_history_collection.find({"userId": user_email}).sort("completedAt", -1)
+            history_cursor = _quiz_history_collection().find({"userId": user_email}).sort("completedAt", -1)
             history_list = []
             
             for entry in history_cursor:
@@ -289,7 +421,15 @@ def quiz_history_endpoint():
             }
 
             # Insert into MongoDB
-            result = quiz_history_collection.insert_one(history_entry)
+            result = _quiz_history_collection().insert_one(history_entry)
+            bump_version(QUIZ_HISTORY, user_email)
+            # Dashboard counters are updated in place; no history scan on read
+            record_quiz_attempt(user_email, history_entry["correctAnswers"],
+                                history_entry["totalQuestions"], history_entry["percentage"],
+                                history_entry["completedAt"])
+            record_daily_rollup(user_email, history_entry["correctAnswers"],
+                                history_entry["totalQuestions"], history_entry["percentage"],
+                                history_entry["completedAt"])
 
             return jsonify({
                 "message": "Quiz history logged successfully", 
@@ -310,7 +450,10 @@ def quiz_history_endpoint():
                 return jsonify({"error": "user_email parameter is required"}), 400
             
             # Delete quiz history documents for the specific user
-            result = quiz_history_collection.delete_many({"userId": user_email})
+            result = _quiz_history_collection().delete_many({"userId": user_email})
+            bump_version(QUIZ_HISTORY, user_email)
+            reset_quiz_stats(user_email)
+            clear_daily_rollups(user_email)
             
             return jsonify({
                 "message": f"Quiz history cleared successfully for user {user_email}",
@@ -318,4 +461,45 @@ def quiz_history_endpoint():
             }), 200
             
         except Exception as e:
-            return jsonify({"error": f"Failed to clear quiz history: {str(e)}"}), 500
\ No newline at end of file
+            return jsonify({"error": f"Failed to clear quiz history: {str(e)}"}), 500
+
+
+@quizzes_bp.route("/api/quiz-analytics", methods=["GET"])
+def quiz_analytics():
+    """Per-topic accuracy, difficulty breakdown and trend line for one or more users.
+
+    Query params:
+    - user_email: The user; repeat it (or comma-separate) for a class view
+    - since: Optional ISO date; breakdowns only count attempts from then on
+    - granularity: "week" (default) or "day" for the trend line
+    - periods: Number of trend points, ending with the current week/day
+    Returns: { users, totals, by_topic: [...], by_difficulty: [...], trend: [...] }
+    """
+    user_emails = []
+    for value in request.args.getlist("user_email"):
+        for email in value.split(","):
+            email = email.strip()
+            if email and email not in user_emails:
+                user_emails.append(email)
+    if not user_emails:
+        return jsonify({"error": "user_email parameter is required"}), 400
+    if len(user_emails) > MAX_ANALYTICS_USERS:
+        return jsonify({"error": f"At most {MAX_ANALYTICS_USERS} users per request"}), 400
+
+    granularity = request.args.get("granularity", "week")
+    if granularity not in DEFAULT_TREND_PERIODS:
+        return jsonify({"error": "granularity must be 'week' or 'day'"}), 400
+    try:
+        periods = int(request.args.get("periods", DEFAULT_TREND_PERIODS[granularity]))
+    except ValueError:
+        return jsonify({"error": "periods must be an integer"}), 400
+    periods = max(1, min(periods, MAX_TREND_PERIODS[granularity]))
+
+    try:
+        breakdowns = get_breakdowns(user_emails, request.args.get("since"))
+        trend = get_trend(user_emails, periods, granularity)
+        if breakdowns is None or trend is None:
+            return jsonify({"error": "Database connection is not available"}), 503
+        return jsonify(dict(breakdowns, users=len(user_emails), granularity=granularity, trend=trend))
+    except Exception as e:
+        return jsonify({"error": f"Failed to load quiz analytics: {str(e)}"}), 500
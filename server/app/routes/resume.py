@@ -9,14 +9,10 @@ import os
 import requests
 import tempfile
 import json
-import base64
-try:
-    from google.oauth2 import service_account
-except Exception:
-    service_account = None
-from ..config import Config
 import re
 from app.utils.ai_utils import _get_fallback_response
+from app.utils.llm_cache import get_or_generate
+from app.utils.llm_gateway import get_model
 
 resume_bp = Blueprint("resume", __name__)
 
@@ -186,25 +182,14 @@ def analyze_resume():
         except Exception as e:
             return jsonify({"error": f"Failed to fetch or parse resume: {str(e)}"}), 500
 
-    # Vertex AI Gemini setup (lazy import)
+    # Vertex AI Gemini model (cached by the LLM gateway)
     try:
-        try:
-            import vertexai
-            from vertexai.generative_models import GenerativeModel
-        except Exception:
+        model = get_model("gemini-2.5-pro")
+        if model is None:
             # Return a helpful fallback analysis when AI is not available
             fallback_text = _get_fallback_response(job_description or "resume analysis", context={"subject": "resume"})
             return jsonify({"analysis": {"strengths": [], "improvements": [], "match_score": 0, "summary": fallback_text}, "note": "AI service unavailable; returned fallback message."}), 200
 
-        project_id = Config.GOOGLE_CLOUD_PROJECT
-        location = Config.GOOGLE_CLOUD_LOCATION
-        credentials_base64 = Config.VERTEX_DEFAULT_CREDENTIALS
-        credentials = service_account.Credentials.from_service_account_info(
-            json.loads(base64.b64decode(credentials_base64))
-        )
-        vertexai.init(project=project_id, location=location, credentials=credentials)
-        model_name = "gemini-2.5-pro"
-        model = GenerativeModel(model_name=model_name)
         prompt = (
             "You are an expert career coach and resume analyst. "
             "Given the following resume and job description, analyze them and respond ONLY with a JSON object containing: "
@@ -215,16 +200,29 @@ def analyze_resume():
             "Do not include any extra text or explanation outside the JSON object.\n\n"
             f"Resume:\n{resume_text}\n\nJob Description:\n{job_description}"
         )
-        response = model.generate_content(prompt)
-        analysis_text = response.text or ""
+        raw_response = {}
 
-        # Parse and normalize the model response into required schema
-        try:
-            parsed = _safe_extract_json(analysis_text)
-            print(parsed)
-            normalized = _normalize_analysis(parsed)
-            print(normalized)
-        except Exception:
+        def _analyze():
+            response = model.generate_content(prompt)
+            analysis_text = response.text or ""
+            raw_response["text"] = analysis_text
+
+            # Parse and normalize the model response into required schema;
+            # None (unparseable output) is never cached
+            try:
+                parsed = _safe_extract_json(analysis_text)
+                print(parsed)
+                normalized = _normalize_analysis(parsed)
+                print(normalized)
+                return normalized
+            except Exception:
+                return None
+
+        # Identical (resume_text, job_description) pairs reuse a cached analysis
+        normalized = get_or_generate(
+            "resume", prompt, _analyze, model_name="gemini-2.5-pro")
+
+        if normalized is None:
             # Fallback: return defaults and include raw for troubleshooting
             normalized = {
                 'strengths': [],
@@ -234,7 +232,7 @@ def analyze_resume():
             }
             return jsonify({
                 "analysis": normalized,
-                "raw": analysis_text,
+                "raw": raw_response.get("text", ""),
                 "warning": "LLM response was not valid JSON; returned defaults with raw included."
             })
 
@@ -6,47 +6,23 @@ Stores and retrieves roadmaps from MongoDB.
 from flask import Blueprint, request, jsonify
 import os
 import json
-import base64
 import uuid
 from datetime import datetime
-try:
-    from google.oauth2 import service_account
-except Exception:
-    service_account = None
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 from app.utils.ai_utils import _get_fallback_response
+from app.utils.llm_cache import get_or_generate
+from app.utils.llm_gateway import get_model
+from app.utils.mongo_utils import get_collection
+from app.utils.resource_versions import ROADMAPS, bump_version, conditional_get
+from app.utils.roadmap_graph import RoadmapGraphError, build_schedule
 from ..config import Config
 
 roadmap_bp = Blueprint("roadmap", __name__)
 
-# Function to establish MongoDB connection
 
+def _roadmap_collection():
+    """Return the roadmaps collection from the shared MongoDB client (or None)."""
+    return get_collection("MONGODB_ROADMAP_COLLECTION")
 
-def connect_to_mongodb():
-    try:
-        connection_string = Config.MONGODB_URI
-        db_name = Config.MONGODB_DB_NAME
-        dynamic_collection = Config.MONGODB_ROADMAP_COLLECTION
-
-        if not connection_string or not db_name:
-            return None, None, None
-
-        # Attempt to connect with a timeout
-        client = MongoClient(connection_string)
-        # Test the connection
-        client.admin.command('ping')
-
-        db = client[db_name]
-        collection_name = dynamic_collection
-
-        return client, db, collection_name
-    except Exception as e:
-        return None, None, None
-
-
-# MongoDB setup
-client, db, collection_name = connect_to_mongodb()
 
 # In-memory fallback store for roadmaps when MongoDB is not configured
 _in_memory_roadmaps = {}
@@ -60,14 +36,10 @@ def generate_roadmap():
     Steps:
       1. Validate request
       2. Call Vertex AI to outline milestones & sequencing
-      3. Store the generated roadmap in MongoDB
-      4. Return the roadmap data
+      3. Validate the graph and compute its schedule (see app.utils.roadmap_graph)
+      4. Store the generated roadmap and schedule in MongoDB
+      5. Return the roadmap data and schedule
     """
-    # Check if MongoDB is available (if not, use in-memory fallback)
-    global client, db, collection_name
-    if db is None:
-        client, db, collection_name = connect_to_mongodb()
-
     data = request.get_json()
     goal = data.get("goal")
     background = data.get("background")  # user's current knowledge/skills
@@ -80,13 +52,10 @@ def generate_roadmap():
     if not user_email:
         return jsonify({"error": "Missing user email"}), 400
 
-    # Vertex AI Gemini setup (same as chatbot.py)
+    # Vertex AI Gemini model (cached by the LLM gateway)
     try:
-        # Lazy import of Vertex SDK; return a friendly fallback if unavailable
-        try:
-            import vertexai
-            from vertexai.generative_models import GenerativeModel
-        except Exception:
+        model = get_model(Config.VERTEX_MODEL_NAME)
+        if model is None:
             # Return a helpful fallback roadmap structure
             fallback = {
                 "nodes": [
@@ -101,18 +70,9 @@ def generate_roadmap():
                     {"from": "project", "to": "goal"}
                 ]
             }
-            return jsonify({"roadmap": fallback, "note": "AI service not available; returned a basic fallback roadmap."}), 200
+            fallback, schedule = build_schedule(fallback, duration_weeks)
+            return jsonify({"roadmap": fallback, "schedule": schedule, "note": "AI service not available; returned a basic fallback roadmap."}), 200
 
-        project_id = Config.GOOGLE_CLOUD_PROJECT
-        location = Config.GOOGLE_CLOUD_LOCATION
-        credentials_base64 = Config.VERTEX_DEFAULT_CREDENTIALS
-        credentials = service_account.Credentials.from_service_account_info(
-            json.loads(base64.b64decode(credentials_base64))
-        )
-        vertexai.init(project=project_id, location=location,
-                      credentials=credentials)
-        model_name = Config.VERTEX_MODEL_NAME
-        model = GenerativeModel(model_name=model_name)
         prompt = (
             "You are a career roadmap assistant. Given a user's goal and background, "
             "generate a learning roadmap as a directed graph in JSON. "
@@ -124,25 +84,36 @@ def generate_roadmap():
             f"Background: {background}\n"
             f"Target Duration (weeks): {duration_weeks if duration_weeks else 'Not specified'}"
         )
-        response = model.generate_content(prompt)
-        roadmap_json = response.text
+        def _generate():
+            response = model.generate_content(prompt)
+            roadmap_json = response.text
+
+            # Clean up the response if it contains markdown formatting
+            if "```json" in roadmap_json:
+                roadmap_json = roadmap_json.replace(
+                    "```json", "").replace("```", "").strip()
+            elif "```" in roadmap_json:
+                roadmap_json = roadmap_json.replace("```", "").strip()
+
+            # Remove any backticks that might be left
+            roadmap_json = roadmap_json.replace("`", "")
 
-        # Clean up the response if it contains markdown formatting
-        if "```json" in roadmap_json:
-            roadmap_json = roadmap_json.replace(
-                "```json", "").replace("```", "").strip()
-        elif "```" in roadmap_json:
-            roadmap_json = roadmap_json.replace("```", "").strip()
+            # Parse the JSON to ensure it's valid
+            return json.loads(roadmap_json)
 
-        # Remove any backticks that might be left
-        roadmap_json = roadmap_json.replace("`", "")
+        # Identical (goal, background, duration) requests reuse a cached roadmap
+        roadmap_data = get_or_generate(
+            "roadmap", prompt, _generate, model_name=Config.VERTEX_MODEL_NAME)
 
-        # Parse the JSON to ensure it's valid
-        roadmap_data = json.loads(roadmap_json)
+        # Graph work happens once here instead of on every client render
+        try:
+            roadmap_data, schedule = build_schedule(roadmap_data, duration_weeks)
+        except RoadmapGraphError as graph_error:
+            return jsonify({"error": f"Roadmap generation failed: {str(graph_error)}"}), 502
 
         # Save the roadmap to MongoDB
         try:
-            roadmap_collection = db[collection_name]
+            roadmap_collection = _roadmap_collection()
             # Create the document to save
             roadmap_document = {
                 "id": str(uuid.uuid4()),
@@ -151,20 +122,26 @@ def generate_roadmap():
                 "description": background,
                 "duration_weeks": duration_weeks,
                 "created_at": datetime.utcnow(),
-                "data": roadmap_data
+                "data": roadmap_data,
+                "schedule": schedule
             }
 
-            # Insert into MongoDB
-            roadmap_collection.insert_one(roadmap_document)
+            # Insert into MongoDB, or keep in memory when it is not configured
+            if roadmap_collection is not None:
+                roadmap_collection.insert_one(roadmap_document)
+            else:
+                _in_memory_roadmaps[roadmap_document["id"]] = roadmap_document
+            bump_version(ROADMAPS, user_email)
         except Exception as db_error:
             return jsonify({"error": f"Failed to save roadmap to database: {str(db_error)}"}), 500
 
-        return jsonify({"roadmap": roadmap_data})
+        return jsonify({"roadmap": roadmap_data, "schedule": schedule})
     except Exception as e:
         return jsonify({"error": f"Roadmap generation failed: {str(e)}"}), 500
 
 
 @roadmap_bp.route("/api/roadmap/user", methods=["GET"])
+@conditional_get(ROADMAPS, "user_email")
 def get_user_roadmaps():
     """Get all roadmaps for a specific user.
 
@@ -172,11 +149,9 @@ def get_user_roadmaps():
     - user_email: The email of the user to get roadmaps for
     """
     # Check if MongoDB is available
-    global client, db, collection_name
-    if db is None:
-        client, db, collection_name = connect_to_mongodb()
-        if db is None:
-            return jsonify({"error": "Database connection is not available"}), 503
+    roadmap_collection = _roadmap_collection()
+    if roadmap_collection is None:
+        return jsonify({"error": "Database connection is not available"}), 503
 
     user_email = request.args.get("user_email")
     if not user_email:
@@ -184,9 +159,7 @@ def get_user_roadmaps():
 
     try:
         # If DB is available, read from MongoDB
-        if db:
-            roadmap_collection = db[collection_name]
-
+        if roadmap_collection is not None:
             # Find all roadmaps for this user, sorted by creation date (newest first)
             roadmaps_cursor = roadmap_collection.find(
                 {"user_email": user_email}).sort("created_at", -1)
@@ -215,9 +188,7 @@ def get_roadmap_by_id(roadmap_id):
     - user_email: The email of the user requesting the roadmap
     """
     # Check if MongoDB is available (use in-memory fallback if not)
-    global client, db, collection_name
-    if db is None:
-        client, db, collection_name = connect_to_mongodb()
+    roadmap_collection = _roadmap_collection()
 
     if not roadmap_id:
         return jsonify({"error": "Missing roadmap_id parameter"}), 400
@@ -228,9 +199,7 @@ def get_roadmap_by_id(roadmap_id):
 
     try:
         # If DB is available, operate against MongoDB
-        if db:
-            roadmap_collection = db[collection_name]
-
+        if roadmap_collection is not None:
             # Check if roadmap exists and verify ownership
             roadmap = roadmap_collection.find_one(
                 {"id": roadmap_id, "user_email": user_email})
@@ -244,10 +213,23 @@ def get_roadmap_by_id(roadmap_id):
                     {"id": roadmap_id, "user_email": user_email})
 
                 if result.deleted_count > 0:
+                    bump_version(ROADMAPS, user_email)
                     return jsonify({"success": True, "message": "Roadmap deleted successfully"}), 200
                 else:
                     return jsonify({"error": "Failed to delete roadmap"}), 500
 
+            # Roadmaps saved before schedules existed get one on first view
+            if "schedule" not in roadmap:
+                try:
+                    roadmap["data"], roadmap["schedule"] = build_schedule(
+                        roadmap.get("data"), roadmap.get("duration_weeks"))
+                    roadmap_collection.update_one(
+                        {"_id": roadmap["_id"]},
+                        {"$set": {"data": roadmap["data"], "schedule": roadmap["schedule"]}})
+                    bump_version(ROADMAPS, user_email)
+                except RoadmapGraphError:
+                    pass
+
             # For GET method, return the roadmap
             # Convert ObjectId to string for JSON serialization
             roadmap["_id"] = str(roadmap["_id"])
@@ -265,6 +247,7 @@ def get_roadmap_by_id(roadmap_id):
 
         if request.method == "DELETE":
             _in_memory_roadmaps.pop(r.get("id"), None)
+            bump_version(ROADMAPS, user_email)
             return jsonify({"success": True, "message": "Roadmap deleted successfully"}), 200
 
         return jsonify(r)
@@ -9,12 +9,15 @@ import json
 import traceback
 from app.utils.ai_utils import (
     get_vertex_response,
-    get_chat_history,
+    stream_vertex_response,
+    get_chat_history_page,
     clear_chat_history,
     save_active_session,
     get_active_session,
     end_active_session
 )
+from app.utils.sse_utils import sse_event, sse_response
+from app.utils.resource_versions import TUTOR_HISTORY, conditional_get
 
 tutor_bp = Blueprint('tutor', __name__)
 
@@ -96,6 +99,60 @@ def tutor_ask():
         }), 200  # Return 200 with error info so frontend can still display the message
 
 
+@tutor_bp.route("/api/tutor/ask/stream", methods=["POST"])
+def tutor_ask_stream():
+    """Streaming variant of /api/tutor/ask using Server-Sent Events.
+
+    Expected JSON: same as /api/tutor/ask
+    Emits: ``token`` events {"text": str} as the answer is generated (whole
+    voice-optimized sentences when isVoiceInput), then ``done`` with the full
+    response once it has been saved to chat history.
+    """
+    data = request.get_json()
+
+    if not data:
+        return jsonify({"error": "No JSON data provided"}), 400
+
+    prompt = data.get('prompt', '').strip()
+    mode = data.get('mode', 'tutor')
+    subject = data.get('subject', 'general')
+    is_voice_input = data.get('isVoiceInput', True)
+    user_email = data.get('userEmail')
+    session_id = data.get('sessionId')
+
+    if not prompt:
+        return jsonify({"error": "Prompt is required"}), 400
+
+    if not user_email:
+        return jsonify({"error": "User email is required for conversation tracking"}), 400
+
+    context = {
+        "mode": mode,
+        "subject": subject,
+        "is_voice_input": is_voice_input,
+        "user_email": user_email,
+        "session_id": session_id
+    }
+
+    def generate():
+        parts = []
+        for segment in stream_vertex_response(prompt, context):
+            parts.append(segment)
+            yield sse_event("token", {"text": segment})
+
+        separator = ' ' if is_voice_input else ''
+        yield sse_event("done", {
+            "success": True,
+            "response": separator.join(parts).strip(),
+            "mode": mode,
+            "subject": subject,
+            "isVoiceInput": is_voice_input,
+            "timestamp": datetime.utcnow().isoformat()
+        })
+
+    return sse_response(generate())
+
+
 @tutor_bp.route("/api/tutor/session/start", methods=["POST"])
 def start_session():
     """Start a new tutoring session with voice-aware initialization.
@@ -345,18 +402,21 @@ def check_active_session():
 
 
 @tutor_bp.route("/api/tutor/chat/history", methods=["GET"])
+@conditional_get(TUTOR_HISTORY, "userEmail")
 def get_chat_history_endpoint():
     """Get chat history for a user with pagination and filtering.
 
     Query params: userEmail, limit (optional), offset (optional), sessionId (optional)
-    Returns: { success: bool, messages: list, count: int, total: int }
+      - offset counts back from the newest message (0 = most recent page)
+      - without sessionId the most recent session is used
+    Returns: { success: bool, messages: list, count: int, total: int, session_id: str }
     """
     user_email = request.args.get('userEmail')
     session_id = request.args.get('sessionId')  # Filter by session
 
     try:
         limit = int(request.args.get('limit', 50))  # Default to 50 messages
-        # Default to starting from beginning
+        # Default to the most recent page
         offset = int(request.args.get('offset', 0))
     except ValueError:
         limit = 50
@@ -366,17 +426,11 @@ def get_chat_history_endpoint():
         return jsonify({"error": "User email is required"}), 400
 
     try:
-        # Get chat history for the specific session
-        messages = get_chat_history(user_email, limit + offset, session_id)
-
-        # Get total count for pagination info
-        total_messages = len(messages)
-
-        # Apply offset and limit
-        if offset < total_messages:
-            messages = messages[offset:offset + limit]
-        else:
-            messages = []
+        # Window is resolved server-side: offset skips the newest messages
+        page = get_chat_history_page(user_email, limit, offset, session_id)
+        messages = page["messages"]
+        total_messages = page["total"]
+        session_id = page["session_id"]
 
         result = {
             "success": True,
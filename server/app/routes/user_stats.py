@@ -0,0 +1,62 @@
+"""User statistics endpoints for the dashboard.
+
+Reads a per-user stats document that the quiz-history and session-time
+write paths keep up to date, so a dashboard load is one indexed lookup.
+"""
+from flask import Blueprint, request, jsonify
+from datetime import datetime
+from app.utils.user_stats import get_user_stats, record_session_time
+
+user_stats_bp = Blueprint("user_stats", __name__)
+
+# Longest session accepted from a client, in minutes
+MAX_SESSION_MINUTES = 24 * 60
+
+
+@user_stats_bp.route("/api/user-stats", methods=["GET"])
+def user_stats():
+    """Get dashboard statistics for a user.
+
+    Query params:
+    - user_email: The email of the user
+    Returns: { total_learning_minutes, quizzes_taken, average_percentage, ... }
+    """
+    user_email = request.args.get("user_email")
+    if not user_email:
+        return jsonify({"error": "user_email parameter is required"}), 400
+
+    try:
+        stats = get_user_stats(user_email)
+        if stats is None:
+            return jsonify({"error": "Database connection is not available"}), 503
+        return jsonify(stats)
+    except Exception as e:
+        return jsonify({"error": f"Failed to load user stats: {str(e)}"}), 500
+
+
+@user_stats_bp.route("/api/user-stats/session", methods=["POST"])
+def log_session_time():
+    """Add a finished learning session to the user's total.
+
+    Expected JSON: {"user_email": "...", "session_duration": minutes, "session_date": ISO string (optional)}
+    """
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "No JSON data provided"}), 400
+
+    user_email = data.get("user_email")
+    if not user_email:
+        return jsonify({"error": "user_email is required"}), 400
+
+    try:
+        minutes = float(data.get("session_duration"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "session_duration must be a number of minutes"}), 400
+    if minutes <= 0 or minutes > MAX_SESSION_MINUTES:
+        return jsonify({"error": f"session_duration must be between 0 and {MAX_SESSION_MINUTES} minutes"}), 400
+
+    session_date = data.get("session_date") or datetime.utcnow().isoformat()
+    if not record_session_time(user_email, minutes, session_date):
+        return jsonify({"error": "Failed to save session time"}), 500
+
+    return jsonify({"message": "Session time saved successfully"}), 201
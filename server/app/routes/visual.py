@@ -2,97 +2,179 @@
 
 Adds endpoints for generating short videos from text, PDF URL, and audio URL.
 Implementation follows the approach outlined in demo.py, but uses utils to
-keep routes lean. Each route:
+keep routes lean. Rendering takes minutes, so each submit route validates
+its input and queues a background job (see app.utils.visual_jobs), returning
+202 with the job id right away. The job:
   1) Generates key moments (script + image prompts) via Vertex AI
   2) Produces AI images, speech, captions, and merges into a video
-  3) Uploads the final video to Cloudinary and returns the URL
+  3) Uploads the final video to Cloudinary and stores the URL on the job
 
-Note: Audio transcription is not implemented in the utils yet; provide
-`transcript` directly when using the audio route or extend utils accordingly.
+Poll GET /api/visual/jobs/<job_id> or stream
+GET /api/visual/jobs/<job_id>/events (SSE) for progress and the result URL.
 """
+import time
+
 from flask import Blueprint, request, jsonify
 
+from ..config import Config
+from ..utils.sse_utils import sse_event, sse_response
+from ..utils.visual_jobs import FAILED, FINISHED_STATES, QueueFullError, get_job, submit_job
 from ..utils.visual_utils import (
   generate_video_from_transcript_text,
   extract_text_from_pdf_url,
   extract_text_from_audio_url,
 )
-from ..utils.cloudinary_utils import upload_video_to_cloudinary
 
 
 visual_bp = Blueprint("visual", __name__)
 
 
+def _pdf_to_video(pdf_url, progress):
+  progress("extracting", 5)
+  text = extract_text_from_pdf_url(pdf_url)
+  return generate_video_from_transcript_text(text, progress=progress)
+
+
+def _audio_to_video(audio_url, transcript, progress):
+  if not transcript:
+    progress("transcribing", 5)
+    transcript = extract_text_from_audio_url(audio_url)
+    if not transcript:
+      raise ValueError("Transcription produced empty text")
+  return generate_video_from_transcript_text(transcript, progress=progress)
+
+
+def _accepted(job):
+  """202 response pointing the client at the job's status and event stream."""
+  job_id = job["job_id"]
+  return jsonify({
+    "job_id": job_id,
+    "status": job["status"],
+    "status_url": f"/api/visual/jobs/{job_id}",
+    "events_url": f"/api/visual/jobs/{job_id}/events",
+  }), 202
+
+
+def _submit(kind, task, *args):
+  data = request.get_json(silent=True) or {}
+  try:
+    return _accepted(submit_job(kind, task, *args, user_email=data.get("user_email")))
+  except QueueFullError as e:
+    return jsonify({"error": str(e)}), 429
+  except Exception as e:
+    return jsonify({"error": f"Failed to queue video job: {str(e)}"}), 500
+
+
 @visual_bp.route("/api/visual/text-to-video", methods=["POST"])
 def text_to_video():
-  """Create a video from raw text.
+  """Queue a video from raw text.
 
-  Expected JSON: {"text": "..."}
-  Steps:
+  Expected JSON: {"text": "...", "user_email": optional}
+  Returns 202: {"job_id", "status", "status_url", "events_url"}
+  Job steps:
     - Use Vertex AI to extract key moments and image prompts
     - Generate AI images, synthesize TTS, render captions, merge clips
-    - Upload final video to Cloudinary and return the secure URL
+    - Upload final video to Cloudinary and store the secure URL on the job
   """
   data = request.get_json(silent=True) or {}
   text = data.get("text")
   if not text:
     return jsonify({"error": "'text' is required"}), 400
-  try:
-    outfile = generate_video_from_transcript_text(text)
-    url = upload_video_to_cloudinary(outfile)
-    return jsonify({"url": url})
-  except NotImplementedError as nie:
-    return jsonify({"error": str(nie)}), 501
-  except Exception as e:
-    return jsonify({"error": str(e)}), 500
+  return _submit("text", generate_video_from_transcript_text, text)
 
 
 @visual_bp.route("/api/visual/pdf-url-to-video", methods=["POST"])
 def pdf_url_to_video():
-  """Create a video from a PDF URL.
+  """Queue a video from a PDF URL.
 
-  Expected JSON: {"pdf_url": "https://..."}
-  Steps:
+  Expected JSON: {"pdf_url": "https://...", "user_email": optional}
+  Returns 202: {"job_id", "status", "status_url", "events_url"}
+  Job steps:
     - Download PDF and extract text
     - Reuse the text-to-video pipeline
-    - Upload final video to Cloudinary and return the secure URL
   """
   data = request.get_json(silent=True) or {}
   pdf_url = data.get("pdf_url")
   if not pdf_url:
     return jsonify({"error": "'pdf_url' is required"}), 400
-  try:
-    text = extract_text_from_pdf_url(pdf_url)
-    outfile = generate_video_from_transcript_text(text)
-    url = upload_video_to_cloudinary(outfile)
-    return jsonify({"url": url})
-  except Exception as e:
-    return jsonify({"error": str(e)}), 500
+  return _submit("pdf", _pdf_to_video, pdf_url)
 
 
 @visual_bp.route("/api/visual/audio-url-to-video", methods=["POST"])
 def audio_url_to_video():
-  """Create a video from an audio URL.
+  """Queue a video from an audio URL.
 
-  Expected JSON: {"audio_url": "https://..."} OR {"transcript": "..."}
-  Steps:
+  Expected JSON: {"audio_url": "https://..."} OR {"transcript": "..."}, plus optional "user_email"
+  Returns 202: {"job_id", "status", "status_url", "events_url"}
+  Job steps:
     - If transcript provided, use it directly
-    - Else (future) transcribe the audio URL to text
+    - Else transcribe the audio URL to text
     - Reuse the text-to-video pipeline
-    - Upload final video to Cloudinary and return the secure URL
   """
   data = request.get_json(silent=True) or {}
   transcript = data.get("transcript")
   audio_url = data.get("audio_url")
   if not transcript and not audio_url:
     return jsonify({"error": "Provide either 'transcript' or 'audio_url'"}), 400
+  return _submit("audio", _audio_to_video, audio_url, transcript)
+
+
+@visual_bp.route("/api/visual/jobs/<job_id>", methods=["GET"])
+def visual_job_status(job_id):
+  """Current state of a video job.
+
+  Returns: {"job_id", "kind", "status", "stage", "progress", "result_url", "error", ...}
+  """
   try:
-    if not transcript:
-      transcript = extract_text_from_audio_url(audio_url)
-      if not transcript:
-        return jsonify({"error": "Transcription produced empty text"}), 422
-    outfile = generate_video_from_transcript_text(transcript)
-    url = upload_video_to_cloudinary(outfile)
-    return jsonify({"url": url})
+    job = get_job(job_id)
   except Exception as e:
-    return jsonify({"error": str(e)}), 500
+    return jsonify({"error": f"Failed to load job: {str(e)}"}), 500
+  if job is None:
+    return jsonify({"error": "Job not found"}), 404
+  return jsonify(job)
+
+
+@visual_bp.route("/api/visual/jobs/<job_id>/events", methods=["GET"])
+def visual_job_events(job_id):
+  """Stream a job's progress as Server-Sent Events.
+
+  Events: "progress" {status, stage, progress} whenever it changes, then
+  "done" {result_url, ...} or "error" {error} once the job finishes.
+  The stream reads the job record, so it works from any web worker.
+
+  Each stream lasts at most Config.VISUAL_JOB_EVENTS_TIMEOUT_SECONDS so it
+  never ties up a web worker for a whole render; it then ends with a
+  "timeout" {status_url} event and the client reconnects or polls the
+  status URL (the default client polls).
+  """
+  try:
+    job = get_job(job_id)
+  except Exception as e:
+    return jsonify({"error": f"Failed to load job: {str(e)}"}), 500
+  if job is None:
+    return jsonify({"error": "Job not found"}), 404
+
+  def frames(job):
+    deadline = time.monotonic() + Config.VISUAL_JOB_EVENTS_TIMEOUT_SECONDS
+    last = None
+    while True:
+      current = (job["status"], job.get("stage"), job.get("progress"))
+      if current != last:
+        last = current
+        yield sse_event("progress", {"status": job["status"], "stage": job.get("stage"), "progress": job.get("progress")})
+      if job["status"] in FINISHED_STATES:
+        if job["status"] == FAILED:
+          yield sse_event("error", {"error": job.get("error") or "Video generation failed"})
+        else:
+          yield sse_event("done", job)
+        return
+      if time.monotonic() >= deadline:
+        yield sse_event("timeout", {"status_url": f"/api/visual/jobs/{job_id}"})
+        return
+      time.sleep(Config.VISUAL_JOB_EVENTS_POLL_SECONDS)
+      try:
+        job = get_job(job_id) or job
+      except Exception:
+        pass
+
+  return sse_response(frames(job))
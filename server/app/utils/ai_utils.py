@@ -9,6 +9,7 @@ Provides functionality for:
 
 import json
 import os
+import re
 import traceback
 vertexai = None
 GenerativeModel = None
@@ -17,71 +18,43 @@ GenerationConfig = None
 HarmCategory = None
 HarmBlockThreshold = None
 from app.config import Config
-try:
-    from google.oauth2 import service_account
-except Exception:  # pragma: no cover - optional dependency
-    service_account = None
-import base64
-from pymongo import MongoClient
+from .llm_gateway import get_model, init_vertex
+from .mongo_utils import get_db
+from .resource_versions import TUTOR_HISTORY, bump_version
+from .context_builder import build_context, submit_summary_refresh
+from .image_pool import map_in_order
 from datetime import datetime
+from pymongo import ReturnDocument
 
 # In-memory fallbacks when MongoDB is not available (keeps runtime state per instance)
 _voice_chat_store = {}
 _active_sessions_store = {}
 
 
-# Initialize MongoDB connection
+# MongoDB access goes through the shared, pooled client in mongo_utils
 def get_db_connection():
-    """Get MongoDB connection and return the database object."""
-    try:
-        # Log the connection string (without password) for debugging
-        connection_string = Config.MONGODB_URI
-        if connection_string:
-            # Mask the password in the log for security
-            masked_uri = connection_string.replace("://", "://***:***@")
-            
-        else:
-            return None
-
-        if not Config.MONGODB_DB_NAME:
-            return None
-            
-            
-        # Attempt to connect with a timeout
-        client = MongoClient(Config.MONGODB_URI, serverSelectionTimeoutMS=5000)
-        # Force a connection to verify it works
-        client.server_info()
-        
-        db = client[Config.MONGODB_DB_NAME]
-        # Verify we can access the database
-        collections = db.list_collection_names()
-        
-        
-        return db
-    except Exception as e:
-        return None
+    """Return the database object from the shared MongoDB client (or None)."""
+    return get_db()
 
 # Voice chat history functions
-def save_chat_message(user_email, message, is_ai=False, context=None):
-    """Save a chat message to the voice_chat collection with additional metadata.
-    
+def _save_chat_messages(user_email, entries, context=None):
+    """Append one or more messages to a voice chat session.
+
+    All messages are written with one sequence reservation on the session
+    header (which also creates the session) and one insert, so a whole tutor
+    turn costs two round trips regardless of how many messages it holds.
+
     Args:
         user_email (str): The user's email identifier
-        message (str): The message content
-        is_ai (bool): Whether the message is from AI (True) or user (False)
+        entries (list): (message, is_ai) tuples in chronological order
         context (dict, optional): Additional context like session_id, mode, etc.
-    
+
     Returns:
         bool: Success status
     """
     try:
         db = get_db_connection()
-        # Prepare the new message with additional metadata
-        new_message = {
-            "content": message,
-            "is_ai": is_ai,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        timestamp = datetime.utcnow().isoformat()
 
         # Get session ID from context if available
         session_id = None
@@ -89,13 +62,23 @@ def save_chat_message(user_email, message, is_ai=False, context=None):
             session_id = context["session_id"]
 
         # Add context metadata if provided
+        message_context = {}
         if context:
-            message_context = {}
             for key in ["session_id", "mode", "subject", "is_voice_input"]:
                 if key in context:
                     message_context[key] = context[key]
+
+        # Prepare the new messages with additional metadata
+        new_messages = []
+        for message, is_ai in entries:
+            new_message = {
+                "content": message,
+                "is_ai": is_ai,
+                "timestamp": timestamp
+            }
             if message_context:
-                new_message["context"] = message_context
+                new_message["context"] = dict(message_context)
+            new_messages.append(new_message)
 
         # If no session ID, use a default
         if not session_id:
@@ -103,147 +86,196 @@ def save_chat_message(user_email, message, is_ai=False, context=None):
 
         if db is None:
             # Use in-memory fallback
-            user_doc = _voice_chat_store.get(user_email)
-
-            if not user_doc:
-                _voice_chat_store[user_email] = {
-                    "sessions": [{"session_id": session_id, "messages": [new_message], "created_at": datetime.utcnow().isoformat()}],
-                    "created_at": datetime.utcnow().isoformat(),
-                    "updated_at": datetime.utcnow().isoformat()
-                }
-                return True
-
-            # Find session
-            for s in user_doc.get("sessions", []):
-                if s.get("session_id") == session_id:
-                    s.setdefault("messages", []).append(new_message)
-                    user_doc["updated_at"] = datetime.utcnow().isoformat()
-                    return True
-
-            # Create new session
-            new_session = {"session_id": session_id, "messages": [new_message], "created_at": datetime.utcnow().isoformat()}
-            user_doc.setdefault("sessions", []).append(new_session)
-            user_doc["updated_at"] = datetime.utcnow().isoformat()
+            user_doc = _voice_chat_store.setdefault(user_email, {
+                "sessions": [],
+                "created_at": timestamp,
+                "updated_at": timestamp
+            })
+            session = next((s for s in user_doc["sessions"] if s.get("session_id") == session_id), None)
+            if session is None:
+                # Create new session
+                session = {"session_id": session_id, "messages": [], "created_at": timestamp}
+                user_doc["sessions"].append(session)
+            session.setdefault("messages", []).extend(new_messages)
+            user_doc["updated_at"] = timestamp
+            bump_version(TUTOR_HISTORY, user_email)
             return True
 
-        # Get the voice_chat collection
-        voice_chat_collection = db[Config.MONGODB_VOICE_CHAT_COLLECTION]
-
-        # Find user's chat history document
-        chat_doc = voice_chat_collection.find_one({"user_email": user_email})
-
-        if chat_doc:
-            # Check if session exists in the sessions array
-            session_exists = False
-            if "sessions" in chat_doc:
-                for session in chat_doc["sessions"]:
-                    if session["session_id"] == session_id:
-                        session_exists = True
-                        break
-
-            if session_exists:
-                # Add message to existing session
-                voice_chat_collection.update_one(
-                    {"user_email": user_email, "sessions.session_id": session_id},
-                    {
-                        "$push": {"sessions.$.messages": new_message},
-                        "$set": {"updated_at": datetime.utcnow().isoformat()}
-                    }
-                )
-            else:
-                # Create new session with this message
-                new_session = {
-                    "session_id": session_id,
-                    "messages": [new_message],
-                    "created_at": datetime.utcnow().isoformat()
-                }
-                voice_chat_collection.update_one(
-                    {"user_email": user_email},
-                    {
-                        "$push": {"sessions": new_session},
-                        "$set": {"updated_at": datetime.utcnow().isoformat()}
-                    }
-                )
-        else:
-            # Create new user document with session
-            new_session = {
-                "session_id": session_id,
-                "messages": [new_message],
-                "created_at": datetime.utcnow().isoformat()
-            }
-            voice_chat_collection.insert_one({
+        # One document per message, keyed by (user_email, session_id, seq).
+        # The session header holds the sequence counter; reserving the next
+        # seqs also creates the session on its first message.
+        sessions_collection = db[Config.MONGODB_VOICE_SESSIONS_COLLECTION]
+        messages_collection = db[Config.MONGODB_VOICE_MESSAGES_COLLECTION]
+
+        session_doc = sessions_collection.find_one_and_update(
+            {"user_email": user_email, "session_id": session_id},
+            {
+                "$inc": {"message_count": len(new_messages)},
+                "$set": {"updated_at": timestamp},
+                "$setOnInsert": {"created_at": timestamp}
+            },
+            projection={"message_count": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+        last_seq = session_doc["message_count"]
+        first_seq = last_seq - len(new_messages) + 1
+        for offset, new_message in enumerate(new_messages):
+            new_message.update({
                 "user_email": user_email,
-                "sessions": [new_session],
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat()
+                "session_id": session_id,
+                "seq": first_seq + offset
             })
+        try:
+            messages_collection.insert_many(new_messages, ordered=True)
+        except Exception:
+            # Give the reserved seqs back so message_count keeps matching the
+            # stored messages; skipped if a later write has reserved past them.
+            session_query = {"user_email": user_email, "session_id": session_id}
+            messages_collection.delete_many(
+                dict(session_query, seq={"$gte": first_seq, "$lte": last_seq}))
+            sessions_collection.update_one(
+                dict(session_query, message_count=last_seq),
+                {"$inc": {"message_count": -len(new_messages)}}
+            )
+            raise
+        bump_version(TUTOR_HISTORY, user_email)
 
         return True
     except Exception:
         return False
 
-def get_chat_history(user_email, limit=10, session_id=None):
-    """Get the user's chat history for a specific session.
+
+def save_chat_message(user_email, message, is_ai=False, context=None):
+    """Save a chat message to the voice chat history with additional metadata.
     
     Args:
         user_email (str): The user's email identifier
-        limit (int): Maximum number of messages to retrieve (default: 10)
-        session_id (str, optional): The session ID to get messages for. If None, gets messages from the most recent session.
+        message (str): The message content
+        is_ai (bool): Whether the message is from AI (True) or user (False)
+        context (dict, optional): Additional context like session_id, mode, etc.
     
     Returns:
-        list: List of message objects with content, is_ai, and timestamp
+        bool: Success status
+    """
+    return _save_chat_messages(user_email, [(message, is_ai)], context)
+
+
+def save_chat_turn(user_email, user_message, ai_message, context=None):
+    """Save a user prompt and the AI reply together as one tutor turn.
+    
+    Args:
+        user_email (str): The user's email identifier
+        user_message (str): The user's message content
+        ai_message (str): The AI response content
+        context (dict, optional): Additional context like session_id, mode, etc.
+    
+    Returns:
+        bool: Success status
+    """
+    return _save_chat_messages(
+        user_email, [(user_message, False), (ai_message, True)], context)
+
+
+def get_chat_history_page(user_email, limit=10, offset=0, session_id=None):
+    """Get one page of a session's chat history, resolved in a single query.
+
+    Pages count backwards from the newest message: offset=0 returns the most
+    recent `limit` messages, offset=limit the ones before those, and so on.
+    Messages within a page are in chronological order.
+
+    Args:
+        user_email (str): The user's email identifier
+        limit (int): Maximum number of messages to return
+        offset (int): Number of newest messages to skip
+        session_id (str, optional): The session ID to read. If None, uses the most recent session.
+
+    Returns:
+        dict: {"messages": list, "total": int, "session_id": str or None,
+               "summary": str, "summarized_count": int} where summary is the
+               session's rolling summary of its first summarized_count messages
     """
+    empty = {"messages": [], "total": 0, "session_id": session_id,
+             "summary": "", "summarized_count": 0}
+    limit = max(0, int(limit))
+    offset = max(0, int(offset))
     try:
         db = get_db_connection()
         if db is None:
             # Return in-memory history
             user_doc = _voice_chat_store.get(user_email)
-            if not user_doc:
-                return []
-            sessions = user_doc.get("sessions", [])
+            if not user_doc or not user_doc.get("sessions"):
+                return empty
+            sessions = user_doc["sessions"]
             if session_id:
-                for s in sessions:
-                    if s.get("session_id") == session_id:
-                        msgs = s.get("messages", [])
-                        return msgs[-limit:] if len(msgs) > limit else msgs
-                return []
-            # most recent session
-            if not sessions:
-                return []
-            sorted_sessions = sorted(sessions, key=lambda x: x.get("created_at", ""), reverse=True)
-            msgs = sorted_sessions[0].get("messages", [])
-            return msgs[-limit:] if len(msgs) > limit else msgs
-
-        # Get the voice_chat collection
-        voice_chat_collection = db[Config.MONGODB_VOICE_CHAT_COLLECTION]
-
-        # Find user's chat history
-        chat_doc = voice_chat_collection.find_one({"user_email": user_email})
-
-        if not chat_doc or "sessions" not in chat_doc or not chat_doc["sessions"]:
-            return []
-
-        # If session_id is provided, get messages from that session
-        if session_id:
-            for session in chat_doc["sessions"]:
-                if session["session_id"] == session_id and "messages" in session:
-                    messages = session["messages"]
-                    return messages[-limit:] if len(messages) > limit else messages
-        else:
-            # If no session_id is provided, get messages from the most recent session
-            # Sort sessions by created_at in descending order
-            sorted_sessions = sorted(
-                chat_doc["sessions"], 
-                key=lambda x: x.get("created_at", ""), 
-                reverse=True
-            )
-            if sorted_sessions and "messages" in sorted_sessions[0]:
-                messages = sorted_sessions[0]["messages"]
-                return messages[-limit:] if len(messages) > limit else messages
+                session = next((s for s in sessions if s.get("session_id") == session_id), None)
+            else:
+                session = max(sessions, key=lambda x: x.get("created_at", ""))
+            if not session:
+                return empty
+            msgs = session.get("messages", [])
+            end = max(len(msgs) - offset, 0)
+            return {
+                "messages": msgs[max(end - limit, 0):end],
+                "total": len(msgs),
+                "session_id": session.get("session_id"),
+                "summary": session.get("summary", ""),
+                "summarized_count": session.get("summarized_count", 0),
+            }
+
+        sessions_collection = db[Config.MONGODB_VOICE_SESSIONS_COLLECTION]
 
-        return []
+        match = {"user_email": user_email}
+        if session_id:
+            match["session_id"] = session_id
+
+        # Resolve the session (most recent if not given) and fetch only the
+        # requested window of its messages in one round trip
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"created_at": -1}},
+            {"$limit": 1},
+            {"$lookup": {
+                "from": Config.MONGODB_VOICE_MESSAGES_COLLECTION,
+                "let": {"user_email": "$user_email", "session_id": "$session_id"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$and": [
+                        {"$eq": ["$user_email", "$$user_email"]},
+                        {"$eq": ["$session_id", "$$session_id"]},
+                    ]}}},
+                    {"$sort": {"seq": -1}},
+                    {"$skip": offset},
+                    {"$limit": limit},
+                    {"$project": {"_id": 0, "content": 1, "is_ai": 1, "timestamp": 1, "context": 1}},
+                ],
+                "as": "messages",
+            }},
+            {"$project": {"_id": 0, "session_id": 1, "message_count": 1, "messages": 1,
+                          "summary": 1, "summarized_count": 1}},
+        ] if limit else [
+            {"$match": match},
+            {"$sort": {"created_at": -1}},
+            {"$limit": 1},
+            {"$project": {"_id": 0, "session_id": 1, "message_count": 1,
+                          "summary": 1, "summarized_count": 1}},
+        ]
+
+        docs = list(sessions_collection.aggregate(pipeline))
+        if not docs:
+            return empty
+        doc = docs[0]
+        messages = doc.get("messages", [])
+        messages.reverse()
+        return {
+            "messages": messages,
+            "total": doc.get("message_count", 0),
+            "session_id": doc.get("session_id"),
+            "summary": doc.get("summary", ""),
+            "summarized_count": doc.get("summarized_count", 0),
+        }
     except Exception:
-        return []
+        return empty
 
 
 def clear_chat_history(user_email, session_id=None):
@@ -263,30 +295,87 @@ def clear_chat_history(user_email, session_id=None):
             user_doc = _voice_chat_store.get(user_email)
             if not user_doc:
                 return False
+            bump_version(TUTOR_HISTORY, user_email)
             if session_id:
                 for s in user_doc.get("sessions", []):
                     if s.get("session_id") == session_id:
                         s["messages"] = []
+                        s.pop("summary", None)
+                        s.pop("summarized_count", None)
                         return True
                 return False
             else:
                 del _voice_chat_store[user_email]
                 return True
 
-        # Get the voice_chat collection
-        voice_chat_collection = db[Config.MONGODB_VOICE_CHAT_COLLECTION]
+        sessions_collection = db[Config.MONGODB_VOICE_SESSIONS_COLLECTION]
+        messages_collection = db[Config.MONGODB_VOICE_MESSAGES_COLLECTION]
+
+        query = {"user_email": user_email}
+        if session_id:
+            query["session_id"] = session_id
+
+        result = messages_collection.delete_many(query)
+        bump_version(TUTOR_HISTORY, user_email)
 
         if session_id:
-            # Clear only the specified session
-            result = voice_chat_collection.update_one(
-                {"user_email": user_email, "sessions.session_id": session_id},
-                {"$set": {"sessions.$.messages": []}}
+            # Clear only the specified session; keep its header so it can be resumed
+            sessions_collection.update_one(
+                query,
+                {
+                    "$set": {"message_count": 0, "updated_at": datetime.utcnow().isoformat()},
+                    "$unset": {"summary": "", "summarized_count": ""}
+                }
             )
-            return result.modified_count > 0
-        else:
-            # Delete the user's entire chat history
-            result = voice_chat_collection.delete_one({"user_email": user_email})
             return result.deleted_count > 0
+
+        # Delete the user's entire chat history
+        sessions_result = sessions_collection.delete_many(query)
+        return result.deleted_count > 0 or sessions_result.deleted_count > 0
+    except Exception:
+        return False
+
+
+def save_session_summary(user_email, session_id, summary, summarized_count):
+    """Store a session's rolling summary unless a newer one is already stored.
+
+    Args:
+        user_email (str): The user's email identifier
+        session_id (str): The session the summary belongs to
+        summary (str): Summary of the session's first `summarized_count` messages
+        summarized_count (int): Number of messages the summary covers
+
+    Returns:
+        bool: True if the summary was stored
+    """
+    try:
+        db = get_db_connection()
+        if db is None:
+            user_doc = _voice_chat_store.get(user_email) or {}
+            session = next((s for s in user_doc.get("sessions", [])
+                            if s.get("session_id") == session_id), None)
+            if (session is None or session.get("summarized_count", 0) >= summarized_count
+                    or len(session.get("messages", [])) < summarized_count):
+                return False
+            session["summary"] = summary
+            session["summarized_count"] = summarized_count
+            return True
+
+        result = db[Config.MONGODB_VOICE_SESSIONS_COLLECTION].update_one(
+            {
+                "user_email": user_email,
+                "session_id": session_id,
+                # A refresh that started before the session was cleared must not land
+                "message_count": {"$gte": summarized_count},
+                # Never let a slower concurrent refresh move the summary backwards
+                "$or": [
+                    {"summarized_count": {"$lt": summarized_count}},
+                    {"summarized_count": {"$exists": False}},
+                ],
+            },
+            {"$set": {"summary": summary, "summarized_count": summarized_count}}
+        )
+        return result.modified_count > 0
     except Exception:
         return False
 
@@ -426,19 +515,23 @@ def end_active_session(user_email):
         return False
 
 
-def format_chat_history_for_context(messages):
+def format_chat_history_for_context(messages, summary=""):
     """Format chat history into a string for AI context.
     
     Args:
         messages (list): List of message objects
+        summary (str, optional): Rolling summary of the messages before these
     
     Returns:
         str: Formatted chat history
     """
-    if not messages:
+    if not messages and not summary:
         return ""
         
-    formatted_history = "Previous conversation:\n"
+    formatted_history = ""
+    if summary:
+        formatted_history += f"Summary of the earlier conversation:\n{summary}\n\n"
+    formatted_history += "Previous conversation:\n"
     
     for msg in messages:
         speaker = "AI" if msg.get("is_ai", False) else "User"
@@ -553,30 +646,93 @@ This might be due to a temporary issue with the AI service. Here's what you can
 I'm here to help with your {subject} questions when the service is working properly again."""
 
 def init_vertex_ai():
-    """Initialize the Vertex AI client."""
-    try:
-        # Lazy import Vertex SDK and relevant classes
-        try:
-            import vertexai
-            from vertexai.generative_models import GenerativeModel, Part
-            from vertexai.preview.generative_models import GenerationConfig, HarmCategory, HarmBlockThreshold
-        except Exception:
-            return False
+    """Initialize the Vertex AI client (once per process, via the LLM gateway)."""
+    return init_vertex()
+
 
-        # Get credentials from environment or config
-        project_id = Config.GOOGLE_CLOUD_PROJECT
-        location = Config.GOOGLE_CLOUD_LOCATION
-        credentials_base64 = Config.VERTEX_DEFAULT_CREDENTIALS
+def _prepare_vertex_request(prompt, context=None):
+    """Resolve the cached model, prompt parts and safety settings for a tutor turn.
 
-        # Convert base64 to credentials
-        credentials = service_account.Credentials.from_service_account_info(
-            json.loads(base64.b64decode(credentials_base64))
+    Args:
+        prompt (str): The user's input text
+        context (dict, optional): Additional context like mode, subject, is_voice_input, etc.
+
+    Returns:
+        tuple: (model, full_prompt, safety_settings, window), or None if Vertex AI
+        is unavailable. window is the packed history from build_context (None
+        without a user and session), passed back to `_save_tutor_turn`.
+    """
+    from vertexai.preview.generative_models import HarmCategory, HarmBlockThreshold
+
+    # Default model to use - Gemini 2.5 Flash
+    model_name = Config.VERTEX_MODEL_NAME
+
+    # Check if this is a voice interaction
+    is_voice_input = context.get('is_voice_input', False) if context else False
+
+    # Cached per (model, generation config) by the gateway
+    model = get_model(model_name, {
+        "temperature": 0.7,
+        "top_p": 0.95,
+        "top_k": 40,
+        "max_output_tokens": 600 if is_voice_input else 1024,
+    })
+    if model is None:
+        return None
+
+    # Prepare system instructions based on context
+    system_instruction = _build_system_instruction(context)
+
+    # Add chat history context if provided
+    user_email = context.get('user_email') if context else None
+    session_id = context.get('session_id') if context else None
+    conversation_history = ""
+    window = None
+
+    if user_email and session_id:
+        # Pack recent history into the endpoint's token budget; voice gets a
+        # smaller one to keep responses concise
+        page = get_chat_history_page(user_email, Config.CONTEXT_HISTORY_FETCH_LIMIT, 0, session_id)
+        window = build_context(
+            page["messages"], page["total"],
+            summary=page["summary"],
+            summarized_count=page["summarized_count"],
+            budget_tokens=Config.CONTEXT_TOKEN_BUDGET_VOICE if is_voice_input else Config.CONTEXT_TOKEN_BUDGET_TUTOR,
         )
+        conversation_history = format_chat_history_for_context(window["messages"], window["summary"])
 
-        vertexai.init(project=project_id, location=location, credentials=credentials)
-        return True
-    except Exception:
-        return False
+    # Include conversation history in the prompt if available
+    if conversation_history:
+        # Combine system instruction, conversation history, and current prompt
+        full_prompt = [system_instruction, conversation_history, prompt]
+    else:
+        full_prompt = [system_instruction, prompt]
+
+    # Configure safety settings
+    safety_settings = {
+        HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+        HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+        HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+        HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+    }
+
+    return model, full_prompt, safety_settings, window
+
+
+def _save_tutor_turn(prompt, response_text, context=None, window=None):
+    """Persist the user prompt and AI response if the context names a user.
+
+    When the prompt's context window left enough turns behind, folding them
+    into the session's rolling summary is queued in the background.
+    """
+    user_email = context.get('user_email') if context else None
+    if user_email:
+        # Save the user message and AI response in one write
+        save_chat_turn(user_email, prompt, response_text, context=context)
+        session_id = context.get('session_id')
+        submit_summary_refresh(
+            ("tutor", user_email, session_id), window,
+            lambda summary, count: save_session_summary(user_email, session_id, summary, count))
 
 
 def get_vertex_response(prompt, context=None):
@@ -593,59 +749,17 @@ def get_vertex_response(prompt, context=None):
     if not init_vertex_ai():
         return _get_fallback_response(prompt, context, error="Vertex AI SDK not available")
 
-    # Default model to use - Gemini 2.5 Flash
-    model_name = Config.VERTEX_MODEL_NAME
     try:
-        from vertexai.generative_models import GenerativeModel
-        from vertexai.preview.generative_models import GenerationConfig, HarmCategory, HarmBlockThreshold
+        prepared = _prepare_vertex_request(prompt, context)
+        if prepared is None:
+            return _get_fallback_response(prompt, context, error="Vertex AI SDK not available")
+        model, full_prompt, safety_settings, window = prepared
 
-        model = GenerativeModel(model_name)
-        
-        # Check if this is a voice interaction
         is_voice_input = context.get('is_voice_input', False) if context else False
-        
-        # Prepare system instructions based on context
-        system_instruction = _build_system_instruction(context)
-        
-        # Add chat history context if provided
-        user_email = context.get('user_email') if context else None
-        session_id = context.get('session_id') if context else None
-        conversation_history = ""
-        
-        if user_email and session_id:
-            # Get more context for text, less for voice to keep responses concise
-            history_limit = 10
-            # Pass session_id to get chat history only for current session
-            chat_history = get_chat_history(user_email, history_limit, session_id)
-            if chat_history:
-                conversation_history = format_chat_history_for_context(chat_history)
-        
-        # Include conversation history in the prompt if available
-        if conversation_history:
-            # Combine system instruction, conversation history, and current prompt
-            full_prompt = [system_instruction, conversation_history, prompt]
-        else:
-            full_prompt = [system_instruction, prompt]
-        
-        # Configure safety settings and generation config
-        safety_settings = {
-            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-        }
 
-        generation_config = GenerationConfig(
-            temperature=0.7,
-            top_p=0.95,
-            top_k=40,
-            max_output_tokens=600 if is_voice_input else 1024,
-        )
-        
         # Generate the response
         response = model.generate_content(
             full_prompt,
-            generation_config=generation_config,
             safety_settings=safety_settings,
         )
         
@@ -657,11 +771,7 @@ def get_vertex_response(prompt, context=None):
             response_text = _optimize_for_voice(response_text)
         
         # Save messages to chat history if user_email is provided
-        if user_email:
-            # Save user message with context
-            save_chat_message(user_email, prompt, is_ai=False, context=context)
-            # Save AI response with context
-            save_chat_message(user_email, response_text, is_ai=True, context=context)
+        _save_tutor_turn(prompt, response_text, context, window)
         
         # Return the text response
         return response_text
@@ -671,6 +781,88 @@ def get_vertex_response(prompt, context=None):
         return _get_fallback_response(prompt, context, error=str(e))
 
 
+# Sentence end followed by whitespace; used to flush voice segments
+_SENTENCE_BOUNDARY = re.compile(r'[.!?](?=\s)')
+
+
+def _iter_voice_segments(chunks):
+    """Re-chunk streamed text at sentence boundaries and optimize each for voice.
+
+    Text is only flushed at a sentence end outside of an open code fence, so
+    `_optimize_for_voice` never sees half of a markdown construct.
+    """
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        cut = -1
+        for match in _SENTENCE_BOUNDARY.finditer(buffer):
+            if buffer.count('```', 0, match.end()) % 2 == 0:
+                cut = match.end()
+        if cut > 0:
+            segment, buffer = buffer[:cut], buffer[cut:]
+            optimized = _optimize_for_voice(segment).strip()
+            if optimized:
+                yield optimized
+    if buffer.strip():
+        optimized = _optimize_for_voice(buffer).strip()
+        if optimized:
+            yield optimized
+
+
+def stream_vertex_response(prompt, context=None):
+    """Stream a tutor response from Vertex AI as text segments.
+
+    Raw model chunks are yielded as they arrive; for voice input they are
+    regrouped into whole sentences and passed through `_optimize_for_voice`.
+    The completed turn is saved to chat history after the stream finishes.
+    Yields a single fallback response if Vertex AI is unavailable or fails
+    before producing any text.
+
+    Args:
+        prompt (str): The user's input text
+        context (dict, optional): Additional context like mode, subject, is_voice_input, etc.
+
+    Yields:
+        str: Response text segments
+    """
+    is_voice_input = context.get('is_voice_input', False) if context else False
+    parts = []
+    window = None
+    try:
+        prepared = _prepare_vertex_request(prompt, context) if init_vertex_ai() else None
+        if prepared is not None:
+            model, full_prompt, safety_settings, window = prepared
+
+            def raw_chunks():
+                for chunk in model.generate_content(
+                    full_prompt,
+                    safety_settings=safety_settings,
+                    stream=True,
+                ):
+                    try:
+                        text = chunk.text
+                    except Exception:
+                        # Chunks without text parts (e.g. safety metadata)
+                        continue
+                    if text:
+                        yield text
+
+            segments = _iter_voice_segments(raw_chunks()) if is_voice_input else raw_chunks()
+            for segment in segments:
+                parts.append(segment)
+                yield segment
+    except Exception:
+        # Keep whatever was already streamed; fall back only if nothing was
+        pass
+
+    if not parts:
+        yield _get_fallback_response(prompt, context)
+        return
+
+    separator = ' ' if is_voice_input else ''
+    _save_tutor_turn(prompt, separator.join(parts).strip(), context, window)
+
+
 def _build_system_instruction(context):
     """Build a system instruction based on context with voice optimization."""
     if not context:
@@ -763,8 +955,7 @@ def summarize_text(text: str):
         raise RuntimeError("Vertex SDK not available")
 
     try:
-        from vertexai.generative_models import GenerativeModel
-        model = GenerativeModel("gemini-pro")
+        model = get_model("gemini-pro")
         prompt = f"Please summarize the following text concisely, highlighting the key points:\n\n{text}"
         response = model.generate_content(prompt)
         return response.text
@@ -773,25 +964,28 @@ def summarize_text(text: str):
 
 
 def generate_images(prompts):
-    """Generate images based on prompts using Vertex AI's image generation capabilities."""
+    """Generate images based on prompts using Vertex AI's image generation capabilities.
+
+    Prompts run concurrently on the shared image pool (see app.utils.image_pool);
+    results keep prompt order.
+    """
     # Initialize Vertex AI
     if not init_vertex_ai():
         raise RuntimeError("Vertex SDK not available")
 
-    try:
-        from vertexai.generative_models import GenerativeModel
-        model = GenerativeModel("imagegeneration@002")
-        results = []
-        for prompt in prompts:
-            response = model.generate_content(prompt)
-            if response.parts:
-                for part in response.parts:
-                    if hasattr(part, 'inline_data') and part.inline_data.mime_type.startswith('image/'):
-                        results.append({
-                            'prompt': prompt,
-                            'mime_type': part.inline_data.mime_type,
-                            'data': part.inline_data.data
-                        })
-        return results
-    except Exception:
-        raise
+    model = get_model("imagegeneration@002")
+
+    def _generate(prompt, _index):
+        images = []
+        response = model.generate_content(prompt)
+        if response.parts:
+            for part in response.parts:
+                if hasattr(part, 'inline_data') and part.inline_data.mime_type.startswith('image/'):
+                    images.append({
+                        'prompt': prompt,
+                        'mime_type': part.inline_data.mime_type,
+                        'data': part.inline_data.data
+                    })
+        return images
+
+    return [image for images in map_in_order(_generate, prompts) for image in images]
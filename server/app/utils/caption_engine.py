@@ -0,0 +1,192 @@
+"""In-memory caption rendering for the video pipeline.
+
+Captions used to be drawn onto a full 1280x720 RGBA frame per 4-word chunk,
+saved as PNG and decoded again by MoviePy. This engine keeps everything in
+memory instead:
+
+- fonts are resolved once per size and shared process-wide (``get_font``);
+- each distinct word is rasterised once into a glyph cache, and a caption
+  chunk is assembled from cached words on a shared baseline;
+- a chunk is a tightly cropped RGBA array (text plus its translucent
+  backing box), never a full frame and never a file;
+- a sentence's chunks form one ``CaptionTrack``, which becomes a single
+  masked clip that switches chunk over time (``CaptionTrack.clip``).
+"""
+
+import math
+import os
+import threading
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - optional
+    np = None
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except Exception:  # pragma: no cover - optional
+    Image = ImageDraw = ImageFont = None
+
+try:
+    from moviepy import VideoClip
+except Exception:  # pragma: no cover - optional
+    VideoClip = None
+
+
+DEFAULT_FONT_PATHS = [
+    # macOS (Homebrew cask installs to user fonts)
+    os.path.expanduser("~/Library/Fonts/DejaVuSans-Bold.ttf"),
+    # macOS system-wide (if manually copied)
+    "/Library/Fonts/DejaVuSans-Bold.ttf",
+    # Fallbacks (system fonts)
+    "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
+]
+FONT_SIZE = 44
+WORDS_PER_CHUNK = 4
+
+BOX_PADDING = 10
+BOX_ALPHA = 180
+# Gap between the bottom of the caption box and the bottom of the frame
+BOTTOM_MARGIN = 50
+
+# FreeType faces are not safe to rasterise from several threads at once;
+# only cache misses take this lock.
+_raster_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_font(size: int = FONT_SIZE) -> Any:
+    """Return the caption font at ``size``; the filesystem is probed once per size."""
+    for path in DEFAULT_FONT_PATHS:
+        if os.path.exists(path):
+            try:
+                return ImageFont.truetype(path, size)
+            except Exception:
+                pass
+    # Fallback to PIL default
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=None)
+def _line_metrics(size: int) -> Tuple[int, int, float]:
+    """(line height, ascent, width of a space) for the font at ``size``."""
+    font = get_font(size)
+    with _raster_lock:
+        try:
+            ascent, descent = font.getmetrics()
+        except AttributeError:  # bitmap fonts have no metrics
+            ascent, descent = font.getbbox("Ag")[3], 0
+        space = font.getlength(" ")
+    return ascent + descent, ascent, space
+
+
+@lru_cache(maxsize=4096)
+def _glyph(word: str, size: int) -> Tuple[Any, int, float]:
+    """Rasterise one word; return (alpha bitmap, left bearing, advance).
+
+    The bitmap is line-height tall with the ascent at row 0, so words drawn
+    separately line up on a common baseline.
+    """
+    font = get_font(size)
+    line_height, _, _ = _line_metrics(size)
+    with _raster_lock:
+        left, _, right, _ = font.getbbox(word)
+        advance = font.getlength(word)
+        bearing = min(0, left)
+        width = max(1, max(math.ceil(advance), right) - bearing)
+        img = Image.new("L", (width, line_height), 0)
+        ImageDraw.Draw(img).text((-bearing, 0), word, font=font, fill=255)
+    bitmap = np.asarray(img)
+    bitmap.setflags(write=False)  # shared by every caption that uses the word
+    return bitmap, bearing, advance
+
+
+def render_caption(text: str, size: int = FONT_SIZE) -> Any:
+    """Render one caption chunk as a tightly cropped RGBA array (white on a translucent box)."""
+    line_height, _, space = _line_metrics(size)
+    placed = []
+    cursor = 0.0
+    for word in text.split():
+        bitmap, bearing, advance = _glyph(word, size)
+        placed.append((bitmap, int(round(cursor)) + bearing))
+        cursor += advance + space
+    left = min((x for _, x in placed), default=0)
+    right = max((x + bitmap.shape[1] for bitmap, x in placed), default=0)
+
+    coverage = np.zeros((line_height, right - left), dtype=np.uint8)
+    for bitmap, x in placed:
+        x -= left
+        region = coverage[:, x : x + bitmap.shape[1]]
+        np.maximum(region, bitmap, out=region)
+
+    # White text over black at BOX_ALPHA, as PIL would composite it
+    a = np.pad(coverage, BOX_PADDING).astype(np.float32) / 255.0
+    rgba = np.empty(a.shape + (4,), dtype=np.uint8)
+    rgba[..., :3] = np.rint(255.0 * a)[..., None]
+    rgba[..., 3] = np.rint(BOX_ALPHA + (255 - BOX_ALPHA) * a)
+    return rgba
+
+
+def caption_chunks(script: str) -> List[str]:
+    """Split a sentence into the chunks shown one after another."""
+    words = script.split()
+    chunks = [" ".join(words[i : i + WORDS_PER_CHUNK]) for i in range(0, len(words), WORDS_PER_CHUNK)]
+    return chunks or [script]
+
+
+class CaptionTrack:
+    """A sentence's captions: cropped RGBA bitmaps shown in turn for equal shares of its duration."""
+
+    def __init__(self, bitmaps: List[Any]):
+        self.bitmaps = bitmaps
+        self.width = max(b.shape[1] for b in bitmaps)
+        self.height = max(b.shape[0] for b in bitmaps)
+
+    def position(self, frame_size: Tuple[int, int]) -> Tuple[int, int]:
+        """Top-left corner of the track on a frame: centred, BOTTOM_MARGIN above the bottom."""
+        frame_width, frame_height = frame_size
+        return (frame_width - self.width) // 2, frame_height - BOTTOM_MARGIN - self.height
+
+    def offsets(self, index: int) -> Tuple[int, int]:
+        """Where chunk ``index`` sits inside the track (centred, bottom-aligned)."""
+        height, width = self.bitmaps[index].shape[:2]
+        return (self.width - width) // 2, self.height - height
+
+    def chunk_duration(self, total_dur: float) -> float:
+        return max(total_dur / len(self.bitmaps), 0.1)
+
+    def frames(self) -> Any:
+        """All chunks placed on the track's canvas: an (n, height, width, 4) RGBA array."""
+        frames = np.zeros((len(self.bitmaps), self.height, self.width, 4), dtype=np.uint8)
+        for i, bitmap in enumerate(self.bitmaps):
+            x, y = self.offsets(i)
+            h, w = bitmap.shape[:2]
+            frames[i, y : y + h, x : x + w] = bitmap
+        return frames
+
+    def clip(self, total_dur: float, frame_size: Tuple[int, int]) -> Any:
+        """One masked MoviePy clip that shows each chunk in turn over ``total_dur``."""
+        frames = self.frames()
+        rgb = np.ascontiguousarray(frames[..., :3])
+        mask = frames[..., 3] / np.float32(255.0)
+
+        dur = self.chunk_duration(total_dur)
+        last = len(self.bitmaps) - 1
+
+        def _index(t: float) -> int:
+            return min(int(t / dur), last)
+
+        mask_clip = VideoClip(lambda t: mask[_index(t)], is_mask=True, duration=total_dur)
+        return (
+            VideoClip(lambda t: rgb[_index(t)], duration=total_dur)
+            .with_mask(mask_clip)
+            .with_position(self.position(frame_size))
+        )
+
+
+def render_caption_track(script: str, size: Optional[int] = None) -> CaptionTrack:
+    """Render every chunk of a sentence's captions into a CaptionTrack."""
+    size = size or FONT_SIZE
+    return CaptionTrack([render_caption(chunk, size) for chunk in caption_chunks(script)])
@@ -0,0 +1,211 @@
+"""Token-budgeted conversation context for the chat and tutor prompts.
+
+Instead of a fixed number of past messages, recent messages are packed
+newest-first until the endpoint's token budget is spent, with any single
+oversized message (a pasted code dump, say) truncated. Messages that fall
+out of the window are folded into a rolling summary stored on the session.
+The summary is refreshed incrementally: once at least
+``Config.CONTEXT_SUMMARY_EVERY_TURNS`` turns have left the window since the
+last refresh, only those messages and the previous summary are sent to the
+model, never the whole conversation. Until they are folded, messages that
+left the window stay in the prompt, so nothing drops out of both.
+
+The refresh is an extra model call, so it runs in the background after the
+response (``submit_summary_refresh``), never inside the request.
+
+Token counts are estimated (about four characters per token) so building a
+prompt never costs a round trip to the model.
+"""
+
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import Config
+from .llm_gateway import generate_text
+
+
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = "\n[... truncated ...]\n"
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Cheap token estimate for budgeting (no tokenizer round trip)."""
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """Keep the head and tail of an oversized message within max_tokens."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    keep = max(max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARKER), 0)
+    head = keep * 2 // 3
+    return text[:head] + TRUNCATION_MARKER + text[len(text) - (keep - head):]
+
+
+def _speaker(message: Dict[str, Any]) -> str:
+    # Chat sessions use role, tutor history uses is_ai
+    if message.get("is_ai") or message.get("role") == "assistant":
+        return "Tutor"
+    return "Student"
+
+
+def build_context(
+    messages: List[Dict[str, Any]],
+    total: int,
+    summary: str = "",
+    summarized_count: int = 0,
+    budget_tokens: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Pack the most recent messages into a token budget.
+
+    Args:
+        messages: The newest messages of the session in chronological order
+            (a window ending at the session's last message).
+        total: Number of messages in the whole session.
+        summary: Rolling summary stored on the session, if any.
+        summarized_count: How many leading session messages the summary covers.
+        budget_tokens: Budget shared by the summary and the packed messages.
+
+    Returns:
+        dict with
+        - "messages": packed messages (copies, oversized content truncated),
+          preceded by messages that already left the budget but are not
+          summarized yet,
+        - "summary": the summary to include in the prompt ("" if none),
+        - "pending": messages to fold into the summary now (empty until
+          enough turns have left the window),
+        - "summarized_count": the value to store once "pending" is folded in.
+    """
+    if budget_tokens is None:
+        budget_tokens = Config.CONTEXT_TOKEN_BUDGET_CHAT
+    summary = summary or ""
+    remaining = budget_tokens - estimate_tokens(summary)
+
+    packed = []
+    oldest = len(messages)  # index in `messages` of the oldest packed message
+    for index in range(len(messages) - 1, -1, -1):
+        message = messages[index]
+        if not isinstance(message, dict) or not message.get("content"):
+            continue
+        content = _truncate(str(message["content"]), Config.CONTEXT_MAX_MESSAGE_TOKENS)
+        cost = estimate_tokens(content)
+        if cost > remaining:
+            break
+        remaining -= cost
+        packed.append(dict(message, content=content))
+        oldest = index
+    packed.reverse()
+
+    # Absolute positions: the window starts at `first`, packed messages at `window_start`
+    first = max(total - len(messages), 0)
+    window_start = first + oldest
+    fold_from = max(summarized_count, first)
+    evicted = messages[fold_from - first:window_start - first] if window_start > fold_from else []
+    fold_every = 2 * Config.CONTEXT_SUMMARY_EVERY_TURNS
+    pending = evicted if len(evicted) >= fold_every else []
+
+    # Evicted but not yet summarized: keep the newest of them in the prompt
+    # until a refresh folds them in (bounded while a refresh is in flight)
+    tail = [
+        dict(m, content=_truncate(str(m["content"]), Config.CONTEXT_MAX_MESSAGE_TOKENS))
+        for m in evicted if isinstance(m, dict) and m.get("content")
+    ][-fold_every:] if fold_every else []
+
+    return {
+        "messages": tail + packed,
+        "summary": summary,
+        "pending": pending,
+        "summarized_count": window_start if pending else summarized_count,
+    }
+
+
+def format_messages(messages: List[Dict[str, Any]]) -> str:
+    """Render messages as "Student: ..." / "Tutor: ..." lines."""
+    return "".join(f"{_speaker(m)}: {m.get('content', '')}\n" for m in messages)
+
+
+def refresh_summary(previous_summary: str, pending: List[Dict[str, Any]]) -> Optional[str]:
+    """Fold ``pending`` messages into the previous summary.
+
+    Returns the new summary, or None if the model is unavailable or fails
+    (the caller then keeps the old summary and retries on a later turn).
+    """
+    if not pending:
+        return None
+    max_tokens = Config.CONTEXT_SUMMARY_MAX_TOKENS
+    prompt = f"""You maintain a running summary of a tutoring conversation between a student and a tutor.
+
+Current summary:
+{previous_summary or "(none yet)"}
+
+New messages to fold into the summary:
+{format_messages([dict(m, content=_truncate(str(m.get("content", "")), Config.CONTEXT_MAX_MESSAGE_TOKENS)) for m in pending])}
+Write the updated summary in at most {max_tokens * 3 // 4} words. Keep the topics covered, what the student already understands or struggles with, and any open questions. Return only the summary text."""
+    try:
+        text = generate_text(prompt, generation_config={
+            "temperature": 0.2,
+            "max_output_tokens": max_tokens,
+        })
+        return text or None
+    except Exception:
+        return None
+
+
+_summary_executor: Optional[ThreadPoolExecutor] = None
+_summary_executor_lock = threading.Lock()
+_in_flight = set()
+_in_flight_lock = threading.Lock()
+
+
+def _get_summary_executor() -> ThreadPoolExecutor:
+    global _summary_executor
+    if _summary_executor is None:
+        with _summary_executor_lock:
+            if _summary_executor is None:
+                _summary_executor = ThreadPoolExecutor(
+                    max_workers=max(1, Config.CONTEXT_SUMMARY_WORKERS),
+                    thread_name_prefix="context-summary",
+                )
+    return _summary_executor
+
+
+def submit_summary_refresh(key: Tuple, window: Dict[str, Any],
+                           store: Callable[[str, int], Any]) -> bool:
+    """Fold ``window["pending"]`` into the summary in the background.
+
+    ``store(summary, summarized_count)`` persists the result (it should not
+    move a stored summary backwards). ``key`` identifies the session; a
+    refresh already queued for the same session and count is not repeated.
+
+    Returns:
+        bool: True if a refresh was queued.
+    """
+    if not window or not window["pending"]:
+        return False
+    job_key = (key, window["summarized_count"])
+    with _in_flight_lock:
+        if job_key in _in_flight:
+            return False
+        _in_flight.add(job_key)
+
+    def _run():
+        try:
+            summary = refresh_summary(window["summary"], window["pending"])
+            if summary:
+                store(summary, window["summarized_count"])
+        except Exception as e:
+            # The next turn will retry with the same pending messages
+            print(f"[warn] Conversation summary refresh failed: {e}")
+        finally:
+            with _in_flight_lock:
+                _in_flight.discard(job_key)
+
+    try:
+        _get_summary_executor().submit(_run)
+    except Exception:
+        with _in_flight_lock:
+            _in_flight.discard(job_key)
+        return False
+    return True
@@ -0,0 +1,114 @@
+"""Bounded, rate-limited concurrent image generation.
+
+Image models answer one prompt per round trip, so a video with one image per
+sentence used to pay every round trip back to back. ``map_in_order`` runs a
+per-prompt function on a process-wide thread pool instead:
+
+- at most ``Config.IMAGE_GEN_MAX_WORKERS`` calls are in flight across all
+  requests in this process;
+- call starts are spaced to stay under ``Config.IMAGE_GEN_RATE_PER_MINUTE``
+  (0 disables the limit), shared by every caller;
+- each prompt is retried on its own, up to ``Config.IMAGE_GEN_MAX_ATTEMPTS``
+  with exponential back-off, so one failure never re-runs the others;
+- results come back in prompt order.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+
+from app.config import Config
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces call starts evenly over time."""
+
+    def __init__(self, rate_per_minute: float):
+        self._interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def acquire(self) -> None:
+        """Block until the caller may start its call."""
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_at)
+            self._next_at = start_at + self._interval
+        if start_at > now:
+            time.sleep(start_at - now)
+
+
+_limiter = RateLimiter(Config.IMAGE_GEN_RATE_PER_MINUTE)
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, Config.IMAGE_GEN_MAX_WORKERS),
+                    thread_name_prefix="image-gen",
+                )
+    return _executor
+
+
+def _with_retries(func: Callable[[Any, int], Any], item: Any, index: int) -> Any:
+    attempts = max(1, Config.IMAGE_GEN_MAX_ATTEMPTS)
+    for attempt in range(attempts):
+        _limiter.acquire()
+        try:
+            return func(item, index)
+        except Exception as e:
+            if attempt == attempts - 1:
+                raise
+            delay = Config.IMAGE_GEN_RETRY_BACKOFF_SECONDS * (2 ** attempt)
+            print(f"[info] Image generation attempt {attempt + 1} failed for item {index}: {e}; retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def submit_in_order(func: Callable[[Any, int], Any], items: Sequence[Any]) -> List[Future]:
+    """Start ``func(item, index)`` for every item on the shared image pool.
+
+    Returns one future per item, in item order, so callers can overlap image
+    generation with other work and collect results later.
+    """
+    executor = _get_executor()
+    return [executor.submit(_with_retries, func, item, i) for i, item in enumerate(items)]
+
+
+def map_in_order(func: Callable[[Any, int], Any], items: Sequence[Any],
+                 return_exceptions: bool = False) -> List[Any]:
+    """Call ``func(item, index)`` for every item on the shared image pool.
+
+    Args:
+        func: Generates one result; raising triggers a retry of that item only.
+        items: Prompts (or other per-call inputs).
+        return_exceptions: If True, an item that still fails after its retries
+            yields its exception in place of a result. Otherwise the first
+            failure (in item order) is raised once every item has finished.
+
+    Returns:
+        list: One entry per item, in item order.
+    """
+    if not items:
+        return []
+    futures = submit_in_order(func, items)
+
+    results: List[Any] = []
+    first_error: Optional[BaseException] = None
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append(e)
+            if first_error is None:
+                first_error = e
+    if first_error is not None and not return_exceptions:
+        raise first_error
+    return results
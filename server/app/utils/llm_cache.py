@@ -0,0 +1,172 @@
+"""Content-addressed cache for LLM generations.
+
+Quiz, roadmap and resume-analysis requests are highly repetitive, so their
+parsed model output is cached under a key derived from the endpoint, the
+model, its generation config and the whitespace/case-normalised prompt.
+
+Two tiers:
+- a bounded in-process LRU with TTL (always on when caching is enabled),
+- an optional MongoDB-backed shared tier with a TTL index, so every worker
+  and instance benefits from a generation done by any of them.
+
+Caching is opt-in per endpoint through ``Config.LLM_CACHE_ENDPOINTS``; hit and
+miss counters are available from ``cache_stats()``.
+"""
+
+import copy
+import hashlib
+import json
+import re
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from app.config import Config
+from .cache_utils import LRUCache
+from .mongo_utils import get_collection
+
+
+_memory = LRUCache(Config.LLM_CACHE_MAX_ENTRIES, Config.LLM_CACHE_TTL_SECONDS)
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = defaultdict(
+    lambda: {"memory_hits": 0, "shared_hits": 0, "misses": 0, "stores": 0}
+)
+
+
+def _enabled_endpoints() -> set:
+    return {e.strip() for e in Config.LLM_CACHE_ENDPOINTS.split(",") if e.strip()}
+
+
+def is_enabled(endpoint: str) -> bool:
+    """Return True if caching is switched on for this endpoint."""
+    return Config.LLM_CACHE_ENABLED and endpoint in _enabled_endpoints()
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace and case so trivially different prompts share a key."""
+    return re.sub(r"\s+", " ", (prompt or "").strip()).casefold()
+
+
+def make_key(
+    endpoint: str,
+    prompt: str,
+    model_name: Optional[str] = None,
+    generation_config: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Return the content address (sha256 hex) for a generation request."""
+    payload = json.dumps(
+        {
+            "endpoint": endpoint,
+            "model": model_name or Config.VERTEX_MODEL_NAME,
+            "config": generation_config or {},
+            "prompt": normalize_prompt(prompt),
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _count(endpoint: str, field: str) -> None:
+    with _stats_lock:
+        _stats[endpoint][field] += 1
+
+
+def _shared_collection():
+    if not Config.LLM_CACHE_SHARED:
+        return None
+    return get_collection("MONGODB_LLM_CACHE_COLLECTION")
+
+
+def _shared_get(key: str) -> Any:
+    collection = _shared_collection()
+    if collection is None:
+        return None
+    try:
+        # The TTL monitor only runs once a minute, so also filter on expiry
+        doc = collection.find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.utcnow()}},
+            {"value": 1},
+        )
+        return doc.get("value") if doc else None
+    except Exception:
+        return None
+
+
+def _shared_set(key: str, endpoint: str, value: Any) -> None:
+    collection = _shared_collection()
+    if collection is None:
+        return
+    now = datetime.utcnow()
+    try:
+        collection.update_one(
+            {"_id": key},
+            {"$set": {
+                "endpoint": endpoint,
+                "value": value,
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=Config.LLM_CACHE_TTL_SECONDS),
+            }},
+            upsert=True,
+        )
+    except Exception:
+        pass
+
+
+def get_or_generate(
+    endpoint: str,
+    prompt: str,
+    producer: Callable[[], Any],
+    model_name: Optional[str] = None,
+    generation_config: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """Return a cached generation for this prompt or call ``producer``.
+
+    Args:
+        endpoint: Cache namespace, checked against Config.LLM_CACHE_ENDPOINTS.
+        prompt: The full prompt sent to the model (normalised for the key).
+        producer: Zero-argument callable performing the generation. A result
+            of None is treated as a failure and is not cached.
+        model_name / generation_config: Part of the cache key.
+    """
+    if not is_enabled(endpoint):
+        return producer()
+
+    key = make_key(endpoint, prompt, model_name, generation_config)
+
+    # Callers may mutate what they get back, so never hand out cached objects
+    value = _memory.get(key)
+    if value is not None:
+        _count(endpoint, "memory_hits")
+        return copy.deepcopy(value)
+
+    value = _shared_get(key)
+    if value is not None:
+        _count(endpoint, "shared_hits")
+        _memory.set(key, value)
+        return copy.deepcopy(value)
+
+    _count(endpoint, "misses")
+    value = producer()
+    if value is not None:
+        _memory.set(key, copy.deepcopy(value))
+        _shared_set(key, endpoint, value)
+        _count(endpoint, "stores")
+    return value
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Return per-endpoint hit/miss counters and the in-process tier size."""
+    with _stats_lock:
+        endpoints = {name: dict(counts) for name, counts in _stats.items()}
+    return {
+        "enabled_endpoints": sorted(_enabled_endpoints()) if Config.LLM_CACHE_ENABLED else [],
+        "memory_entries": len(_memory),
+        "endpoints": endpoints,
+    }
+
+
+def clear_cache() -> None:
+    """Drop the in-process tier (the shared tier expires via its TTL index)."""
+    _memory.clear()
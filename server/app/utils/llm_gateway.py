@@ -0,0 +1,157 @@
+"""Central Vertex AI (Gemini) gateway for Edvanta.
+
+All text-generation call sites go through this module instead of repeating
+the credential decoding / ``vertexai.init`` / ``GenerativeModel`` setup on
+every request. The gateway:
+
+- decodes GOOGLE_CREDENTIALS_JSON_BASE64 and calls ``vertexai.init`` once per
+  process (re-initialising after fork),
+- caches ``GenerativeModel`` instances keyed by model name, generation
+  config and system instruction,
+- serialises initialisation behind a lock so concurrent requests never race
+  on ``vertexai.init``.
+
+The Vertex SDK is optional in lightweight deployments; ``init_vertex`` returns
+False and ``get_model`` returns None when it is unavailable so callers can
+serve their existing fallbacks.
+"""
+
+import base64
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import Config
+
+
+_init_lock = threading.Lock()
+_models_lock = threading.Lock()
+_initialized_pid: Optional[int] = None
+_models: Dict[Tuple, Any] = {}
+
+
+def _load_credentials():
+    """Build service-account credentials from Config, or None to use ADC.
+
+    Accepts base64-encoded JSON (the documented format) or literal JSON.
+    Raises if credentials are configured but cannot be parsed.
+    """
+    raw = Config.VERTEX_DEFAULT_CREDENTIALS
+    if not raw:
+        return None
+
+    from google.oauth2 import service_account
+
+    candidate = raw.strip().strip('"').strip("'")
+    if candidate.startswith("{"):
+        info = json.loads(candidate)
+    else:
+        info = json.loads(base64.b64decode(candidate))
+    return service_account.Credentials.from_service_account_info(info)
+
+
+def init_vertex() -> bool:
+    """Initialise the Vertex AI SDK once for this process.
+
+    Returns:
+        bool: True when the SDK is importable and initialised.
+    """
+    global _initialized_pid
+
+    pid = os.getpid()
+    if _initialized_pid == pid:
+        return True
+
+    with _init_lock:
+        if _initialized_pid == pid:
+            return True
+        try:
+            import vertexai
+        except Exception:
+            return False
+
+        try:
+            credentials = _load_credentials()
+            vertexai.init(
+                project=Config.GOOGLE_CLOUD_PROJECT,
+                location=Config.GOOGLE_CLOUD_LOCATION,
+                credentials=credentials,
+            )
+        except Exception:
+            return False
+
+        with _models_lock:
+            # Models built against a previous (parent process) init are stale
+            _models.clear()
+        _initialized_pid = pid
+        return True
+
+
+def _freeze(value: Any) -> Any:
+    """Turn a (possibly nested) config mapping into a hashable cache key."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def get_model(
+    model_name: Optional[str] = None,
+    generation_config: Optional[Dict[str, Any]] = None,
+    system_instruction: Optional[str] = None,
+):
+    """Return a cached ``GenerativeModel`` (or None if Vertex is unavailable).
+
+    Args:
+        model_name: Vertex model id; defaults to Config.VERTEX_MODEL_NAME.
+        generation_config: Optional dict of GenerationConfig fields
+            (temperature, top_p, top_k, max_output_tokens, ...).
+        system_instruction: Optional system instruction baked into the model.
+    """
+    if not init_vertex():
+        return None
+
+    model_name = model_name or Config.VERTEX_MODEL_NAME
+    key = (model_name, _freeze(generation_config or {}), system_instruction)
+
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _models_lock:
+        model = _models.get(key)
+        if model is not None:
+            return model
+        try:
+            from vertexai.generative_models import GenerationConfig, GenerativeModel
+        except Exception:
+            return None
+
+        kwargs: Dict[str, Any] = {}
+        if generation_config:
+            kwargs["generation_config"] = GenerationConfig(**generation_config)
+        if system_instruction:
+            kwargs["system_instruction"] = system_instruction
+        model = GenerativeModel(model_name, **kwargs)
+        _models[key] = model
+        return model
+
+
+def generate_text(
+    prompt: Any,
+    model_name: Optional[str] = None,
+    generation_config: Optional[Dict[str, Any]] = None,
+    **kwargs: Any,
+) -> str:
+    """Generate text with a cached model and return the stripped response text.
+
+    Raises RuntimeError when the Vertex SDK is unavailable; SDK errors are
+    propagated so callers keep their own fallback handling.
+    """
+    model = get_model(model_name, generation_config)
+    if model is None:
+        raise RuntimeError("Vertex SDK not available")
+    response = model.generate_content(prompt, **kwargs)
+    return (response.text or "").strip()
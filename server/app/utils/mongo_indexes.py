@@ -0,0 +1,212 @@
+"""Declarative MongoDB index manifest for Edvanta collections.
+
+Every hot query in the blueprints filters on a per-user field and usually
+sorts on a timestamp. The indexes those queries need are declared here in
+one place, keyed by the Config attribute that names the collection, so they
+can be created idempotently at startup (``ensure_indexes``) or from the CLI::
+
+    flask --app index ensure-indexes
+    flask --app index verify-indexes
+
+``verify_indexes`` runs ``explain()`` on each route's canonical query and
+reports any plan that falls back to a collection scan.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from .mongo_utils import get_collection
+
+
+# Config attribute -> indexes for that collection
+INDEX_MANIFEST: Dict[str, List[IndexModel]] = {
+    "MONGODB_QUIZ_COLLECTION": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # _id breaks created_at ties for keyset pagination of the catalogue
+        IndexModel(
+            [("created_by", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="created_by_created_at_id",
+        ),
+    ],
+    "MONGODB_QUIZ_HISTORY_COLLECTION": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("userId", ASCENDING), ("completedAt", DESCENDING)],
+            name="userId_completedAt",
+        ),
+    ],
+    "MONGODB_CHAT_COLLECTION": [
+        # _id breaks lastActivity ties for keyset pagination of the session list
+        IndexModel(
+            [("userEmail", ASCENDING), ("lastActivity", DESCENDING), ("_id", DESCENDING)],
+            name="userEmail_lastActivity_id",
+        ),
+        # Legacy clients still identify themselves by userId
+        IndexModel(
+            [("userId", ASCENDING), ("lastActivity", DESCENDING), ("_id", DESCENDING)],
+            name="userId_lastActivity_id",
+            sparse=True,
+        ),
+    ],
+    "MONGODB_VOICE_CHAT_COLLECTION": [
+        IndexModel([("user_email", ASCENDING)], name="user_email_unique", unique=True),
+    ],
+    "MONGODB_VOICE_SESSIONS_COLLECTION": [
+        IndexModel(
+            [("user_email", ASCENDING), ("session_id", ASCENDING)],
+            name="user_email_session_id_unique",
+            unique=True,
+        ),
+        IndexModel(
+            [("user_email", ASCENDING), ("created_at", DESCENDING)],
+            name="user_email_created_at",
+        ),
+    ],
+    "MONGODB_VOICE_MESSAGES_COLLECTION": [
+        IndexModel(
+            [("user_email", ASCENDING), ("session_id", ASCENDING), ("seq", ASCENDING)],
+            name="user_email_session_id_seq_unique",
+            unique=True,
+        ),
+    ],
+    "MONGODB_ACTIVE_SESSIONS_COLLECTION": [
+        IndexModel([("user_email", ASCENDING)], name="user_email_unique", unique=True),
+    ],
+    "MONGODB_ROADMAP_COLLECTION": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("user_email", ASCENDING), ("created_at", DESCENDING)],
+            name="user_email_created_at",
+        ),
+    ],
+    "MONGODB_QUESTION_BANK_COLLECTION": [
+        IndexModel(
+            [("topic_key", ASCENDING), ("difficulty", ASCENDING)],
+            name="topic_key_difficulty",
+        ),
+    ],
+    "MONGODB_QUESTION_BANK_SEEN_COLLECTION": [
+        IndexModel(
+            [("user_email", ASCENDING), ("topic_key", ASCENDING),
+             ("difficulty", ASCENDING), ("question_id", ASCENDING)],
+            name="user_email_topic_key_difficulty_question_id_unique",
+            unique=True,
+        ),
+    ],
+    "MONGODB_QUESTION_BANK_TOPICS_COLLECTION": [
+        IndexModel([("requests", DESCENDING)], name="requests"),
+    ],
+    "MONGODB_USER_STATS_COLLECTION": [
+        IndexModel([("user_email", ASCENDING)], name="user_email_unique", unique=True),
+    ],
+    "MONGODB_QUIZ_DAILY_ROLLUPS_COLLECTION": [
+        IndexModel([("user_email", ASCENDING), ("day", ASCENDING)], name="user_email_day"),
+    ],
+    "MONGODB_VISUAL_JOBS_COLLECTION": [
+        # Finished and abandoned jobs are removed by the TTL monitor
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "MONGODB_LLM_CACHE_COLLECTION": [
+        # Documents are removed by the TTL monitor once expires_at passes
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+
+# Canonical query per route: (label, Config attribute, filter, sort)
+CANONICAL_QUERIES: List[tuple] = [
+    ("GET /api/tools/quizzes", "MONGODB_QUIZ_COLLECTION",
+     {"created_by": "user@example.com"}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("POST /api/quizzes/submit", "MONGODB_QUIZ_COLLECTION",
+     {"id": "quiz-id"}, None),
+    ("GET /api/tools/quizzes/<quiz_id>", "MONGODB_QUIZ_COLLECTION",
+     {"id": "quiz-id", "created_by": "user@example.com"}, None),
+    ("POST /api/quizzes/generate (question bank)", "MONGODB_QUESTION_BANK_COLLECTION",
+     {"topic_key": "python", "difficulty": "medium"}, None),
+    ("POST /api/quizzes/generate (seen questions)", "MONGODB_QUESTION_BANK_SEEN_COLLECTION",
+     {"user_email": "user@example.com", "topic_key": "python", "difficulty": "medium"}, None),
+    ("GET /api/quiz-history", "MONGODB_QUIZ_HISTORY_COLLECTION",
+     {"userId": "user@example.com"}, [("completedAt", DESCENDING)]),
+    ("GET /api/chat/loadChat", "MONGODB_CHAT_COLLECTION",
+     {"userEmail": "user@example.com"}, [("lastActivity", DESCENDING), ("_id", DESCENDING)]),
+    ("GET /api/tutor/chat/history (latest session)", "MONGODB_VOICE_SESSIONS_COLLECTION",
+     {"user_email": "user@example.com"}, [("created_at", DESCENDING)]),
+    ("GET /api/tutor/chat/history", "MONGODB_VOICE_MESSAGES_COLLECTION",
+     {"user_email": "user@example.com", "session_id": "session-id"}, [("seq", DESCENDING)]),
+    ("GET /api/tutor/session/active", "MONGODB_ACTIVE_SESSIONS_COLLECTION",
+     {"user_email": "user@example.com"}, None),
+    ("GET /api/quiz-analytics (breakdowns)", "MONGODB_QUIZ_HISTORY_COLLECTION",
+     {"userId": {"$in": ["user@example.com"]}, "completedAt": {"$gte": "2024-01-01"}}, None),
+    ("GET /api/quiz-analytics (trend)", "MONGODB_QUIZ_DAILY_ROLLUPS_COLLECTION",
+     {"user_email": {"$in": ["user@example.com"]}, "day": {"$gte": "2024-01-01"}}, None),
+    ("GET /api/user-stats", "MONGODB_USER_STATS_COLLECTION",
+     {"user_email": "user@example.com"}, None),
+    ("GET /api/roadmap/user", "MONGODB_ROADMAP_COLLECTION",
+     {"user_email": "user@example.com"}, [("created_at", DESCENDING)]),
+    ("GET /api/roadmap/<roadmap_id>", "MONGODB_ROADMAP_COLLECTION",
+     {"id": "roadmap-id", "user_email": "user@example.com"}, None),
+]
+
+
+def ensure_indexes() -> Dict[str, Any]:
+    """Create every index in INDEX_MANIFEST (idempotent).
+
+    Returns:
+        dict mapping Config attribute to the created index names, or to an
+        error string when creation failed for that collection. Returns an
+        empty dict when MongoDB is not available.
+    """
+    results: Dict[str, Any] = {}
+    for config_attr, indexes in INDEX_MANIFEST.items():
+        collection = get_collection(config_attr)
+        if collection is None:
+            return {}
+        try:
+            results[config_attr] = collection.create_indexes(indexes)
+        except Exception as e:
+            results[config_attr] = f"error: {e}"
+    return results
+
+
+def _plan_stages(plan: Optional[dict]) -> List[str]:
+    """Flatten the stage names of an explain() plan tree."""
+    if not plan:
+        return []
+    stages = [plan.get("stage", "")]
+    if "queryPlan" in plan:
+        stages.extend(_plan_stages(plan["queryPlan"]))
+    if "inputStage" in plan:
+        stages.extend(_plan_stages(plan["inputStage"]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+
+def verify_indexes() -> List[Dict[str, Any]]:
+    """Explain each canonical query and flag collection scans.
+
+    Returns:
+        list of {"query", "collection", "stages", "ok"} entries; "ok" is False
+        when the winning plan contains a COLLSCAN stage or explain() failed.
+    """
+    report: List[Dict[str, Any]] = []
+    for label, config_attr, query, sort in CANONICAL_QUERIES:
+        collection = get_collection(config_attr)
+        if collection is None:
+            report.append({"query": label, "collection": config_attr,
+                           "stages": [], "ok": False, "error": "MongoDB unavailable"})
+            continue
+        try:
+            cursor = collection.find(query)
+            if sort:
+                cursor = cursor.sort(sort)
+            explained = cursor.explain()
+            winning = explained.get("queryPlanner", {}).get("winningPlan", {})
+            stages = _plan_stages(winning)
+            report.append({"query": label, "collection": collection.name,
+                           "stages": stages, "ok": "COLLSCAN" not in stages})
+        except Exception as e:
+            report.append({"query": label, "collection": collection.name,
+                           "stages": [], "ok": False, "error": str(e)})
+    return report
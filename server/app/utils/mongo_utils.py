@@ -1,20 +1,177 @@
 """MongoDB utility helpers for centralized connection management.
 
+A single ``MongoClient`` is shared by every blueprint and helper in the
+process. The client is created lazily on first use, sized from ``Config``
+(pool limits and timeouts) and recreated automatically after ``fork()`` so
+pre-forking servers (gunicorn, uwsgi) never share sockets across workers.
+
 Provides:
-- connect_to_mongodb: returns (client, db, collection_name)
-- get_db_connection: returns db only (for legacy helpers)
+- get_client: returns the process-wide MongoClient (or None)
+- get_db: returns the configured database (or None)
+- get_collection: returns a cached collection handle by Config attribute
+- close_client: closes the shared client (shutdown / tests)
+- connect_to_mongodb: returns (client, db, collection_name) (legacy helpers)
+- get_db_connection: returns db only (legacy helpers)
 """
 
+import os
+import threading
+import time
 from pymongo import MongoClient
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 from app.config import Config
 
 
+_lock = threading.Lock()
+_client: Optional[MongoClient] = None
+_client_pid: Optional[int] = None
+_collections: Dict[str, object] = {}
+# Monotonic timestamp of the last failed connection attempt. While the
+# server is unreachable we avoid paying a server-selection timeout on every
+# request and only retry after MONGODB_RETRY_INTERVAL_SECONDS.
+_last_failure: Optional[float] = None
+
+
+def _forget_client() -> None:
+    """Drop the inherited client reference without closing it.
+
+    Closing would tear down sockets that still belong to the parent, so a
+    forked child simply forgets the reference and builds its own pool on
+    next use.
+    """
+    global _client, _client_pid, _last_failure
+    _client = None
+    _client_pid = None
+    _last_failure = None
+    _collections.clear()
+
+
+def _reset_after_fork() -> None:
+    """Reinitialize module state in a freshly forked child process."""
+    global _lock
+    _lock = threading.Lock()
+    _forget_client()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _client_options() -> dict:
+    """Build MongoClient keyword arguments from Config."""
+    return {
+        "maxPoolSize": Config.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": Config.MONGODB_MIN_POOL_SIZE,
+        "maxIdleTimeMS": Config.MONGODB_MAX_IDLE_TIME_MS,
+        "serverSelectionTimeoutMS": Config.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": Config.MONGODB_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": Config.MONGODB_SOCKET_TIMEOUT_MS,
+        "retryWrites": True,
+        "appname": "edvanta-backend",
+    }
+
+
+def get_client() -> Optional[MongoClient]:
+    """Return the shared MongoClient, creating it on first use.
+
+    The connection is validated once with a ``ping`` when the client is
+    created. Returns None if MongoDB is not configured or unreachable so
+    callers can fall back to their in-memory stores.
+    """
+    global _client, _client_pid, _last_failure
+
+    if not Config.MONGODB_URI or not Config.MONGODB_DB_NAME:
+        return None
+
+    pid = os.getpid()
+    client = _client
+    if client is not None and _client_pid == pid:
+        return client
+
+    with _lock:
+        if _client is not None and _client_pid == pid:
+            return _client
+        if _client is not None:
+            # Inherited from a parent process on a platform without
+            # register_at_fork; never reuse it.
+            _forget_client()
+
+        if (
+            _last_failure is not None
+            and time.monotonic() - _last_failure < Config.MONGODB_RETRY_INTERVAL_SECONDS
+        ):
+            return None
+
+        try:
+            client = MongoClient(Config.MONGODB_URI, **_client_options())
+            client.admin.command("ping")
+        except Exception:
+            _last_failure = time.monotonic()
+            return None
+
+        _client = client
+        _client_pid = pid
+        _last_failure = None
+        return client
+
+
+def get_db():
+    """Return the configured database object or None if unavailable."""
+    client = get_client()
+    if client is None:
+        return None
+    return client[Config.MONGODB_DB_NAME]
+
+
+def get_collection(
+    collection_config_attr: Optional[str] = None,
+    fallback_collection: Optional[str] = None,
+):
+    """Return a cached collection handle, or None if MongoDB is unavailable.
+
+    Args:
+        collection_config_attr: Name of the attribute in Config that contains the
+            collection name (e.g., "MONGODB_ROADMAP_COLLECTION").
+        fallback_collection: Used when collection_config_attr is None or not found.
+    """
+    collection_name = None
+    if collection_config_attr:
+        collection_name = getattr(Config, collection_config_attr, None)
+    if not collection_name:
+        collection_name = fallback_collection
+    if not collection_name:
+        return None
+
+    db = get_db()
+    if db is None:
+        return None
+
+    collection = _collections.get(collection_name)
+    if collection is None:
+        collection = db[collection_name]
+        _collections[collection_name] = collection
+    return collection
+
+
+def close_client() -> None:
+    """Close the shared client and forget cached collection handles."""
+    global _client, _client_pid
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            try:
+                _client.close()
+            except Exception:
+                pass
+        _client = None
+        _client_pid = None
+        _collections.clear()
+
+
 def connect_to_mongodb(
     collection_config_attr: Optional[str] = None,
     fallback_collection: Optional[str] = None,
 ) -> Tuple[Optional[MongoClient], Optional[object], Optional[str]]:
-    """Create a MongoDB connection and return (client, db, collection_name).
+    """Return (client, db, collection_name) backed by the shared client.
 
     Args:
         collection_config_attr: Name of the attribute in Config that contains the
@@ -25,28 +182,19 @@ def connect_to_mongodb(
     Returns:
         (client, db, collection_name) — any of these may be None if connection fails
     """
-    try:
-        connection_string = Config.MONGODB_URI
-        db_name = Config.MONGODB_DB_NAME
-
-        if not connection_string or not db_name:
-            return None, None, None
-
-        client = MongoClient(connection_string)
-        # Validate connection
-        client.admin.command("ping")
-
-        db = client[db_name]
-        collection_name = None
-        if collection_config_attr:
-            collection_name = getattr(Config, collection_config_attr, None)
-        if not collection_name:
-            collection_name = fallback_collection
-
-        return client, db, collection_name
-    except Exception:
+    client = get_client()
+    if client is None:
         return None, None, None
 
+    db = client[Config.MONGODB_DB_NAME]
+    collection_name = None
+    if collection_config_attr:
+        collection_name = getattr(Config, collection_config_attr, None)
+    if not collection_name:
+        collection_name = fallback_collection
+
+    return client, db, collection_name
+
 
 def get_db_connection():
     """Return only the database object (legacy compatibility).
@@ -54,5 +202,4 @@ def get_db_connection():
     Returns:
         db or None if connection fails
     """
-    client, db, _ = connect_to_mongodb()
-    return db
+    return get_db()
@@ -0,0 +1,191 @@
+"""Persistent bank of validated, de-duplicated quiz questions.
+
+Every question the model generates is validated, normalised and stored once
+under a content hash, bucketed by (normalised topic, difficulty). Quiz
+generation draws questions a user has not been served yet from the bucket
+and only asks the model for the shortfall (see
+``quizzes_utils.build_quiz``).
+
+Collections (all named in Config):
+- ``MONGODB_QUESTION_BANK_COLLECTION``: one document per question, ``_id`` is
+  the content hash.
+- ``MONGODB_QUESTION_BANK_SEEN_COLLECTION``: (user, question) pairs already
+  served, so a user is not given the same question twice.
+- ``MONGODB_QUESTION_BANK_TOPICS_COLLECTION``: request counters per bucket,
+  used to pick the popular topics the refill task tops up.
+
+Every function degrades to a no-op / empty result when MongoDB is not
+available, so quiz generation falls back to calling the model directly.
+"""
+
+import hashlib
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from .mongo_utils import get_collection
+
+
+def normalize_topic(topic: str) -> str:
+    """Bucket key for a topic: trimmed, whitespace-collapsed and casefolded."""
+    return re.sub(r"\s+", " ", (topic or "").strip()).casefold()
+
+
+def _normalize_text(text: Any) -> str:
+    return re.sub(r"\s+", " ", str(text or "").strip())
+
+
+def validate_question(question: Any) -> Optional[Dict[str, Any]]:
+    """Return a normalised copy of a generated question, or None if invalid.
+
+    A valid question has non-empty text, exactly four distinct non-empty
+    options and a correctAnswer equal to one of them.
+    """
+    if not isinstance(question, dict):
+        return None
+    text = _normalize_text(question.get("question"))
+    options = question.get("options")
+    if not text or not isinstance(options, list):
+        return None
+    options = [_normalize_text(o) for o in options]
+    correct = _normalize_text(question.get("correctAnswer"))
+    if len(options) != 4 or not all(options) or len(set(options)) != 4 or correct not in options:
+        return None
+    return {"question": text, "options": options, "correctAnswer": correct}
+
+
+def question_hash(topic_key: str, difficulty: str, question: Dict[str, Any]) -> str:
+    """Content hash of a normalised question within its bucket (option order ignored)."""
+    payload = json.dumps(
+        [topic_key, difficulty, question["question"].casefold(),
+         sorted(o.casefold() for o in question["options"])],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def store_questions(topic: str, difficulty: str, questions: List[Dict[str, Any]]) -> int:
+    """Add validated questions to the bank, skipping duplicates.
+
+    Returns:
+        int: Number of questions that were new to the bank.
+    """
+    collection = get_collection("MONGODB_QUESTION_BANK_COLLECTION")
+    if collection is None or not questions:
+        return 0
+
+    topic_key = normalize_topic(topic)
+    now = datetime.utcnow()
+    ops = []
+    for raw in questions:
+        question = validate_question(raw)
+        if question is None:
+            continue
+        ops.append(UpdateOne(
+            {"_id": question_hash(topic_key, difficulty, question)},
+            {"$setOnInsert": dict(
+                question,
+                topic=topic.strip(),
+                topic_key=topic_key,
+                difficulty=difficulty,
+                created_at=now,
+            )},
+            upsert=True,
+        ))
+    if not ops:
+        return 0
+    try:
+        return collection.bulk_write(ops, ordered=False).upserted_count
+    except Exception:
+        return 0
+
+
+def draw_questions(topic: str, difficulty: str, count: int,
+                   user_email: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Pick up to ``count`` random bank questions the user has not been served.
+
+    Returns question dicts with their bank hash under ``_id``.
+    """
+    collection = get_collection("MONGODB_QUESTION_BANK_COLLECTION")
+    if collection is None or count <= 0:
+        return []
+
+    topic_key = normalize_topic(topic)
+    match: Dict[str, Any] = {"topic_key": topic_key, "difficulty": difficulty}
+    try:
+        if user_email:
+            seen = get_collection("MONGODB_QUESTION_BANK_SEEN_COLLECTION")
+            if seen is not None:
+                seen_ids = [doc["question_id"] for doc in seen.find(
+                    {"user_email": user_email, "topic_key": topic_key, "difficulty": difficulty},
+                    {"_id": 0, "question_id": 1},
+                )]
+                if seen_ids:
+                    match["_id"] = {"$nin": seen_ids}
+        return list(collection.aggregate([
+            {"$match": match},
+            {"$sample": {"size": count}},
+            {"$project": {"question": 1, "options": 1, "correctAnswer": 1}},
+        ]))
+    except Exception:
+        return []
+
+
+def mark_seen(user_email: Optional[str], topic: str, difficulty: str, question_ids: List[str]) -> None:
+    """Record that these bank questions were served to the user."""
+    if not user_email or not question_ids:
+        return
+    seen = get_collection("MONGODB_QUESTION_BANK_SEEN_COLLECTION")
+    if seen is None:
+        return
+    topic_key = normalize_topic(topic)
+    now = datetime.utcnow()
+    try:
+        seen.bulk_write([
+            UpdateOne(
+                {"user_email": user_email, "topic_key": topic_key,
+                 "difficulty": difficulty, "question_id": question_id},
+                {"$setOnInsert": {"served_at": now}},
+                upsert=True,
+            )
+            for question_id in question_ids
+        ], ordered=False)
+    except Exception:
+        pass
+
+
+def record_request(topic: str, difficulty: str) -> None:
+    """Count a quiz request for the bucket (drives the refill task)."""
+    topics = get_collection("MONGODB_QUESTION_BANK_TOPICS_COLLECTION")
+    if topics is None:
+        return
+    topic_key = normalize_topic(topic)
+    try:
+        topics.update_one(
+            {"_id": f"{topic_key}|{difficulty}"},
+            {
+                "$inc": {"requests": 1},
+                "$set": {"last_requested_at": datetime.utcnow()},
+                "$setOnInsert": {"topic": topic.strip(), "topic_key": topic_key, "difficulty": difficulty},
+            },
+            upsert=True,
+        )
+    except Exception:
+        pass
+
+
+def popular_buckets(limit: int) -> List[Dict[str, Any]]:
+    """Most requested (topic, difficulty) buckets with their current bank size."""
+    topics = get_collection("MONGODB_QUESTION_BANK_TOPICS_COLLECTION")
+    collection = get_collection("MONGODB_QUESTION_BANK_COLLECTION")
+    if topics is None or collection is None:
+        return []
+    buckets = list(topics.find({}, {"topic": 1, "topic_key": 1, "difficulty": 1, "requests": 1})
+                   .sort("requests", -1).limit(limit))
+    for bucket in buckets:
+        bucket["banked"] = collection.count_documents(
+            {"topic_key": bucket["topic_key"], "difficulty": bucket["difficulty"]})
+    return buckets
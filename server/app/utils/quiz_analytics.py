@@ -0,0 +1,307 @@
+"""Quiz performance analytics: topic/difficulty breakdowns and trend lines.
+
+Breakdowns are a single ``$facet`` aggregation over ``quiz_history``,
+matched on the indexed ``(userId, completedAt)`` prefix so only the
+requested users (and optional time window) are read.
+
+Trend lines never touch raw attempts. Every logged attempt is also folded
+into a daily rollup document, one per (user, UTC day), in
+``Config.MONGODB_QUIZ_DAILY_ROLLUPS_COLLECTION``; a trend query reads at
+most one document per user per day in the window, however many attempts
+the users made. ``backfill_quiz_rollups`` rebuilds the rollups from
+``quiz_history`` for attempts logged before they existed.
+"""
+
+import re
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+
+from .mongo_utils import get_collection
+
+
+# Rows returned per breakdown facet
+MAX_BREAKDOWN_ROWS = 50
+
+_DAY_RE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+def _rollups_collection():
+    return get_collection("MONGODB_QUIZ_DAILY_ROLLUPS_COLLECTION")
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _day(completed_at: Any) -> date:
+    """UTC calendar day of an attempt's ``completedAt`` (today if unparseable)."""
+    if isinstance(completed_at, datetime):
+        return completed_at.date()
+    if isinstance(completed_at, str) and _DAY_RE.match(completed_at):
+        try:
+            return date.fromisoformat(completed_at[:10])
+        except ValueError:
+            pass
+    return datetime.utcnow().date()
+
+
+def _week_start(day: date) -> date:
+    """Monday of the ISO week containing ``day``."""
+    return day - timedelta(days=day.weekday())
+
+
+def _rollup_key(user_email: str, day: date) -> Dict[str, Any]:
+    return {"_id": f"{user_email}|{day.isoformat()}"}
+
+
+def record_daily_rollup(user_email: str, correct_answers: Any, total_questions: Any,
+                        percentage: Any, completed_at: Any = None) -> bool:
+    """Fold one logged quiz attempt into the user's rollup for its day."""
+    collection = _rollups_collection()
+    if collection is None or not user_email:
+        return False
+    day = _day(completed_at)
+    percentage = _number(percentage)
+    try:
+        collection.update_one(
+            _rollup_key(user_email, day),
+            {
+                "$inc": {
+                    "attempts": 1,
+                    "correct_answers": int(_number(correct_answers)),
+                    "total_questions": int(_number(total_questions)),
+                    "percentage_sum": percentage,
+                },
+                "$max": {"best_percentage": percentage},
+                "$setOnInsert": {
+                    "user_email": user_email,
+                    "day": day.isoformat(),
+                    "week": _week_start(day).isoformat(),
+                },
+            },
+            upsert=True,
+        )
+        return True
+    except Exception:
+        return False
+
+
+def clear_daily_rollups(user_email: str) -> bool:
+    """Drop a user's rollups (the user cleared their quiz history)."""
+    collection = _rollups_collection()
+    if collection is None or not user_email:
+        return False
+    try:
+        collection.delete_many({"user_email": user_email})
+        return True
+    except Exception:
+        return False
+
+
+def _as_double(field: str) -> Dict[str, Any]:
+    # History values come straight from the client; tolerate strings and nulls
+    return {"$convert": {"input": field, "to": "double", "onError": 0, "onNull": 0}}
+
+
+def _summary_group(key: Any) -> Dict[str, Any]:
+    return {
+        "_id": key,
+        "attempts": {"$sum": 1},
+        "correct_answers": {"$sum": _as_double("$correctAnswers")},
+        "total_questions": {"$sum": _as_double("$totalQuestions")},
+        "percentage_sum": {"$sum": _as_double("$percentage")},
+        "best_percentage": {"$max": _as_double("$percentage")},
+        "last_attempt_at": {"$max": "$completedAt"},
+    }
+
+
+def _finish(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a summed group row into the response shape (averages and accuracy)."""
+    attempts = row.pop("attempts", 0)
+    questions = row.get("total_questions", 0)
+    percentage_sum = row.pop("percentage_sum", 0)
+    row.setdefault("best_percentage", 0)
+    row.update(
+        attempts=attempts,
+        correct_answers=int(row.get("correct_answers", 0)),
+        total_questions=int(questions),
+        accuracy=round(row.get("correct_answers", 0) / questions * 100, 1) if questions else 0,
+        average_percentage=round(percentage_sum / attempts, 1) if attempts else 0,
+    )
+    return row
+
+
+def get_breakdowns(user_emails: List[str], since: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Totals plus per-topic and per-difficulty performance for the given users.
+
+    Args:
+        user_emails: Users whose attempts are included (one user, or a class).
+        since: Optional ISO date/time; only attempts completed at or after it.
+
+    Returns:
+        dict with "totals", "by_topic" and "by_difficulty", or None if MongoDB
+        is not available.
+    """
+    history = get_collection("MONGODB_QUIZ_HISTORY_COLLECTION")
+    if history is None:
+        return None
+
+    match: Dict[str, Any] = {"userId": user_emails[0] if len(user_emails) == 1 else {"$in": user_emails}}
+    if since:
+        match["completedAt"] = {"$gte": since}
+
+    rows = list(history.aggregate([
+        {"$match": match},
+        {"$facet": {
+            "totals": [{"$group": _summary_group(None)}],
+            "by_topic": [
+                # Group case/whitespace variants of a topic together
+                {"$group": dict(
+                    _summary_group({"$toLower": {"$trim": {"input": {"$ifNull": ["$topic", ""]}}}}),
+                    topic={"$first": "$topic"},
+                )},
+                {"$sort": {"attempts": -1, "_id": 1}},
+                {"$limit": MAX_BREAKDOWN_ROWS},
+            ],
+            "by_difficulty": [
+                {"$group": _summary_group({"$ifNull": ["$difficulty", "unknown"]})},
+                {"$sort": {"_id": 1}},
+            ],
+        }},
+    ], allowDiskUse=True))
+    facets = rows[0] if rows else {}
+
+    totals = facets.get("totals") or [{"_id": None}]
+    totals = _finish(totals[0])
+    totals.pop("_id", None)
+
+    by_topic = []
+    for row in facets.get("by_topic", []):
+        row.pop("_id", None)
+        by_topic.append(_finish(row))
+
+    by_difficulty = []
+    for row in facets.get("by_difficulty", []):
+        row["difficulty"] = row.pop("_id")
+        by_difficulty.append(_finish(row))
+
+    return {"totals": totals, "by_topic": by_topic, "by_difficulty": by_difficulty}
+
+
+def get_trend(user_emails: List[str], periods: int, granularity: str = "week",
+              today: Optional[date] = None) -> Optional[List[Dict[str, Any]]]:
+    """Attempts and accuracy per day or week, read from the daily rollups.
+
+    Returns one point per period, oldest first, with empty periods filled
+    with zeros so the client can plot it directly. None if MongoDB is not
+    available.
+    """
+    collection = _rollups_collection()
+    if collection is None:
+        return None
+
+    today = today or datetime.utcnow().date()
+    if granularity == "day":
+        starts = [today - timedelta(days=i) for i in range(periods - 1, -1, -1)]
+        period_field = "$day"
+    else:
+        this_week = _week_start(today)
+        starts = [this_week - timedelta(weeks=i) for i in range(periods - 1, -1, -1)]
+        period_field = "$week"
+
+    match: Dict[str, Any] = {
+        "user_email": user_emails[0] if len(user_emails) == 1 else {"$in": user_emails},
+        "day": {"$gte": starts[0].isoformat()},
+    }
+    grouped = {
+        row["_id"]: row
+        for row in collection.aggregate([
+            {"$match": match},
+            {"$group": {
+                "_id": period_field,
+                "attempts": {"$sum": "$attempts"},
+                "correct_answers": {"$sum": "$correct_answers"},
+                "total_questions": {"$sum": "$total_questions"},
+                "percentage_sum": {"$sum": "$percentage_sum"},
+                "best_percentage": {"$max": "$best_percentage"},
+            }},
+        ])
+    }
+
+    points = []
+    for start in starts:
+        row = grouped.get(start.isoformat(), {})
+        row.pop("_id", None)
+        points.append(dict(_finish(row), period_start=start.isoformat()))
+    return points
+
+
+def backfill_quiz_rollups(user_emails: Optional[Iterable[str]] = None, batch_size: int = 500) -> int:
+    """Rebuild daily rollups from quiz_history (idempotent).
+
+    Args:
+        user_emails: Only rebuild these users' rollups (default: everyone).
+
+    Returns:
+        int: Number of rollup documents written.
+
+    Raises:
+        RuntimeError: if MongoDB is not available.
+    """
+    collection = _rollups_collection()
+    history = get_collection("MONGODB_QUIZ_HISTORY_COLLECTION")
+    if collection is None or history is None:
+        raise RuntimeError("MongoDB is not available")
+
+    query: Dict[str, Any] = {}
+    if user_emails is not None:
+        user_emails = list(user_emails)
+        query["userId"] = {"$in": user_emails}
+
+    rollups: Dict[tuple, Dict[str, Any]] = {}
+    for entry in history.find(query, {"_id": 0, "userId": 1, "completedAt": 1, "correctAnswers": 1,
+                                      "totalQuestions": 1, "percentage": 1}):
+        user_email = entry.get("userId")
+        if not user_email:
+            continue
+        day = _day(entry.get("completedAt"))
+        rollup = rollups.setdefault((user_email, day), {
+            "user_email": user_email,
+            "day": day.isoformat(),
+            "week": _week_start(day).isoformat(),
+            "attempts": 0,
+            "correct_answers": 0,
+            "total_questions": 0,
+            "percentage_sum": 0.0,
+            "best_percentage": 0.0,
+        })
+        percentage = _number(entry.get("percentage"))
+        rollup["attempts"] += 1
+        rollup["correct_answers"] += int(_number(entry.get("correctAnswers")))
+        rollup["total_questions"] += int(_number(entry.get("totalQuestions")))
+        rollup["percentage_sum"] += percentage
+        rollup["best_percentage"] = max(rollup["best_percentage"], percentage)
+
+    ops = [
+        UpdateOne(_rollup_key(user_email, day), {"$set": rollup}, upsert=True)
+        for (user_email, day), rollup in rollups.items()
+    ]
+    for i in range(0, len(ops), batch_size):
+        collection.bulk_write(ops[i:i + batch_size], ordered=False)
+
+    # Drop rollups for days (and users) that no longer have any history
+    rebuilt: Dict[str, List[str]] = {}
+    for user_email, day in rollups:
+        rebuilt.setdefault(user_email, []).append(_rollup_key(user_email, day)["_id"])
+    if user_emails is None:
+        collection.delete_many({"user_email": {"$nin": list(rebuilt)}})
+    else:
+        collection.delete_many({"user_email": {"$in": [u for u in user_emails if u not in rebuilt]}})
+    for user_email, ids in rebuilt.items():
+        collection.delete_many({"user_email": user_email, "_id": {"$nin": ids}})
+    return len(ops)
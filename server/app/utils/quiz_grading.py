@@ -0,0 +1,126 @@
+"""Quiz grading against cached answer keys.
+
+Saved quizzes are never modified after insert, so grading does not need the
+quiz document itself: only each question's id, correct answer and the text
+echoed back in the feedback. Those answer keys are kept in a bounded
+in-process LRU keyed by quiz id and loaded from MongoDB with a projection on
+a miss (one ``$in`` query for a whole batch of submissions).
+
+Deleting a quiz invalidates its key in this process; other workers drop
+theirs when ``Config.QUIZ_ANSWER_KEY_TTL_SECONDS`` expires.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.config import Config
+from .cache_utils import LRUCache
+from .mongo_utils import get_collection
+
+
+_answer_keys = LRUCache(Config.QUIZ_ANSWER_KEY_CACHE_SIZE, Config.QUIZ_ANSWER_KEY_TTL_SECONDS)
+
+# Only the fields grading and feedback need
+_ANSWER_KEY_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "questions.id": 1,
+    "questions.question": 1,
+    "questions.correctAnswer": 1,
+    "questions.options": 1,
+}
+
+
+def _compact(quiz: Dict[str, Any]) -> tuple:
+    """Turn a projected quiz into an ordered tuple of (id, question, correctAnswer, options)."""
+    return tuple(
+        (q.get("id"), q.get("question"), q.get("correctAnswer"), tuple(q.get("options") or ()))
+        for q in quiz.get("questions", [])
+    )
+
+
+def get_answer_keys(quiz_ids: Iterable[str]) -> Dict[str, tuple]:
+    """Return answer keys for the given quiz ids, loading misses in one query.
+
+    Unknown quiz ids are absent from the result.
+    """
+    keys: Dict[str, tuple] = {}
+    missing = []
+    for quiz_id in {q for q in quiz_ids if q}:
+        key = _answer_keys.get(quiz_id)
+        if key is None:
+            missing.append(quiz_id)
+        else:
+            keys[quiz_id] = key
+
+    if missing:
+        collection = get_collection("MONGODB_QUIZ_COLLECTION")
+        if collection is None:
+            raise RuntimeError("MongoDB is not available")
+        for quiz in collection.find({"id": {"$in": missing}}, _ANSWER_KEY_PROJECTION):
+            key = _compact(quiz)
+            _answer_keys.set(quiz["id"], key)
+            keys[quiz["id"]] = key
+    return keys
+
+
+def get_answer_key(quiz_id: str) -> Optional[tuple]:
+    """Return the answer key for one quiz, or None if it does not exist."""
+    return get_answer_keys([quiz_id]).get(quiz_id)
+
+
+def invalidate_answer_key(quiz_id: str) -> None:
+    """Drop a quiz's cached answer key (call when the quiz is deleted)."""
+    _answer_keys.pop(quiz_id)
+
+
+def validate_answers(answers: Any) -> Optional[str]:
+    """Return why ``answers`` cannot be graded, or None if it is well formed.
+
+    ``answers`` must be a list of {"id": ..., "answer": ...} objects.
+    """
+    if not isinstance(answers, list):
+        return "answers must be a list"
+    for i, ans in enumerate(answers):
+        if not isinstance(ans, dict) or "id" not in ans or "answer" not in ans:
+            return f"answers[{i}] must be an object with id and answer"
+        try:
+            hash(ans["id"])
+        except TypeError:
+            return f"answers[{i}].id must be a string or number"
+    return None
+
+
+def grade(answer_key: tuple, answers: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Score one submission against an answer key (answers checked by validate_answers).
+
+    Returns:
+        dict: {score, total, percentage, feedback: [...]}, the response shape
+        of /api/quizzes/submit.
+    """
+    answer_lookup = {ans["id"]: ans["answer"] for ans in answers}
+    correct_count = 0
+    feedback = []
+
+    for question_id, question, correct_answer, options in answer_key:
+        user_answer = answer_lookup.get(question_id)
+        is_correct = user_answer == correct_answer
+
+        if is_correct:
+            correct_count += 1
+
+        feedback.append({
+            "question_id": question_id,
+            "question": question,
+            "user_answer": user_answer,
+            "correct_answer": correct_answer,
+            "is_correct": is_correct,
+            "options": list(options)
+        })
+
+    total_questions = len(answer_key)
+    return {
+        "score": correct_count,
+        "total": total_questions,
+        "percentage": round((correct_count / total_questions) * 100) if total_questions else 0,
+        "feedback": feedback
+    }
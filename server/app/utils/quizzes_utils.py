@@ -1,51 +1,29 @@
-# Quiz AI Help Utils 
+# Quiz AI Help Utils
 
 
 import json
 import os
-import base64
 import tempfile
-try:
-    from google.oauth2 import service_account
-except Exception:
-    service_account = None
+import threading
+import time
 from app import Config
-
-
-def create_quiz(topic: str, difficulty: str = "medium", num_questions: int = 10):
-    """
-    Simple function to create quizzes - tries AI first, falls back to hardcoded if it fails.
-    """
-    print(
-        f"Creating quiz for topic: '{topic}', difficulty: '{difficulty}', questions: {num_questions}")
-
-    # Try AI generation first
-    try:
-        print("🤖 Attempting AI generation...")
-
-        # Lazy import Vertex SDK
-        try:
-            import vertexai
-            from vertexai.generative_models import GenerativeModel
-        except Exception:
-            raise RuntimeError("Vertex SDK not available")
-
-        # Set up credentials
-        project_id = Config.GOOGLE_CLOUD_PROJECT
-        location = Config.GOOGLE_CLOUD_LOCATION
-        credentials_base64 = Config.VERTEX_DEFAULT_CREDENTIALS
-
-        # Convert base64 to credentials
-        credentials = service_account.Credentials.from_service_account_info(
-            json.loads(base64.b64decode(credentials_base64))
-        )
-
-        vertexai.init(project=project_id, location=location, credentials=credentials)
-
-        model_name = Config.VERTEX_MODEL_NAME
-        model = GenerativeModel(model_name=model_name)
-
-        prompt = f"""Generate a quiz about "{topic}" with {num_questions} multiple choice questions.
+from .llm_cache import get_or_generate
+from .llm_gateway import get_model
+from .question_bank import (
+    draw_questions,
+    mark_seen,
+    normalize_topic,
+    popular_buckets,
+    question_hash,
+    record_request,
+    store_questions,
+    validate_question,
+)
+
+
+def _build_quiz_prompt(topic: str, difficulty: str, num_questions: int) -> str:
+    """Build the quiz generation prompt (also the LLM cache key input)."""
+    return f"""Generate a quiz about "{topic}" with {num_questions} multiple choice questions.
 Difficulty: {difficulty}
 
 Return ONLY valid JSON in this exact format:
@@ -69,6 +47,17 @@ Requirements:
 - Each question has exactly 4 options
 - correctAnswer must match exactly one of the options"""
 
+
+def _generate_quiz_with_ai(prompt: str, num_questions: int):
+    """Call the model and return validated quiz data, or None on failure."""
+    try:
+        print("🤖 Attempting AI generation...")
+
+        # Cached model from the LLM gateway
+        model = get_model(Config.VERTEX_MODEL_NAME)
+        if model is None:
+            raise RuntimeError("Vertex SDK not available")
+
         print("🔄 Sending request to AI model...")
         response = model.generate_content(prompt)
 
@@ -79,7 +68,7 @@ Requirements:
             response_text = response_text[7:]
         elif response_text.startswith("```"):
             response_text = response_text[3:]
-        
+
         if response_text.endswith("```"):
             response_text = response_text[:-3]
 
@@ -97,9 +86,31 @@ Requirements:
             return quiz_data
     except Exception as e:
         print(f"❌ AI generation failed: {e}")
+    return None
 
-    # Fallback to hardcoded quiz
-    print("🔄 Using hardcoded quiz")
+
+def generate_quiz_questions(topic: str, difficulty: str, num_questions: int, use_cache: bool = True):
+    """Return AI-generated quiz data, or None if generation failed.
+
+    Fresh generations are also added to the question bank. With
+    use_cache=False the LLM response cache is bypassed, for callers that need
+    questions the bank does not already hold.
+    """
+    prompt = _build_quiz_prompt(topic, difficulty, num_questions)
+
+    def _produce():
+        quiz_data = _generate_quiz_with_ai(prompt, num_questions)
+        if quiz_data:
+            store_questions(topic, difficulty, quiz_data["questions"])
+        return quiz_data
+
+    if not use_cache:
+        return _produce()
+    return get_or_generate("quiz", prompt, _produce, model_name=Config.VERTEX_MODEL_NAME)
+
+
+def _fallback_quiz(topic: str, difficulty: str, num_questions: int):
+    """Hardcoded quiz used when the model is unavailable."""
     return {
         "topic": topic,
         "difficulty": difficulty,
@@ -113,3 +124,132 @@ Requirements:
             for i in range(num_questions)
         ]
     }
+
+
+def create_quiz(topic: str, difficulty: str = "medium", num_questions: int = 10):
+    """
+    Simple function to create quizzes - tries AI first, falls back to hardcoded if it fails.
+
+    Successful AI generations are served from the LLM response cache when the
+    same (topic, difficulty, num_questions) was requested recently.
+    """
+    print(
+        f"Creating quiz for topic: '{topic}', difficulty: '{difficulty}', questions: {num_questions}")
+
+    # Try AI generation first (through the response cache)
+    quiz_data = generate_quiz_questions(topic, difficulty, num_questions)
+    if quiz_data:
+        return quiz_data
+
+    # Fallback to hardcoded quiz
+    print("🔄 Using hardcoded quiz")
+    return _fallback_quiz(topic, difficulty, num_questions)
+
+
+def build_quiz(topic: str, difficulty: str = "medium", num_questions: int = 10, user_email: str = None):
+    """Assemble a quiz from the question bank, generating only the shortfall.
+
+    Questions the user has not been served yet are drawn from the bank first;
+    the model is only asked for the missing ones. If generation fails, banked
+    questions the user has already seen fill the gap before falling back to
+    the hardcoded quiz.
+    """
+    if not Config.QUESTION_BANK_ENABLED:
+        return create_quiz(topic, difficulty, num_questions)
+
+    record_request(topic, difficulty)
+    picked = draw_questions(topic, difficulty, num_questions, user_email)
+    chosen = {q["_id"]: q for q in picked}
+    print(f"🏦 {len(chosen)}/{num_questions} questions from the bank for '{topic}'")
+
+    shortfall = num_questions - len(chosen)
+    if shortfall > 0:
+        # The cached response for this prompt is already banked, so ask for fresh questions
+        generated = generate_quiz_questions(topic, difficulty, shortfall, use_cache=False)
+        topic_key = normalize_topic(topic)
+        for raw in (generated or {}).get("questions", []):
+            question = validate_question(raw)
+            if question is not None:
+                chosen.setdefault(question_hash(topic_key, difficulty, question), question)
+
+    if len(chosen) < num_questions:
+        # Generation failed or returned duplicates: reuse already-seen bank questions
+        for q in draw_questions(topic, difficulty, num_questions):
+            chosen.setdefault(q["_id"], q)
+
+    if len(chosen) < num_questions:
+        print("🔄 Using hardcoded quiz")
+        return _fallback_quiz(topic, difficulty, num_questions)
+
+    question_ids = list(chosen)[:num_questions]
+    mark_seen(user_email, topic, difficulty, question_ids)
+    return {
+        "topic": topic,
+        "difficulty": difficulty,
+        "questions": [
+            {
+                "id": i + 1,
+                "question": chosen[qid]["question"],
+                "options": chosen[qid]["options"],
+                "correctAnswer": chosen[qid]["correctAnswer"]
+            }
+            for i, qid in enumerate(question_ids)
+        ]
+    }
+
+
+def refill_question_bank(max_topics: int = None, target: int = None, batch_size: int = None):
+    """Top up the most requested (topic, difficulty) buckets of the question bank.
+
+    Returns:
+        list of {"topic", "difficulty", "banked", "added"} for each bucket checked.
+    """
+    max_topics = max_topics or Config.QUESTION_BANK_REFILL_TOPICS
+    target = target or Config.QUESTION_BANK_REFILL_TARGET
+    batch_size = batch_size or Config.QUESTION_BANK_REFILL_BATCH
+
+    report = []
+    for bucket in popular_buckets(max_topics):
+        added = 0
+        if bucket["banked"] < target:
+            prompt = _build_quiz_prompt(bucket["topic"], bucket["difficulty"], batch_size)
+            quiz_data = _generate_quiz_with_ai(prompt, batch_size)
+            if quiz_data:
+                added = store_questions(bucket["topic"], bucket["difficulty"], quiz_data["questions"])
+        report.append({
+            "topic": bucket["topic"],
+            "difficulty": bucket["difficulty"],
+            "banked": bucket["banked"] + added,
+            "added": added,
+        })
+    return report
+
+
+_refill_lock = threading.Lock()
+_refill_thread = None
+
+
+def start_refill_worker(interval_seconds: int = None):
+    """Run refill_question_bank periodically in a daemon thread (once per process).
+
+    Returns False when the interval is 0 (disabled) or a worker is already running.
+    """
+    global _refill_thread
+    interval_seconds = Config.QUESTION_BANK_REFILL_INTERVAL_SECONDS if interval_seconds is None else interval_seconds
+    if interval_seconds <= 0:
+        return False
+
+    def _loop():
+        while True:
+            time.sleep(interval_seconds)
+            try:
+                refill_question_bank()
+            except Exception as e:
+                print(f"❌ Question bank refill failed: {e}")
+
+    with _refill_lock:
+        if _refill_thread is not None and _refill_thread.is_alive():
+            return False
+        _refill_thread = threading.Thread(target=_loop, name="question-bank-refill", daemon=True)
+        _refill_thread.start()
+    return True
@@ -0,0 +1,307 @@
+"""Pluggable encoders that turn per-sentence assets into the final MP4.
+
+Every sentence of a text-to-video render is a ``Segment``: a voiceover, one
+or more still images shown for equal shares of it, and a caption track.
+Two backends produce the same 1280x720 / 24 fps H.264 + AAC output:
+
+- ``MoviePyBackend`` composes every frame in Python and pipes it to
+  libx264 (the original path).
+- ``FfmpegBackend`` hands the stills to ffmpeg directly: each sentence is
+  one filtergraph (looped image inputs, the caption track as a raw RGBA
+  input switched by overlay timing, ``-tune stillimage``), sentences are
+  encoded concurrently (``Config.VIDEO_ENCODE_MAX_WORKERS``) and joined
+  with the concat demuxer without re-encoding the video.
+
+``Config.VIDEO_RENDER_BACKEND`` picks one: ``ffmpeg``, ``moviepy`` or
+``auto`` (ffmpeg when a binary is available, with MoviePy as the fallback
+if it is missing or the ffmpeg render fails).
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, List, Optional
+
+from app.config import Config
+from .caption_engine import CaptionTrack
+from .render_workspace import RenderWorkspace
+
+try:
+    from moviepy import (
+        AudioFileClip,
+        CompositeVideoClip,
+        ImageClip,
+        concatenate_videoclips,
+    )
+except Exception:  # pragma: no cover - optional
+    AudioFileClip = CompositeVideoClip = ImageClip = concatenate_videoclips = None
+
+
+# Canvas size (16:9) and frame rate of every rendered video
+WIDTH, HEIGHT = 1280, 720
+FPS = 24
+AUDIO_RATE = 44100
+# A sentence is never shorter than this, even if its voiceover is
+MIN_SEGMENT_SECONDS = 1.0
+
+
+class RenderBackendError(RuntimeError):
+    """A backend could not produce the video."""
+
+
+class Segment:
+    """One sentence's finished assets."""
+
+    def __init__(self, audio_file: str, image_paths: List[str], captions: CaptionTrack):
+        self.audio_file = audio_file
+        self.image_paths = image_paths
+        self.captions = captions
+
+
+def assemble_clip(segment: Segment) -> Any:
+    """Compose one sentence's MoviePy clip from its voiceover, images and captions."""
+    audio = AudioFileClip(segment.audio_file)
+    total_dur = max(audio.duration, MIN_SEGMENT_SECONDS)
+
+    if not segment.image_paths:
+        audio.close()
+        raise RuntimeError("No AI images could be generated")
+
+    per_image_duration = total_dur / len(segment.image_paths)
+    image_clips: List[Any] = []
+    for image_path in segment.image_paths:
+        try:
+            img_clip = (
+                ImageClip(image_path)
+                .with_duration(per_image_duration)
+                .resized((WIDTH, HEIGHT))
+            )
+            image_clips.append(img_clip)
+        except Exception as e:  # pragma: no cover
+            print(f"[warn] Error processing image {image_path}: {e}")
+            continue
+
+    if not image_clips:
+        audio.close()
+        raise RuntimeError("No valid image clips could be created")
+
+    base_video = concatenate_videoclips(image_clips).with_duration(total_dur)
+    captions = segment.captions.clip(total_dur, (WIDTH, HEIGHT))
+
+    # Do not write file or close audio here; caller will concatenate and write.
+    return (
+        CompositeVideoClip([base_video, captions])
+        .with_audio(audio)
+        .with_duration(total_dur)
+    )
+
+
+class MoviePyBackend:
+    """Compose every frame with MoviePy and encode the result."""
+
+    name = "moviepy"
+
+    def available(self) -> bool:
+        return ImageClip is not None
+
+    def render(self, segments: List[Segment], outfile: str, workspace: RenderWorkspace) -> str:
+        clips: List[Any] = []
+        try:
+            for segment in segments:
+                clips.append(assemble_clip(segment))
+            final_video = concatenate_videoclips(clips, method="compose")
+            final_video.write_videofile(
+                outfile, fps=FPS, codec="libx264", audio_codec="aac",
+                temp_audiofile_path=workspace.path,
+            )
+            final_video.close()
+        finally:
+            for c in clips:
+                try:
+                    c.close()
+                except Exception:
+                    pass
+        return outfile
+
+
+def ffmpeg_binary() -> Optional[str]:
+    """Path of the ffmpeg executable: Config.VIDEO_FFMPEG_BINARY, PATH, or MoviePy's bundled copy."""
+    if Config.VIDEO_FFMPEG_BINARY:
+        return Config.VIDEO_FFMPEG_BINARY
+    found = shutil.which("ffmpeg")
+    if found:
+        return found
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return None
+
+
+_encode_executor: Optional[ThreadPoolExecutor] = None
+_encode_executor_lock = threading.Lock()
+
+
+def _get_encode_executor() -> ThreadPoolExecutor:
+    global _encode_executor
+    if _encode_executor is None:
+        with _encode_executor_lock:
+            if _encode_executor is None:
+                _encode_executor = ThreadPoolExecutor(
+                    max_workers=max(1, Config.VIDEO_ENCODE_MAX_WORKERS),
+                    thread_name_prefix="video-encode",
+                )
+    return _encode_executor
+
+
+_DURATION_RE = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+
+
+class FfmpegBackend:
+    """Encode still-image segments with ffmpeg filtergraphs and join them with the concat demuxer."""
+
+    name = "ffmpeg"
+
+    def __init__(self, binary: Optional[str] = None):
+        self.binary = binary or ffmpeg_binary()
+
+    def available(self) -> bool:
+        return bool(self.binary)
+
+    def _run(self, args: List[str]) -> subprocess.CompletedProcess:
+        try:
+            return subprocess.run(
+                [self.binary, "-hide_banner", "-nostdin", *args],
+                capture_output=True, text=True,
+            )
+        except OSError as e:
+            raise RenderBackendError(f"Could not run ffmpeg: {e}") from e
+
+    def _check(self, args: List[str]) -> None:
+        result = self._run(["-loglevel", "error", "-y", *args])
+        if result.returncode != 0:
+            raise RenderBackendError(f"ffmpeg failed: {result.stderr.strip()[-500:]}")
+
+    def duration(self, path: str) -> float:
+        """Media duration in seconds, read from ffmpeg's input probe."""
+        match = _DURATION_RE.search(self._run(["-i", path]).stderr)
+        if not match:
+            raise RenderBackendError(f"Could not read the duration of {os.path.basename(path)}")
+        hours, minutes, seconds = match.groups()
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    def _encode_segment(self, segment: Segment, index: int, workspace: RenderWorkspace) -> str:
+        if not segment.image_paths:
+            raise RuntimeError("No AI images could be generated")
+        total_dur = max(self.duration(segment.audio_file), MIN_SEGMENT_SECONDS)
+        per_image = total_dur / len(segment.image_paths)
+
+        args: List[str] = []
+        for image_path in segment.image_paths:
+            args += ["-i", image_path]
+        audio_input = len(segment.image_paths)
+        args += ["-i", segment.audio_file]
+
+        # The whole caption track as one raw input, one frame per chunk
+        track = segment.captions
+        track_file = workspace.file(f"captions_{index}.rgba")
+        with open(track_file, "wb") as f:
+            f.write(track.frames().tobytes())
+        workspace.account(track_file)
+        caption_input = audio_input + 1
+        args += [
+            "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{track.width}x{track.height}",
+            "-framerate", f"{1.0 / track.chunk_duration(total_dur):.6f}", "-i", track_file,
+        ]
+
+        # Decode and scale each still once, then repeat that frame for its share
+        frames = max(1, round(per_image * FPS))
+        filters = [
+            f"[{i}:v]scale={WIDTH}:{HEIGHT},setsar=1,format=yuv420p,"
+            f"loop=loop={frames - 1}:size=1:start=0,setpts=N/{FPS}/TB[img{i}]"
+            for i in range(len(segment.image_paths))
+        ]
+        filters.append(
+            "".join(f"[img{i}]" for i in range(len(segment.image_paths)))
+            + f"concat=n={len(segment.image_paths)}:v=1:a=0[base]"
+        )
+        x, y = track.position((WIDTH, HEIGHT))
+        # overlay repeats the last chunk once the track runs out, like the MoviePy path
+        filters.append(f"[base][{caption_input}:v]overlay=x={x}:y={y},format=yuv420p[v]")
+        filters.append(f"[{audio_input}:a]apad[a]")
+
+        segment_file = workspace.file(f"segment_{index}.mkv")
+        self._check(args + [
+            "-filter_complex", ";".join(filters),
+            "-map", "[v]", "-map", "[a]", "-t", f"{total_dur:.3f}",
+            "-r", str(FPS), "-c:v", "libx264", "-tune", "stillimage", "-pix_fmt", "yuv420p",
+            # Lossless audio per segment; it is encoded to AAC once, after concatenation
+            "-c:a", "pcm_s16le", "-ar", str(AUDIO_RATE), "-ac", "2",
+            segment_file,
+        ])
+        workspace.account(segment_file)
+        return segment_file
+
+    def render(self, segments: List[Segment], outfile: str, workspace: RenderWorkspace) -> str:
+        if not self.binary:
+            raise RenderBackendError("ffmpeg is not available")
+        executor = _get_encode_executor()
+        futures = [executor.submit(self._encode_segment, segment, i, workspace)
+                   for i, segment in enumerate(segments)]
+        # Let every encode finish before raising, so none writes into a removed workspace
+        wait(futures)
+        segment_files = [future.result() for future in futures]
+
+        list_file = workspace.file("segments.txt")
+        with open(list_file, "w") as f:
+            for path in segment_files:
+                escaped = path.replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        self._check([
+            "-f", "concat", "-safe", "0", "-i", list_file,
+            "-c:v", "copy", "-c:a", "aac", "-movflags", "+faststart",
+            outfile,
+        ])
+        return outfile
+
+
+BACKENDS = {
+    FfmpegBackend.name: FfmpegBackend,
+    MoviePyBackend.name: MoviePyBackend,
+}
+
+
+def get_render_backend(name: Optional[str] = None) -> Any:
+    """Instantiate the backend named by ``name`` or Config.VIDEO_RENDER_BACKEND.
+
+    ``auto`` picks ffmpeg when a binary is available and MoviePy otherwise.
+
+    Raises:
+        ValueError: for an unknown backend name.
+    """
+    name = (name or Config.VIDEO_RENDER_BACKEND or "auto").strip().lower()
+    if name == "auto":
+        backend = FfmpegBackend()
+        return backend if backend.available() else MoviePyBackend()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown video render backend: {name}")
+    return BACKENDS[name]()
+
+
+def render_segments(segments: List[Segment], outfile: str, workspace: RenderWorkspace) -> str:
+    """Encode ``segments`` into ``outfile`` with the configured backend.
+
+    In ``auto`` mode an ffmpeg failure is retried once with MoviePy.
+    """
+    backend = get_render_backend()
+    auto = (Config.VIDEO_RENDER_BACKEND or "auto").strip().lower() == "auto"
+    try:
+        return backend.render(segments, outfile, workspace)
+    except RenderBackendError as e:
+        if not auto or isinstance(backend, MoviePyBackend):
+            raise
+        print(f"[warn] ffmpeg render failed, falling back to MoviePy: {e}")
+        return MoviePyBackend().render(segments, outfile, workspace)
@@ -0,0 +1,195 @@
+"""Per-render scratch directories for the video pipeline.
+
+Every render gets its own uniquely named directory under
+``Config.VIDEO_WORKSPACE_ROOT``; all intermediate assets (images, speech,
+captions, the encoded MP4) are written there, so any number of renders can
+run side by side without clobbering each other's files.
+
+- Creation is refused when the volume has less than
+  ``Config.VIDEO_WORKSPACE_MIN_FREE_MB`` free.
+- Each workspace may hold at most ``Config.VIDEO_WORKSPACE_QUOTA_MB``; writers
+  call ``account(path)`` after producing a file and get
+  ``WorkspaceQuotaError`` once the render exceeds it. The limit is
+  best-effort: a file is only charged once it is fully written, so a render
+  can overshoot by one file. Before the final encode, ``ensure_room()``
+  re-checks the remaining quota and the volume's free space.
+- ``cleanup()`` (run on context exit, success or failure) removes the whole
+  directory.
+- ``sweep_orphaned_workspaces`` removes directories left behind by crashed
+  processes; it runs from ``flask sweep-render-workspaces`` and, when
+  ``Config.VIDEO_WORKSPACE_SWEEP_INTERVAL_SECONDS`` > 0, periodically in a
+  daemon thread. The owner file records the host as well as the pid, so
+  with a root shared between hosts or containers only workspaces created
+  on this host are checked for a dead owner; others are swept by age only.
+"""
+
+import json
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from typing import Optional
+
+from app.config import Config
+
+
+WORKSPACE_PREFIX = "render-"
+OWNER_FILE = ".owner.json"
+
+# A workspace whose owner died is only swept after this grace period
+_ORPHAN_GRACE_SECONDS = 60
+
+_sweeper_thread: Optional[threading.Thread] = None
+_sweeper_lock = threading.Lock()
+
+
+class WorkspaceQuotaError(RuntimeError):
+    """A render needs more scratch disk than it is allowed."""
+
+
+def _root() -> str:
+    root = Config.VIDEO_WORKSPACE_ROOT
+    os.makedirs(root, exist_ok=True)
+    return root
+
+
+class RenderWorkspace:
+    """A private scratch directory for one render; use as a context manager."""
+
+    def __init__(self, label: str = "video"):
+        root = _root()
+        free_mb = shutil.disk_usage(root).free / (1024 * 1024)
+        if free_mb < Config.VIDEO_WORKSPACE_MIN_FREE_MB:
+            raise WorkspaceQuotaError(
+                f"Not enough scratch disk to start a render ({free_mb:.0f} MB free)")
+
+        self.path = os.path.join(root, f"{WORKSPACE_PREFIX}{label}-{uuid.uuid4().hex}")
+        os.makedirs(self.path)
+        with open(os.path.join(self.path, OWNER_FILE), "w") as f:
+            json.dump({"pid": os.getpid(), "host": socket.gethostname(), "created_at": time.time()}, f)
+
+        self.quota_bytes = Config.VIDEO_WORKSPACE_QUOTA_MB * 1024 * 1024
+        self.used_bytes = 0
+        self._lock = threading.Lock()
+
+    def file(self, name: str) -> str:
+        """Path for a new file inside the workspace (names are the caller's to keep unique)."""
+        return os.path.join(self.path, name)
+
+    def account(self, path: str) -> None:
+        """Charge a finished file against the quota.
+
+        Raises:
+            WorkspaceQuotaError: if the workspace now exceeds its quota.
+        """
+        size = os.path.getsize(path)
+        with self._lock:
+            self.used_bytes += size
+            used = self.used_bytes
+        if self.quota_bytes and used > self.quota_bytes:
+            raise WorkspaceQuotaError(
+                f"Render exceeded its scratch quota of {Config.VIDEO_WORKSPACE_QUOTA_MB} MB")
+
+    def ensure_room(self) -> None:
+        """Check there is still quota and free disk before a large write (the final encode).
+
+        Raises:
+            WorkspaceQuotaError: if the quota is used up or the volume is low on space.
+        """
+        with self._lock:
+            used = self.used_bytes
+        if self.quota_bytes and used >= self.quota_bytes:
+            raise WorkspaceQuotaError(
+                f"Render exceeded its scratch quota of {Config.VIDEO_WORKSPACE_QUOTA_MB} MB")
+        free_mb = shutil.disk_usage(self.path).free / (1024 * 1024)
+        if free_mb < Config.VIDEO_WORKSPACE_MIN_FREE_MB:
+            raise WorkspaceQuotaError(
+                f"Not enough scratch disk to encode the video ({free_mb:.0f} MB free)")
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self) -> "RenderWorkspace":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.cleanup()
+
+
+def _owner_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by another user
+    except OSError:
+        return False
+    return True
+
+
+def sweep_orphaned_workspaces(max_age_seconds: Optional[int] = None) -> int:
+    """Remove workspaces whose owning process is gone, or that are older than max age.
+
+    Returns:
+        int: Number of workspace directories removed.
+    """
+    if max_age_seconds is None:
+        max_age_seconds = Config.VIDEO_WORKSPACE_MAX_AGE_SECONDS
+    root = Config.VIDEO_WORKSPACE_ROOT
+    if not os.path.isdir(root):
+        return 0
+
+    now = time.time()
+    host = socket.gethostname()
+    removed = 0
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if not name.startswith(WORKSPACE_PREFIX) or not os.path.isdir(path):
+            continue
+        try:
+            with open(os.path.join(path, OWNER_FILE)) as f:
+                owner = json.load(f)
+            pid, created_at = int(owner["pid"]), float(owner["created_at"])
+            # A pid only means something on the host that wrote it
+            local = owner.get("host") == host
+        except Exception:
+            # Crashed between mkdir and writing the owner file
+            pid, created_at, local = None, os.path.getmtime(path), True
+        age = now - created_at
+        orphaned = local and (pid is None or not _owner_alive(pid)) and age > _ORPHAN_GRACE_SECONDS
+        if orphaned or age > max_age_seconds:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def start_workspace_sweeper(interval_seconds: int = None) -> bool:
+    """Run sweep_orphaned_workspaces periodically in a daemon thread (once per process).
+
+    Returns False when the interval is 0 (disabled) or a sweeper is already running.
+    """
+    global _sweeper_thread
+    interval_seconds = (Config.VIDEO_WORKSPACE_SWEEP_INTERVAL_SECONDS
+                        if interval_seconds is None else interval_seconds)
+    if interval_seconds <= 0:
+        return False
+
+    def _loop():
+        while True:
+            try:
+                sweep_orphaned_workspaces()
+            except Exception as e:
+                print(f"[warn] Render workspace sweep failed: {e}")
+            time.sleep(interval_seconds)
+
+    with _sweeper_lock:
+        if _sweeper_thread is not None and _sweeper_thread.is_alive():
+            return False
+        _sweeper_thread = threading.Thread(target=_loop, name="render-workspace-sweeper", daemon=True)
+        _sweeper_thread.start()
+    return True
@@ -0,0 +1,127 @@
+"""Per-user resource version counters and conditional GET support.
+
+Every write path that changes what a user's read endpoint would return calls
+``bump_version(resource, user)``. Read endpoints decorated with
+``conditional_get`` derive a strong ETag from that counter and answer a
+matching ``If-None-Match`` with 304 before the view (and its Mongo query and
+serialisation) runs at all. Looking the counter up is a single ``_id`` read.
+
+Counters live in ``Config.MONGODB_RESOURCE_VERSIONS_COLLECTION`` so every
+worker sees the same value; when MongoDB is unavailable they fall back to a
+per-process dict, matching the in-memory fallbacks of the data they describe.
+"""
+
+import hashlib
+import threading
+from functools import wraps
+from typing import Optional
+
+from flask import make_response, request
+from .mongo_utils import get_collection
+
+
+# Resource names shared by the write paths and the read endpoints
+CHAT_SESSIONS = "chat_sessions"
+QUIZZES = "quizzes"
+QUIZ_HISTORY = "quiz_history"
+ROADMAPS = "roadmaps"
+TUTOR_HISTORY = "tutor_history"
+
+_memory_lock = threading.Lock()
+_memory_versions = {}
+
+
+def _versions_collection():
+    return get_collection("MONGODB_RESOURCE_VERSIONS_COLLECTION")
+
+
+def _key(resource: str, user: str) -> str:
+    return f"{resource}:{user}"
+
+
+def get_version(resource: str, user: str) -> Optional[int]:
+    """Return the current version of a user's resource (0 if never written).
+
+    Returns None if the counter could not be read, in which case callers must
+    not emit or honour an ETag.
+    """
+    collection = _versions_collection()
+    if collection is None:
+        with _memory_lock:
+            return _memory_versions.get(_key(resource, user), 0)
+    try:
+        doc = collection.find_one({"_id": _key(resource, user)}, {"version": 1})
+        return doc.get("version", 0) if doc else 0
+    except Exception:
+        return None
+
+
+def bump_version(resource: str, *users: Optional[str]) -> None:
+    """Invalidate cached representations of ``resource`` for each given user.
+
+    Several identifiers may be passed for the same user (e.g. email and the
+    legacy userId); empty ones are ignored. Never raises: a failed bump must
+    not fail the write that triggered it.
+    """
+    collection = _versions_collection()
+    for user in {u for u in users if u}:
+        key = _key(resource, user)
+        if collection is None:
+            with _memory_lock:
+                _memory_versions[key] = _memory_versions.get(key, 0) + 1
+            continue
+        try:
+            collection.update_one({"_id": key}, {"$inc": {"version": 1}}, upsert=True)
+        except Exception:
+            pass
+
+
+def _make_etag(resource: str, version: int) -> str:
+    """Strong ETag for one version of a resource, distinct per query string."""
+    variant = hashlib.sha1(
+        "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True))).encode("utf-8")
+    ).hexdigest()[:16]
+    return f"{resource}-{version}-{variant}"
+
+
+def conditional_get(resource: str, *user_params: str):
+    """Decorate a read endpoint with ETag / If-None-Match handling.
+
+    Args:
+        resource: Resource name whose version counter backs the ETag.
+        user_params: Query parameters identifying the user, in order of
+            preference. Requests without any of them are passed through.
+
+    Only GET requests are affected, so the decorator can sit on routes that
+    also accept writes. Non-200 responses are returned without an ETag.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != "GET":
+                return view(*args, **kwargs)
+
+            user = next((request.args.get(p) for p in user_params if request.args.get(p)), None)
+            if not user:
+                return view(*args, **kwargs)
+
+            # Read the version before the data: a write racing this request
+            # then only makes the ETag older than the body, never newer
+            version = get_version(resource, user)
+            if version is None:
+                return view(*args, **kwargs)
+
+            etag = _make_etag(resource, version)
+            if request.if_none_match.contains(etag):
+                response = make_response("", 304)
+                response.set_etag(etag)
+                response.headers["Cache-Control"] = "private, no-cache"
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+                response.headers["Cache-Control"] = "private, no-cache"
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,231 @@
+"""Roadmap graph engine: validation, topological schedule and critical path.
+
+The model returns a roadmap as ``{"nodes": [...], "edges": [{"from", "to"}]}``
+with a ``recommended_weeks`` estimate per node. ``build_schedule`` turns
+that into a clean DAG and a schedule once, at generation time, so clients
+only render what is stored:
+
+- nodes are de-duplicated by id and ``recommended_weeks`` coerced to a
+  positive number;
+- dangling edges (unknown endpoints), self loops and duplicate edges are
+  dropped, and edges closing a cycle are removed, each reported in
+  ``issues``;
+- nodes are ordered topologically (ties keep the model's order), each gets
+  its earliest start week, and the longest chain of dependent work is
+  reported as the critical path;
+- the schedule is scaled to the requested ``duration_weeks``.
+"""
+
+import heapq
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DEFAULT_NODE_WEEKS = 1
+
+
+class RoadmapGraphError(ValueError):
+    """The roadmap cannot be scheduled at all (e.g. it has no nodes)."""
+
+
+def _weeks(value: Any) -> float:
+    try:
+        weeks = float(value)
+    except (TypeError, ValueError):
+        return DEFAULT_NODE_WEEKS
+    if weeks <= 0 or weeks != weeks:  # non-positive or NaN
+        return DEFAULT_NODE_WEEKS
+    return int(weeks) if weeks.is_integer() else weeks
+
+
+def validate_graph(data: Any) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]], List[Dict[str, Any]]]:
+    """Normalise the model's nodes/edges and report what had to be repaired.
+
+    Returns:
+        (nodes, edges, issues) where nodes/edges form a DAG over the node ids
+        and each issue is {"type": ..., ...}.
+
+    Raises:
+        RoadmapGraphError: if there are no usable nodes.
+    """
+    if not isinstance(data, dict):
+        raise RoadmapGraphError("Roadmap must be an object with nodes and edges")
+
+    issues: List[Dict[str, Any]] = []
+    nodes: List[Dict[str, Any]] = []
+    index: Dict[str, int] = {}
+    for raw in data.get("nodes") or []:
+        if not isinstance(raw, dict) or raw.get("id") in (None, ""):
+            issues.append({"type": "invalid_node"})
+            continue
+        node_id = str(raw["id"])
+        if node_id in index:
+            issues.append({"type": "duplicate_node", "node": node_id})
+            continue
+        index[node_id] = len(nodes)
+        nodes.append(dict(raw, id=node_id, recommended_weeks=_weeks(raw.get("recommended_weeks"))))
+    if not nodes:
+        raise RoadmapGraphError("Roadmap has no nodes")
+
+    edges: List[Dict[str, str]] = []
+    seen = set()
+    for raw in data.get("edges") or []:
+        if not isinstance(raw, dict):
+            issues.append({"type": "invalid_edge"})
+            continue
+        source, target = str(raw.get("from")), str(raw.get("to"))
+        if source not in index or target not in index:
+            issues.append({"type": "dangling_edge", "from": source, "to": target})
+        elif source == target:
+            issues.append({"type": "self_loop", "node": source})
+        elif (source, target) in seen:
+            issues.append({"type": "duplicate_edge", "from": source, "to": target})
+        else:
+            seen.add((source, target))
+            edges.append({"from": source, "to": target})
+
+    # Iterative DFS in node order; an edge into a node still on the stack closes a cycle
+    successors: Dict[str, List[str]] = {node["id"]: [] for node in nodes}
+    for edge in edges:
+        successors[edge["from"]].append(edge["to"])
+    state = dict.fromkeys(successors, 0)  # 0 unvisited, 1 on stack, 2 done
+    back_edges = set()
+    for root in successors:
+        if state[root]:
+            continue
+        state[root] = 1
+        stack = [(root, iter(successors[root]))]
+        while stack:
+            node_id, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                state[node_id] = 2
+                stack.pop()
+            elif state[child] == 1:
+                back_edges.add((node_id, child))
+            elif state[child] == 0:
+                state[child] = 1
+                stack.append((child, iter(successors[child])))
+    if back_edges:
+        for source, target in sorted(back_edges, key=lambda e: (index[e[0]], index[e[1]])):
+            issues.append({"type": "cycle_edge_removed", "from": source, "to": target})
+        edges = [e for e in edges if (e["from"], e["to"]) not in back_edges]
+
+    return nodes, edges, issues
+
+
+def topological_order(nodes: List[Dict[str, Any]], edges: List[Dict[str, str]]) -> List[str]:
+    """Kahn's algorithm; among ready nodes the model's original order wins.
+
+    Raises:
+        RoadmapGraphError: if the edges contain a cycle.
+    """
+    position = {node["id"]: i for i, node in enumerate(nodes)}
+    indegree = dict.fromkeys(position, 0)
+    successors: Dict[str, List[str]] = {node_id: [] for node_id in position}
+    for edge in edges:
+        successors[edge["from"]].append(edge["to"])
+        indegree[edge["to"]] += 1
+
+    ready = [position[node_id] for node_id, degree in indegree.items() if degree == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        node_id = nodes[heapq.heappop(ready)]["id"]
+        order.append(node_id)
+        for child in successors[node_id]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                heapq.heappush(ready, position[child])
+    if len(order) != len(nodes):
+        raise RoadmapGraphError("Roadmap graph contains a cycle")
+    return order
+
+
+def build_schedule(data: Any, duration_weeks: Any = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Validate a generated roadmap and compute its schedule.
+
+    Args:
+        data: The model's roadmap ({"nodes": [...], "edges": [...]}).
+        duration_weeks: Requested total duration; the schedule is scaled to
+            fit it. Ignored when missing or not a positive number.
+
+    Returns:
+        (graph, schedule): the cleaned graph with nodes in topological order
+        (what is stored as the roadmap's ``data``), and
+        {"order", "nodes": [{id, start_week, end_week, weeks, slack,
+        critical}], "critical_path", "total_weeks", "scheduled_weeks",
+        "scale", "issues"}. Weeks are offsets from the start of the roadmap.
+
+    Raises:
+        RoadmapGraphError: if the roadmap has no usable nodes.
+    """
+    nodes, edges, issues = validate_graph(data)
+    order = topological_order(nodes, edges)
+    by_id = {node["id"]: node for node in nodes}
+    predecessors: Dict[str, List[str]] = {node_id: [] for node_id in by_id}
+    successors: Dict[str, List[str]] = {node_id: [] for node_id in by_id}
+    for edge in edges:
+        predecessors[edge["to"]].append(edge["from"])
+        successors[edge["from"]].append(edge["to"])
+
+    # Forward pass: earliest start/finish
+    earliest_start: Dict[str, float] = {}
+    earliest_finish: Dict[str, float] = {}
+    for node_id in order:
+        start = max((earliest_finish[p] for p in predecessors[node_id]), default=0)
+        earliest_start[node_id] = start
+        earliest_finish[node_id] = start + by_id[node_id]["recommended_weeks"]
+    total_weeks = max(earliest_finish.values())
+
+    # Backward pass: latest finish without delaying the whole roadmap
+    latest_finish: Dict[str, float] = {}
+    for node_id in reversed(order):
+        latest_finish[node_id] = min(
+            (latest_finish[s] - by_id[s]["recommended_weeks"] for s in successors[node_id]),
+            default=total_weeks,
+        )
+    slack = {node_id: latest_finish[node_id] - earliest_finish[node_id] for node_id in order}
+
+    # Walk back from the last-finishing node through zero-slack predecessors
+    critical_path = []
+    node_id: Optional[str] = max(reversed(order), key=lambda n: earliest_finish[n])
+    while node_id is not None:
+        critical_path.append(node_id)
+        node_id = next(
+            (p for p in predecessors[node_id]
+             if abs(slack[p]) < 1e-9 and abs(earliest_finish[p] - earliest_start[node_id]) < 1e-9),
+            None,
+        )
+    critical_path.reverse()
+
+    try:
+        target = float(duration_weeks)
+    except (TypeError, ValueError):
+        target = 0
+    scale = target / total_weeks if target > 0 else 1.0
+
+    # Scaling is monotonic, so rounded starts never precede a dependency's end
+    schedule_nodes = []
+    for node_id in order:
+        start = round(earliest_start[node_id] * scale, 1)
+        end = round(earliest_finish[node_id] * scale, 1)
+        schedule_nodes.append({
+            "id": node_id,
+            "start_week": start,
+            "end_week": end,
+            "weeks": round(end - start, 1),
+            "slack": round(slack[node_id] * scale, 1),
+            "critical": node_id in critical_path,
+        })
+
+    graph = dict(data, nodes=[by_id[node_id] for node_id in order], edges=edges)
+    schedule = {
+        "order": order,
+        "nodes": schedule_nodes,
+        "critical_path": critical_path,
+        "total_weeks": total_weeks,
+        "scheduled_weeks": round(total_weeks * scale, 1),
+        "scale": round(scale, 3),
+        "issues": issues,
+    }
+    return graph, schedule
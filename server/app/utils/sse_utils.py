@@ -0,0 +1,21 @@
+"""Server-Sent Events helpers shared by streaming endpoints."""
+
+import json
+from typing import Any, Iterable
+
+from flask import Response, stream_with_context
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format a single SSE frame with a JSON-encoded payload."""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def sse_response(frames: Iterable[str]) -> Response:
+    """Wrap an iterator of SSE frames in a non-buffered streaming response."""
+    response = Response(stream_with_context(frames), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    # Disable proxy buffering (nginx) so tokens reach the client immediately
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
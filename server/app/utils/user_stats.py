@@ -0,0 +1,182 @@
+"""Incrementally maintained per-user dashboard statistics.
+
+Each user has one document in ``Config.MONGODB_USER_STATS_COLLECTION``
+(unique on ``user_email``). Write paths update it atomically with
+``$inc``/``$max`` as events happen (a quiz attempt is logged, a dashboard
+session ends), so reading a user's stats is a single indexed ``find_one``
+regardless of how much history they have.
+
+``backfill_user_stats`` rebuilds the quiz counters from ``quiz_history`` for
+users whose attempts predate this document.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pymongo import UpdateOne
+
+from .mongo_utils import get_collection
+
+
+# Counters reset when a user clears their quiz history
+_QUIZ_FIELDS = (
+    "quizzes_taken",
+    "total_correct_answers",
+    "total_questions_answered",
+    "total_percentage",
+    "best_percentage",
+)
+
+
+def _stats_collection():
+    return get_collection("MONGODB_USER_STATS_COLLECTION")
+
+
+def _number(value: Any, default: float = 0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def record_quiz_attempt(user_email: str, correct_answers: Any, total_questions: Any,
+                        percentage: Any, completed_at: Optional[str] = None) -> bool:
+    """Fold one logged quiz attempt into the user's stats. Returns False on failure."""
+    collection = _stats_collection()
+    if collection is None or not user_email:
+        return False
+    now = datetime.utcnow().isoformat()
+    percentage = _number(percentage)
+    try:
+        collection.update_one(
+            {"user_email": user_email},
+            {
+                "$inc": {
+                    "quizzes_taken": 1,
+                    "total_correct_answers": int(_number(correct_answers)),
+                    "total_questions_answered": int(_number(total_questions)),
+                    "total_percentage": percentage,
+                },
+                "$max": {
+                    "best_percentage": percentage,
+                    "last_quiz_at": completed_at or now,
+                },
+                "$set": {"updated_at": now},
+                "$setOnInsert": {"created_at": now},
+            },
+            upsert=True,
+        )
+        return True
+    except Exception:
+        return False
+
+
+def reset_quiz_stats(user_email: str) -> bool:
+    """Zero the quiz counters (the user cleared their quiz history)."""
+    collection = _stats_collection()
+    if collection is None or not user_email:
+        return False
+    try:
+        collection.update_one(
+            {"user_email": user_email},
+            {
+                "$set": dict({field: 0 for field in _QUIZ_FIELDS},
+                             updated_at=datetime.utcnow().isoformat()),
+                "$unset": {"last_quiz_at": ""},
+            },
+        )
+        return True
+    except Exception:
+        return False
+
+
+def record_session_time(user_email: str, minutes: float, session_date: Optional[str] = None) -> bool:
+    """Add a finished learning session to the user's stats. Returns False on failure."""
+    collection = _stats_collection()
+    if collection is None or not user_email:
+        return False
+    now = datetime.utcnow().isoformat()
+    try:
+        collection.update_one(
+            {"user_email": user_email},
+            {
+                "$inc": {"total_learning_minutes": minutes, "sessions_count": 1},
+                "$max": {
+                    "longest_session_minutes": minutes,
+                    "last_session_at": session_date or now,
+                },
+                "$set": {"updated_at": now},
+                "$setOnInsert": {"created_at": now},
+            },
+            upsert=True,
+        )
+        return True
+    except Exception:
+        return False
+
+
+def get_user_stats(user_email: str) -> Optional[Dict[str, Any]]:
+    """Return the user's stats (zeros for a new user), or None if MongoDB is unavailable."""
+    collection = _stats_collection()
+    if collection is None:
+        return None
+    doc = collection.find_one({"user_email": user_email}, {"_id": 0}) or {}
+    quizzes_taken = doc.get("quizzes_taken", 0)
+    return {
+        "user_email": user_email,
+        "total_learning_minutes": doc.get("total_learning_minutes", 0),
+        "sessions_count": doc.get("sessions_count", 0),
+        "longest_session_minutes": doc.get("longest_session_minutes", 0),
+        "last_session_at": doc.get("last_session_at"),
+        "quizzes_taken": quizzes_taken,
+        "total_correct_answers": doc.get("total_correct_answers", 0),
+        "total_questions_answered": doc.get("total_questions_answered", 0),
+        "average_percentage": round(doc.get("total_percentage", 0) / quizzes_taken, 1) if quizzes_taken else 0,
+        "best_percentage": doc.get("best_percentage", 0),
+        "last_quiz_at": doc.get("last_quiz_at"),
+    }
+
+
+def backfill_user_stats(batch_size: int = 500) -> int:
+    """Recompute every user's quiz counters from quiz_history (idempotent).
+
+    Returns:
+        int: Number of users whose stats were written.
+
+    Raises:
+        RuntimeError: if MongoDB is not available.
+    """
+    collection = _stats_collection()
+    history = get_collection("MONGODB_QUIZ_HISTORY_COLLECTION")
+    if collection is None or history is None:
+        raise RuntimeError("MongoDB is not available")
+
+    now = datetime.utcnow().isoformat()
+    ops = []
+    users = 0
+    for row in history.aggregate([
+        {"$group": {
+            "_id": "$userId",
+            "quizzes_taken": {"$sum": 1},
+            "total_correct_answers": {"$sum": {"$toInt": {"$ifNull": ["$correctAnswers", 0]}}},
+            "total_questions_answered": {"$sum": {"$toInt": {"$ifNull": ["$totalQuestions", 0]}}},
+            "total_percentage": {"$sum": {"$toDouble": {"$ifNull": ["$percentage", 0]}}},
+            "best_percentage": {"$max": {"$toDouble": {"$ifNull": ["$percentage", 0]}}},
+            "last_quiz_at": {"$max": "$completedAt"},
+        }},
+    ], allowDiskUse=True):
+        if not row["_id"]:
+            continue
+        user_email = row.pop("_id")
+        ops.append(UpdateOne(
+            {"user_email": user_email},
+            {"$set": dict(row, updated_at=now), "$setOnInsert": {"created_at": now}},
+            upsert=True,
+        ))
+        users += 1
+        if len(ops) >= batch_size:
+            collection.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        collection.bulk_write(ops, ordered=False)
+    return users
@@ -0,0 +1,242 @@
+"""Background job queue for the /api/visual/* video pipeline.
+
+Rendering a video (summarise, prompts, images, TTS, encode, upload) takes
+minutes, so the HTTP endpoints only validate and enqueue. ``submit_job``
+stores a job document and hands it to a bounded in-process worker pool
+(``Config.VISUAL_JOB_WORKERS`` threads, at most
+``Config.VISUAL_JOB_MAX_PENDING`` queued or running jobs per process); the
+request returns the job id immediately.
+
+Job documents live in ``Config.MONGODB_VISUAL_JOBS_COLLECTION`` (or an
+in-memory dict when MongoDB is not configured)::
+
+    {_id, kind, user_email, status, stage, progress, result_url, error,
+     created_at, updated_at, started_at, finished_at, expires_at}
+
+``status`` is one of queued / running / succeeded / failed. Workers bump
+``updated_at`` on every stage change, so a running job whose process died
+is reported as failed once it has been silent for
+``Config.VISUAL_JOB_STALE_SECONDS``. A queued job only waits for a worker;
+it is never failed by the process that queued it, and one queued by another
+(possibly dead) process is failed after ``Config.VISUAL_JOB_QUEUED_STALE_SECONDS``.
+A worker only starts a job that is still queued. Job documents are removed
+by a TTL index ``Config.VISUAL_JOB_RETENTION_SECONDS`` after they were created.
+"""
+
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from app.config import Config
+from .mongo_utils import get_collection
+
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED_STATES = (SUCCEEDED, FAILED)
+
+
+class QueueFullError(RuntimeError):
+    """Too many visual jobs are already queued or running in this process."""
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending = 0
+_pending_lock = threading.Lock()
+# Tags the jobs queued by this process, whose queue is known to be alive
+_instance_id = uuid.uuid4().hex
+
+# In-memory fallback store when MongoDB is not configured
+_in_memory_jobs: Dict[str, Dict[str, Any]] = {}
+_memory_lock = threading.Lock()
+
+
+def _jobs_collection():
+    return get_collection("MONGODB_VISUAL_JOBS_COLLECTION")
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, Config.VISUAL_JOB_WORKERS),
+                    thread_name_prefix="visual-job",
+                )
+    return _executor
+
+
+def _update_job(job_id: str, fields: Dict[str, Any]) -> None:
+    fields = dict(fields, updated_at=datetime.utcnow())
+    collection = _jobs_collection()
+    if collection is None:
+        with _memory_lock:
+            if job_id in _in_memory_jobs:
+                _in_memory_jobs[job_id].update(fields)
+        return
+    try:
+        collection.update_one({"_id": job_id}, {"$set": fields})
+    except Exception as e:  # pragma: no cover - progress is best effort
+        print(f"[warn] Could not update visual job {job_id}: {e}")
+
+
+def _start_job(job_id: str) -> bool:
+    """Move a queued job to running; False if it is no longer queued."""
+    fields = {"status": RUNNING, "stage": "starting",
+              "started_at": datetime.utcnow(), "updated_at": datetime.utcnow()}
+    collection = _jobs_collection()
+    if collection is None:
+        with _memory_lock:
+            job = _in_memory_jobs.get(job_id)
+            if job is None or job["status"] != QUEUED:
+                return False
+            job.update(fields)
+        return True
+    result = collection.update_one({"_id": job_id, "status": QUEUED}, {"$set": fields})
+    return result.matched_count > 0
+
+
+def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+    job = dict(job)
+    job.pop("instance_id", None)
+    job["job_id"] = job.pop("_id")
+    return job
+
+
+def _is_stale(job: Dict[str, Any]) -> bool:
+    if job["status"] == RUNNING:
+        seconds = Config.VISUAL_JOB_STALE_SECONDS
+    elif job["status"] == QUEUED and job.get("instance_id") != _instance_id:
+        seconds = Config.VISUAL_JOB_QUEUED_STALE_SECONDS
+    else:
+        return False
+    return job["updated_at"] < datetime.utcnow() - timedelta(seconds=seconds)
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Return the job's public state, or None if there is no such job.
+
+    A running job that has not reported progress for
+    Config.VISUAL_JOB_STALE_SECONDS is marked failed (its worker is gone), as
+    is a job queued by another process that has waited for
+    Config.VISUAL_JOB_QUEUED_STALE_SECONDS.
+    """
+    collection = _jobs_collection()
+    if collection is None:
+        with _memory_lock:
+            job = _in_memory_jobs.get(job_id)
+            job = dict(job) if job else None
+    else:
+        job = collection.find_one({"_id": job_id})
+    if job is None:
+        return None
+
+    if _is_stale(job):
+        interrupted = {
+            "status": FAILED,
+            "error": "Job was interrupted before it finished",
+            "finished_at": datetime.utcnow(),
+        }
+        if collection is None:
+            job.update(interrupted)
+        else:
+            # Conditional, so a worker that is in fact still alive wins the race
+            result = collection.update_one(
+                {"_id": job_id, "status": job["status"], "updated_at": job["updated_at"]},
+                {"$set": interrupted},
+            )
+            if result.matched_count:
+                job.update(interrupted)
+            else:
+                job = collection.find_one({"_id": job_id}) or job
+    return _public(job)
+
+
+def _prune_memory_jobs(now: datetime) -> None:
+    # The in-memory fallback has no TTL index; drop expired records on submit
+    with _memory_lock:
+        for job_id in [j for j, job in _in_memory_jobs.items() if job["expires_at"] < now]:
+            del _in_memory_jobs[job_id]
+
+
+def _run_job(job_id: str, task: Callable[..., str], args: tuple) -> None:
+    global _pending
+
+    def progress(stage: str, percent: float) -> None:
+        _update_job(job_id, {"stage": stage, "progress": round(max(0.0, min(percent, 100.0)), 1)})
+
+    try:
+        if not _start_job(job_id):
+            # Reported as failed while it waited; do not run it behind the client's back
+            return
+        url = task(*args, progress=progress)
+        _update_job(job_id, {
+            "status": SUCCEEDED,
+            "stage": "done",
+            "progress": 100,
+            "result_url": url,
+            "finished_at": datetime.utcnow(),
+        })
+    except Exception as e:
+        _update_job(job_id, {"status": FAILED, "error": str(e), "finished_at": datetime.utcnow()})
+    finally:
+        with _pending_lock:
+            _pending -= 1
+
+
+def submit_job(kind: str, task: Callable[..., str], *args: Any,
+               user_email: Optional[str] = None) -> Dict[str, Any]:
+    """Record a job and queue ``task(*args, progress=callback)`` on the worker pool.
+
+    ``task`` returns the result URL; ``progress(stage, percent)`` reports
+    stage changes.
+
+    Returns:
+        dict: The new job's public state.
+
+    Raises:
+        QueueFullError: if this process already holds VISUAL_JOB_MAX_PENDING jobs.
+    """
+    global _pending
+    with _pending_lock:
+        if _pending >= Config.VISUAL_JOB_MAX_PENDING:
+            raise QueueFullError("Too many videos are being generated right now; try again shortly")
+        _pending += 1
+
+    now = datetime.utcnow()
+    _prune_memory_jobs(now)
+    job = {
+        "_id": uuid.uuid4().hex,
+        "kind": kind,
+        "user_email": user_email,
+        "status": QUEUED,
+        "stage": "queued",
+        "instance_id": _instance_id,
+        "progress": 0,
+        "result_url": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+        "started_at": None,
+        "finished_at": None,
+        "expires_at": now + timedelta(seconds=Config.VISUAL_JOB_RETENTION_SECONDS),
+    }
+    try:
+        collection = _jobs_collection()
+        if collection is None:
+            with _memory_lock:
+                _in_memory_jobs[job["_id"]] = dict(job)
+        else:
+            collection.insert_one(dict(job))
+        _get_executor().submit(_run_job, job["_id"], task, args)
+    except Exception:
+        with _pending_lock:
+            _pending -= 1
+        raise
+    return _public(job)
@@ -4,8 +4,8 @@ This follows the pipeline demonstrated in demo.py:
 - Generate key moments with scripts and image prompts via Vertex AI (Gemini)
 - Generate images for each moment via Imagen
 - Synthesize voiceover via gTTS
-- Render caption overlays with PIL
-- Compose video with MoviePy
+- Render caption overlays in memory (see caption_engine)
+- Encode the video with ffmpeg or MoviePy (see render_backends)
 
 Environment requirements (see .env.example):
 - GOOGLE_CREDENTIALS_JSON_BASE64: base64-encoded GCP service account JSON
@@ -28,8 +28,12 @@ import base64
 import json
 import os
 import re
+import shutil
 import tempfile
-from typing import Any, List, Tuple
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Callable, List, Optional, Tuple
 
 import requests
 try:
@@ -37,21 +41,6 @@ try:
 except Exception:  # pragma: no cover - optional
     gTTS = None
 
-try:
-    from PIL import Image, ImageDraw, ImageFont
-except Exception:  # pragma: no cover - optional
-    Image = ImageDraw = ImageFont = None
-
-try:
-    from moviepy import (
-        AudioFileClip,
-        CompositeVideoClip,
-        ImageClip,
-        concatenate_videoclips,
-    )
-except Exception:  # pragma: no cover - optional
-    AudioFileClip = CompositeVideoClip = ImageClip = concatenate_videoclips = None
-
 try:
     from google import genai
     from google.genai import types as genai_types
@@ -59,20 +48,13 @@ except Exception:  # pragma: no cover - optional
     genai = None
     genai_types = None
 from app.config import Config
+from .caption_engine import render_caption_track
 from .cloudinary_utils import upload_video_to_cloudinary
+from .image_pool import submit_in_order
+from .render_backends import Segment, render_segments
+from .render_workspace import RenderWorkspace, WorkspaceQuotaError
 
 
-# Canvas size (16:9)
-WIDTH, HEIGHT = 1280, 720
-DEFAULT_FONT_PATHS = [
-    # macOS (Homebrew cask installs to user fonts)
-    os.path.expanduser("~/Library/Fonts/DejaVuSans-Bold.ttf"),
-    # macOS system-wide (if manually copied)
-    "/Library/Fonts/DejaVuSans-Bold.ttf",
-    # Fallbacks (system fonts)
-    "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
-]
-FONT_SIZE = 44
 
 
 AI_PROMPT = (
@@ -85,17 +67,6 @@ AI_PROMPT = (
 )
 
 
-def _load_font(size: int) -> Any:
-    for path in DEFAULT_FONT_PATHS:
-        if os.path.exists(path):
-            try:
-                return ImageFont.truetype(path, size)
-            except Exception:
-                pass
-    # Fallback to PIL default
-    return ImageFont.load_default()
-
-
 _GENAI_TEXT_CLIENT = None
 _GENAI_IMAGE_CLIENT = None
 
@@ -249,161 +220,115 @@ def _extract_prompts_for_sentences(sentences: List[str]) -> List[str]:
     raise ValueError("LLM did not return image_prompts_per_sentence in expected format")
 
 
-def generate_images_with_vertex_ai(prompts: List[str]) -> List[str]:
-    """Generate images for each prompt using Imagen via google-genai; return file paths.
+def _scratch_file(workspace: Optional[RenderWorkspace], name: str) -> str:
+    """Path for an intermediate asset: inside the render's workspace, else a unique temp file."""
+    if workspace is not None:
+        return workspace.file(name)
+    stem, suffix = os.path.splitext(name)
+    fd, path = tempfile.mkstemp(prefix=f"{stem}_", suffix=suffix)
+    os.close(fd)
+    return path
 
-    Note: aspect_ratio set to 16:9 to match output video.
-    """
-    client = _get_genai_image_client()
-    model_id = Config.GENAI_IMAGE_MODEL
 
-    generated_images: List[str] = []
-    for i, prompt in enumerate(prompts):
-        try:
-            resp = client.models.generate_images(
-                model=model_id,
-                prompt=prompt,
-                config=genai_types.GenerateImagesConfig(
-                    aspect_ratio="16:9",
-                    number_of_images=1,
-                    image_size="2K",
-                    safety_filter_level="BLOCK_MEDIUM_AND_ABOVE",
-                    person_generation="ALLOW_ADULT",
-                ),
-            )
-
-            image_bytes = None
-            # Try expected shapes
-            if hasattr(resp, "images") and resp.images:
-                img0 = resp.images[0]
-                image_bytes = getattr(img0, "image_bytes", None) or getattr(img0, "bytes", None)
-            elif hasattr(resp, "generated_images") and resp.generated_images:
-                img0 = resp.generated_images[0]
-                image_bytes = getattr(img0, "image_bytes", None) or getattr(img0, "bytes", None)
-
-            if not image_bytes:
-                raise RuntimeError("No image bytes returned by Imagen")
-
-            image_path = os.path.join(tempfile.gettempdir(), f"ai_image_{i}.png")
-            print(image_path)
-            with open(image_path, "wb") as f:
-                f.write(image_bytes)
-            generated_images.append(image_path)
-        except Exception as e:  # pragma: no cover - best-effort generation
-            print(f"[warn] Failed to generate image for prompt: {prompt[:60]}... Error: {e}")
-            continue
-
-    return generated_images
-
-def _generate_caption_clips(script: str, idx: int, total_dur: float) -> Tuple[List[Any], List[str]]:
-    """Create caption overlays as short ImageClips and return (clips, temp_files)."""
-    words = script.split()
-    chunks = [" ".join(words[i : i + 4]) for i in range(0, len(words), 4)]  # 4-word chunks
-    if not chunks:
-        chunks = [script]
-    dur = max(total_dur / max(1, len(chunks)), 0.1)
-    font = _load_font(FONT_SIZE)
-
-    clips: List[Any] = []
-    img_files: List[str] = []
-
-    for j, chunk in enumerate(chunks):
-        img = Image.new("RGBA", (WIDTH, HEIGHT), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        bbox = draw.textbbox((0, 0), chunk, font=font)
-        x = (WIDTH - (bbox[2] - bbox[0])) // 2
-        y = HEIGHT - (bbox[3] - bbox[1]) - 60
-        # background rectangle for readability
-        draw.rectangle(
-            [(x - 10, y - 10), (x + (bbox[2] - bbox[0]) + 10, y + (bbox[3] - bbox[1]) + 10)],
-            fill=(0, 0, 0, 180),
-        )
-        draw.text((x, y), chunk, font=font, fill="white")
-        fname = os.path.join(tempfile.gettempdir(), f"ai_caption_{idx}_{j}.png")
-        img.save(fname)
-        img_files.append(fname)
-        clip = (
-            ImageClip(fname)
-            .with_start(j * dur)
-            .with_duration(dur)
-            .with_position(("center", "bottom"))
-        )
-        clips.append(clip)
+def _generate_image_file(prompt: str, index: int, workspace: Optional[RenderWorkspace] = None) -> str:
+    """Generate one 16:9 image with Imagen and write it to a scratch file; return its path."""
+    client = _get_genai_image_client()
+    resp = client.models.generate_images(
+        model=Config.GENAI_IMAGE_MODEL,
+        prompt=prompt,
+        config=genai_types.GenerateImagesConfig(
+            aspect_ratio="16:9",
+            number_of_images=1,
+            image_size="2K",
+            safety_filter_level="BLOCK_MEDIUM_AND_ABOVE",
+            person_generation="ALLOW_ADULT",
+        ),
+    )
 
-    return clips, img_files
+    image_bytes = None
+    # Try expected shapes
+    if hasattr(resp, "images") and resp.images:
+        img0 = resp.images[0]
+        image_bytes = getattr(img0, "image_bytes", None) or getattr(img0, "bytes", None)
+    elif hasattr(resp, "generated_images") and resp.generated_images:
+        img0 = resp.generated_images[0]
+        image_bytes = getattr(img0, "image_bytes", None) or getattr(img0, "bytes", None)
+
+    if not image_bytes:
+        raise RuntimeError("No image bytes returned by Imagen")
+
+    image_path = _scratch_file(workspace, f"ai_image_{index}.png")
+    with open(image_path, "wb") as f:
+        f.write(image_bytes)
+    if workspace is not None:
+        workspace.account(image_path)
+    return image_path
+
+
+def _synthesize_speech(script: str, idx: int, workspace: Optional[RenderWorkspace] = None) -> str:
+    """Voice one sentence with gTTS into a scratch MP3; return its path."""
+    audio_file = _scratch_file(workspace, f"ai_speech_{idx}.mp3")
+    tts = gTTS(text=script, lang="en")
+    tts.save(audio_file)
+    if workspace is not None:
+        workspace.account(audio_file)
+    return audio_file
 
 
-def _create_key_moment_clip(moment: dict, idx: int) -> Tuple[Any, List[str]]:
-    """Create a CompositeVideoClip for a single key moment and return (clip, temp_files)."""
-    temp_files: List[str] = []
+_stage_pools: dict = {}
+_stage_pools_lock = threading.Lock()
 
-    # Voiceover
-    audio_file = os.path.join(tempfile.gettempdir(), f"ai_speech_{idx}.mp3")
-    tts = gTTS(text=moment["script"], lang="en")
-    tts.save(audio_file)
-    audio = AudioFileClip(audio_file)
-    total_dur = max(audio.duration, 1.0)
-    temp_files.append(audio_file)
-
-    # Images
-    image_paths = generate_images_with_vertex_ai(moment["image_prompts"])
-    if not image_paths:
-        audio.close()
-        raise RuntimeError("No AI images could be generated")
-
-    per_image_duration = total_dur / len(image_paths)
-    image_clips: List[Any] = []
-    for image_path in image_paths:
-        try:
-            img_clip = (
-                ImageClip(image_path)
-                .with_duration(per_image_duration)
-                .resized((WIDTH, HEIGHT))
-            )
-            image_clips.append(img_clip)
-            temp_files.append(image_path)
-        except Exception as e:  # pragma: no cover
-            print(f"[warn] Error processing image {image_path}: {e}")
-            continue
-
-    if not image_clips:
-        audio.close()
-        raise RuntimeError("No valid image clips could be created")
-
-    base_video = concatenate_videoclips(image_clips).with_duration(total_dur)
-
-    # Captions
-    captions, caption_files = _generate_caption_clips(moment["script"], idx, total_dur)
-    temp_files.extend(caption_files)
-
-    final = (
-        CompositeVideoClip([base_video, *captions])
-        .with_audio(audio)
-        .with_duration(total_dur)
-    )
-    # Do not write file or close audio here; caller will concatenate and write.
 
-    return final, temp_files
+def _stage_pool(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """Process-wide pool for one render stage, so concurrent requests share its limit."""
+    with _stage_pools_lock:
+        pool = _stage_pools.get(name)
+        if pool is None:
+            pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix=f"video-{name}")
+            _stage_pools[name] = pool
+        return pool
 
 
-def _cleanup_temp_files(files: List[str]) -> None:
-    for f in files:
-        try:
-            if os.path.exists(f):
-                os.remove(f)
-        except Exception:
-            pass
+def _render_sentence_assets(sentences: List[str], prompts: List[str],
+                            workspace: RenderWorkspace) -> Tuple[List[Future], List[Future], List[Future]]:
+    """Start TTS, image generation and caption rendering for every sentence at once.
 
+    Each stage runs on its own bounded pool (Config.VIDEO_TTS_MAX_WORKERS,
+    the image pool, Config.VIDEO_CAPTION_MAX_WORKERS), so the stages overlap
+    across sentences and the render takes about as long as the slowest
+    sentence instead of the sum over all of them.
 
-def generate_video_from_transcript_text(transcript_text: str, upload: bool = True) -> str:
+    Returns:
+        (speech, images, captions): one future per sentence in each list.
+    """
+    _get_genai_image_client()  # initialise once before fanning out
+    images = submit_in_order(partial(_generate_image_file, workspace=workspace), prompts)
+    tts_pool = _stage_pool("tts", Config.VIDEO_TTS_MAX_WORKERS)
+    speech = [tts_pool.submit(_synthesize_speech, sentence, idx, workspace)
+              for idx, sentence in enumerate(sentences)]
+    caption_pool = _stage_pool("captions", Config.VIDEO_CAPTION_MAX_WORKERS)
+    captions = [caption_pool.submit(render_caption_track, sentence) for sentence in sentences]
+    return speech, images, captions
+
+
+def generate_video_from_transcript_text(
+    transcript_text: str,
+    upload: bool = True,
+    progress: Optional[Callable[[str, float], None]] = None,
+) -> str:
     """Generate a single video by:
     - Summarizing the input into a concise script
     - Splitting the summarized script into sentences
     - Generating 1 image prompt per sentence via LLM
-    - Creating a clip per sentence (images + TTS + captions)
-    - Concatenating all clips in order
+    - Rendering every sentence's voiceover, image and captions concurrently
+    - Encoding the sentences in order with the configured render backend
     - Optionally uploading the final MP4 to Cloudinary and returning the secure URL
+
+    ``progress(stage, percent)``, if given, is called as the pipeline moves
+    through its stages (used by the background job queue).
     """
+    report = progress or (lambda stage, percent: None)
+    report("summarizing", 10)
     summarized = _summarize_text_for_video(transcript_text)
     sentences = _split_into_sentences(summarized)
     if not sentences:
@@ -411,6 +336,7 @@ def generate_video_from_transcript_text(transcript_text: str, upload: bool = Tru
     
     print(sentences)
 
+    report("storyboard", 30)
     prompts_per_sentence = _extract_prompts_for_sentences(sentences)
     # Ensure alignment; retry re-extraction if mismatch
     attempts = 1
@@ -427,41 +353,48 @@ def generate_video_from_transcript_text(transcript_text: str, upload: bool = Tru
     
     print(prompts_per_sentence)
 
-    clips: List[Any] = []
-    temp_files: List[str] = []
+    futures: List[Future] = []
+    # Private scratch directory: concurrent renders never share file names
+    workspace = RenderWorkspace()
     try:
-        for idx, sentence in enumerate(sentences):
-            moment = {"script": sentence, "image_prompts": [prompts_per_sentence[idx]]}
-            clip, files = _create_key_moment_clip(moment, idx)
-            clips.append(clip)
-            temp_files.extend(files)
-
-        # Concatenate per-sentence clips
-        final_video = concatenate_videoclips(clips, method="compose")
-        outdir = os.path.join(tempfile.gettempdir(), "ai_sentence_video")
-        os.makedirs(outdir, exist_ok=True)
-        outfile = os.path.join(outdir, "ai_sentences_compiled.mp4")
-        final_video.write_videofile(outfile, fps=24, codec="libx264", audio_codec="aac")
-        final_video.close()
-        if upload:
+        report("rendering", 40)
+        speech, images, captions = _render_sentence_assets(sentences, prompts_per_sentence, workspace)
+        futures = speech + images + captions
+
+        # Collect each sentence's assets in order as they complete
+        segments: List[Segment] = []
+        for idx in range(len(sentences)):
+            audio_file = speech[idx].result()
+            caption_track = captions[idx].result()
             try:
-                url = upload_video_to_cloudinary(outfile)
-                return url
-            finally:
-                # Remove local video after upload attempt
-                try:
-                    if os.path.exists(outfile):
-                        os.remove(outfile)
-                except Exception:
-                    pass
-        return outfile  # Return local path if upload disabled
+                image_paths = [images[idx].result()]
+            except WorkspaceQuotaError:
+                raise
+            except Exception as e:  # pragma: no cover - best-effort generation
+                print(f"[warn] Failed to generate image for prompt: {prompts_per_sentence[idx][:60]}... Error: {e}")
+                raise RuntimeError("No AI images could be generated") from e
+            segments.append(Segment(audio_file, image_paths, caption_track))
+            report("rendering", 40 + 30 * (idx + 1) / len(sentences))
+
+        # Encode all sentences in order (ffmpeg or MoviePy, see render_backends)
+        report("encoding", 75)
+        outfile = workspace.file("ai_sentences_compiled.mp4")
+        workspace.ensure_room()
+        render_segments(segments, outfile, workspace)
+        workspace.account(outfile)
+        if upload:
+            report("uploading", 90)
+            return upload_video_to_cloudinary(outfile)
+
+        # Upload disabled: hand the file to the caller outside the workspace
+        fd, local_copy = tempfile.mkstemp(prefix="ai_sentences_compiled_", suffix=".mp4")
+        os.close(fd)
+        shutil.move(outfile, local_copy)
+        return local_copy
     finally:
-        _cleanup_temp_files(temp_files)
-        for c in clips:
-            try:
-                c.close()
-            except Exception:
-                pass
+        # On failure, let in-flight stages finish before their files are removed
+        wait(futures)
+        workspace.cleanup()
 
 
 def extract_text_from_pdf_url(pdf_url: str) -> str:
@@ -0,0 +1,103 @@
+"""One-off migration of voice tutor history to the per-message layout.
+
+Legacy layout (``MONGODB_VOICE_CHAT_COLLECTION``): one document per user with
+every session and message embedded::
+
+    {user_email, sessions: [{session_id, created_at, messages: [...]}], ...}
+
+New layout:
+- ``MONGODB_VOICE_SESSIONS_COLLECTION``: one header per (user_email, session_id)
+  holding ``message_count`` (the sequence counter) and timestamps.
+- ``MONGODB_VOICE_MESSAGES_COLLECTION``: one document per message keyed by
+  (user_email, session_id, seq).
+
+The migration is idempotent: messages are upserted on their unique key, so it
+can be re-run safely (e.g. after an interrupted run). Run it before the new
+code starts writing tutor history for migrated users, otherwise new messages
+and legacy messages would compete for the same sequence numbers::
+
+    flask --app index migrate-voice-chats [--drop-legacy]
+"""
+
+from typing import Dict
+
+from pymongo import UpdateOne
+
+from app.config import Config
+from .mongo_utils import get_db
+
+
+def migrate_legacy_voice_chats(drop_legacy: bool = False, batch_size: int = 1000) -> Dict[str, int]:
+    """Copy embedded voice chat sessions into the per-message collections.
+
+    Args:
+        drop_legacy: Delete each legacy user document once it has been copied.
+        batch_size: Maximum number of message upserts per bulk_write.
+
+    Returns:
+        dict with counts of users, sessions and messages processed.
+
+    Raises:
+        RuntimeError: if MongoDB is not available.
+    """
+    db = get_db()
+    if db is None:
+        raise RuntimeError("MongoDB is not available")
+
+    legacy = db[Config.MONGODB_VOICE_CHAT_COLLECTION]
+    sessions_collection = db[Config.MONGODB_VOICE_SESSIONS_COLLECTION]
+    messages_collection = db[Config.MONGODB_VOICE_MESSAGES_COLLECTION]
+
+    counts = {"users": 0, "sessions": 0, "messages": 0}
+
+    for user_doc in legacy.find({}, no_cursor_timeout=True):
+        user_email = user_doc.get("user_email")
+        if not user_email:
+            continue
+
+        for session in user_doc.get("sessions", []):
+            session_id = session.get("session_id") or "default_session"
+            messages = session.get("messages", [])
+            created_at = session.get("created_at") or user_doc.get("created_at")
+            updated_at = (messages[-1].get("timestamp") if messages else None) or created_at
+
+            ops = []
+            for seq, message in enumerate(messages, start=1):
+                doc = {
+                    "user_email": user_email,
+                    "session_id": session_id,
+                    "seq": seq,
+                    "content": message.get("content", ""),
+                    "is_ai": message.get("is_ai", False),
+                    "timestamp": message.get("timestamp"),
+                }
+                if message.get("context"):
+                    doc["context"] = message["context"]
+                ops.append(UpdateOne(
+                    {"user_email": user_email, "session_id": session_id, "seq": seq},
+                    {"$setOnInsert": doc},
+                    upsert=True,
+                ))
+                if len(ops) >= batch_size:
+                    messages_collection.bulk_write(ops, ordered=False)
+                    ops = []
+            if ops:
+                messages_collection.bulk_write(ops, ordered=False)
+
+            # $max keeps the counter ahead of any messages written since
+            sessions_collection.update_one(
+                {"user_email": user_email, "session_id": session_id},
+                {
+                    "$max": {"message_count": len(messages)},
+                    "$setOnInsert": {"created_at": created_at, "updated_at": updated_at},
+                },
+                upsert=True,
+            )
+            counts["sessions"] += 1
+            counts["messages"] += len(messages)
+
+        if drop_legacy:
+            legacy.delete_one({"_id": user_doc["_id"]})
+        counts["users"] += 1
+
+    return counts
@@ -0,0 +1,125 @@
+"""Benchmark: text-to-video encoding, MoviePy vs ffmpeg render backend.
+
+Builds a synthetic slideshow script (one still image, one voiceover and one
+caption track per sentence, like the real pipeline produces) in a scratch
+render workspace, then encodes the same segments with each backend and
+reports wall time, CPU time (this process plus ffmpeg children) and output
+size. No network or model access is needed; images are generated with PIL
+and voiceovers with ffmpeg's sine source.
+
+Usage (from the server/ directory; needs moviepy, which provides ffmpeg):
+
+    python -m benchmarks.video_render --sentences 8 --seconds 4 --repeat 2
+
+Pass ``--backends ffmpeg`` to time one backend only.
+"""
+
+import argparse
+import os
+import resource
+import statistics
+import subprocess
+import time
+
+from PIL import Image, ImageDraw
+
+from app.utils.caption_engine import render_caption_track
+from app.utils.render_backends import FfmpegBackend, Segment, ffmpeg_binary, get_render_backend
+from app.utils.render_workspace import RenderWorkspace
+
+
+SCRIPT = (
+    "Photosynthesis converts light energy into chemical energy stored in glucose. "
+    "Chlorophyll in the chloroplasts absorbs mostly red and blue light. "
+    "Water molecules are split, releasing oxygen as a by-product. "
+    "The Calvin cycle then fixes carbon dioxide into three carbon sugars. "
+)
+
+
+def _sentences(count: int):
+    base = [s.strip() + "." for s in SCRIPT.split(".") if s.strip()]
+    return [base[i % len(base)] for i in range(count)]
+
+
+def _image(path: str, index: int) -> None:
+    # Imagen returns ~2K 16:9 stills; a gradient keeps the encoder honest
+    width, height = 2048, 1152
+    img = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    hue = (index * 47) % 255
+    draw.rectangle([(200, 200), (width - 200, height - 200)], fill=(hue, 255 - hue, 128))
+    img.save(path)
+
+
+def _voiceover(binary: str, path: str, seconds: float, index: int) -> None:
+    # gTTS writes 24 kHz mono MP3
+    subprocess.run(
+        [binary, "-hide_banner", "-loglevel", "error", "-y", "-f", "lavfi",
+         "-i", f"sine=frequency={220 + 40 * index}:duration={seconds}",
+         "-ar", "24000", "-ac", "1", path],
+        check=True,
+    )
+
+
+def _build_segments(workspace: RenderWorkspace, sentences: int, seconds: float):
+    binary = ffmpeg_binary()
+    if not binary:
+        raise SystemExit("ffmpeg is not available (install moviepy or set VIDEO_FFMPEG_BINARY)")
+    segments = []
+    for i, sentence in enumerate(_sentences(sentences)):
+        image_path = workspace.file(f"bench_image_{i}.png")
+        audio_path = workspace.file(f"bench_speech_{i}.mp3")
+        _image(image_path, i)
+        _voiceover(binary, audio_path, seconds, i)
+        segments.append(Segment(audio_path, [image_path], render_caption_track(sentence)))
+    return segments
+
+
+def _cpu_seconds() -> float:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _time(backend, segments, workspace: RenderWorkspace, run: int):
+    outfile = workspace.file(f"bench_{backend.name}_{run}.mp4")
+    wall_start, cpu_start = time.perf_counter(), _cpu_seconds()
+    backend.render(segments, outfile, workspace)
+    wall, cpu = time.perf_counter() - wall_start, _cpu_seconds() - cpu_start
+    return wall, cpu, outfile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sentences", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=4.0, help="voiceover length per sentence")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--backends", default="moviepy,ffmpeg")
+    args = parser.parse_args()
+
+    with RenderWorkspace("bench") as workspace:
+        segments = _build_segments(workspace, args.sentences, args.seconds)
+        probe = FfmpegBackend()
+        print(f"{args.sentences} sentences x {args.seconds:g}s, {args.repeat} run(s) per backend")
+
+        results = {}
+        for name in [n.strip() for n in args.backends.split(",") if n.strip()]:
+            backend = get_render_backend(name)
+            walls, cpus = [], []
+            for run in range(args.repeat):
+                wall, cpu, outfile = _time(backend, segments, workspace, run)
+                walls.append(wall)
+                cpus.append(cpu)
+            results[name] = statistics.median(walls)
+            size_mb = os.path.getsize(outfile) / (1024 * 1024)
+            print(
+                f"  {name:8s} wall {statistics.median(walls):7.2f} s   cpu {statistics.median(cpus):7.2f} s"
+                f"   output {size_mb:6.2f} MB, {probe.duration(outfile):6.2f} s"
+            )
+
+        if "moviepy" in results and "ffmpeg" in results:
+            print(f"  ffmpeg speedup: {results['moviepy'] / results['ffmpeg']:.1f}x wall time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Benchmark: voice tutor history reads, legacy vs per-message layout.
+
+Seeds a throwaway database with one user holding N messages (default 10k,
+spread over a few sessions) in both layouts, then times the read each layout
+needs to serve "last 10 messages of the latest session":
+
+- legacy: find_one the whole user document, sort sessions in Python, slice
+- per-message: find_one latest session header, then find().sort(seq).limit(10)
+
+Usage (from the server/ directory, MONGODB_URI must point at a test server):
+
+    python -m benchmarks.voice_history_read --messages 10000 --reads 200
+
+The benchmark database (default: "<MONGODB_DB_NAME>_bench") is dropped at the end.
+"""
+
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from pymongo import ASCENDING, DESCENDING, MongoClient
+
+from app.config import Config
+
+
+USER = "bench@example.com"
+
+
+def _seed(db, total_messages: int, sessions: int, message_size: int) -> str:
+    legacy = db["legacy_voice_chats"]
+    headers = db["voice_chat_sessions"]
+    messages = db["voice_chat_messages"]
+    legacy.create_index([("user_email", ASCENDING)], unique=True)
+    headers.create_index([("user_email", ASCENDING), ("session_id", ASCENDING)], unique=True)
+    headers.create_index([("user_email", ASCENDING), ("created_at", DESCENDING)])
+    messages.create_index(
+        [("user_email", ASCENDING), ("session_id", ASCENDING), ("seq", ASCENDING)], unique=True
+    )
+
+    base = datetime(2024, 1, 1)
+    per_session = total_messages // sessions
+    body = "x" * message_size
+    legacy_sessions = []
+    latest_session = None
+    for s in range(sessions):
+        session_id = f"bench_session_{s}"
+        created_at = (base + timedelta(days=s)).isoformat()
+        docs = [
+            {
+                "content": body,
+                "is_ai": bool(i % 2),
+                "timestamp": (base + timedelta(days=s, seconds=i)).isoformat(),
+            }
+            for i in range(per_session)
+        ]
+        legacy_sessions.append({"session_id": session_id, "messages": docs, "created_at": created_at})
+        messages.insert_many([
+            dict(doc, user_email=USER, session_id=session_id, seq=i + 1)
+            for i, doc in enumerate(docs)
+        ])
+        headers.insert_one({
+            "user_email": USER, "session_id": session_id,
+            "message_count": per_session, "created_at": created_at, "updated_at": created_at,
+        })
+        latest_session = session_id
+
+    legacy.insert_one({"user_email": USER, "sessions": legacy_sessions})
+    return latest_session
+
+
+def _read_legacy(db, limit: int):
+    doc = db["legacy_voice_chats"].find_one({"user_email": USER})
+    latest = sorted(doc["sessions"], key=lambda x: x.get("created_at", ""), reverse=True)[0]
+    return latest["messages"][-limit:]
+
+
+def _read_per_message(db, limit: int):
+    latest = db["voice_chat_sessions"].find_one(
+        {"user_email": USER}, {"session_id": 1}, sort=[("created_at", -1)]
+    )
+    cursor = db["voice_chat_messages"].find(
+        {"user_email": USER, "session_id": latest["session_id"]},
+        {"_id": 0, "content": 1, "is_ai": 1, "timestamp": 1},
+    ).sort("seq", -1).limit(limit)
+    return list(cursor)[::-1]
+
+
+def _time(fn, reads: int):
+    samples = []
+    for _ in range(reads):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[int(len(samples) * 0.95) - 1],
+        "max_ms": samples[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--message-size", type=int, default=300)
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--db", default=f"{Config.MONGODB_DB_NAME or 'edvanta'}_bench")
+    args = parser.parse_args()
+
+    if not Config.MONGODB_URI:
+        raise SystemExit("MONGODB_URI is not set")
+
+    client = MongoClient(Config.MONGODB_URI)
+    client.drop_database(args.db)
+    db = client[args.db]
+    try:
+        _seed(db, args.messages, args.sessions, args.message_size)
+        # Warm up both paths once
+        _read_legacy(db, args.limit)
+        _read_per_message(db, args.limit)
+
+        results = {
+            "legacy (whole user document)": _time(lambda: _read_legacy(db, args.limit), args.reads),
+            "per-message (indexed window)": _time(lambda: _read_per_message(db, args.limit), args.reads),
+        }
+        print(f"{args.messages} messages, {args.sessions} sessions, {args.reads} reads of last {args.limit}")
+        for name, r in results.items():
+            print(f"  {name:32s} median {r['median_ms']:8.2f} ms   p95 {r['p95_ms']:8.2f} ms   max {r['max_ms']:8.2f} ms")
+    finally:
+        client.drop_database(args.db)
+        client.close()
+
+
+if __name__ == "__main__":
+    main()